@@ -0,0 +1,83 @@
+"""Per-render cost of Markdown, fresh instances against the pool.
+
+    PYTHONPATH=. python benchmarks/markdown_render.py
+
+``markdown.markdown()`` builds a ``Markdown`` instance, loading its
+extensions and processors, for every call; ``render_markdown`` reuses
+pooled instances. The gap is the per-render overhead, it matters most
+for the short texts of the editor preview.
+"""
+
+import argparse
+import timeit
+from collections.abc import Callable
+
+import markdown
+
+from blog.infrastructure.markdown import (
+    MARKDOWN_EXTENSION_CONFIGS,
+    MARKDOWN_EXTENSIONS,
+    render_markdown,
+)
+
+PARAGRAPH = (
+    "Some *emphasis*, a [link](https://example.com) and `inline code`. "
+    "Another sentence to make the paragraph look like prose.\n\n"
+)
+CODE = "```python\ndef hello():\n    return 'world'\n```\n\n"
+
+
+def sample(paragraphs: int) -> str:
+    """A title, then ``paragraphs`` paragraphs with a code block every fourth."""
+    blocks = [PARAGRAPH if i % 4 < 3 else CODE for i in range(paragraphs)]
+    return "# Title\n\n" + "".join(blocks)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default="0,1,10,100",
+        help="comma separated paragraph counts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=1.0, help="time spent per measurement"
+    )
+    return parser.parse_args()
+
+
+def per_call(function: Callable[[], object], seconds: float) -> float:
+    """Microseconds per call, the best of three rounds."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(1, int(number * seconds / 0.2))
+    return min(timer.repeat(3, number)) / number * 1e6
+
+
+def main() -> None:
+    args = parse_args()
+    print(
+        "{:>10} {:>12} {:>12} {:>9}".format(
+            "paragraphs", "fresh µs", "pooled µs", "speedup"
+        )
+    )
+    for size in (int(value) for value in args.sizes.split(",")):
+        text = sample(size)
+        fresh = per_call(
+            lambda: markdown.markdown(
+                text,
+                extensions=MARKDOWN_EXTENSIONS,
+                extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+            ),
+            args.seconds,
+        )
+        pooled = per_call(lambda: render_markdown(text), args.seconds)
+        print(
+            "{:>10} {:>12.1f} {:>12.1f} {:>8.1f}x".format(
+                size, fresh, pooled, fresh / pooled
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
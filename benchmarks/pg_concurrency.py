@@ -0,0 +1,80 @@
+"""Query throughput of one gevent worker against PostgreSQL.
+
+    PYTHONPATH=. python benchmarks/pg_concurrency.py postgresql://blog@localhost/blog
+
+Greenlets run queries that wait on the server, first with plain
+psycopg2 and then with the gevent wait callback the gunicorn workers
+install. Without the callback throughput stays flat however many
+greenlets run; with it, it grows with concurrency up to the pool size.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse
+import os
+import time
+
+import gevent
+import psycopg2.extensions
+import sqlalchemy as sa
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").splitlines()[0])
+    parser.add_argument("url", help="PostgreSQL database URI")
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16,32",
+        help="comma separated greenlet counts (default: %(default)s)",
+    )
+    parser.add_argument("--queries", type=int, default=20, help="queries per greenlet")
+    parser.add_argument(
+        "--sleep", type=float, default=0.01, help="server side seconds per query"
+    )
+    return parser.parse_args()
+
+
+def run(engine: sa.Engine, concurrency: int, queries: int, sleep: float) -> float:
+    """Queries per second of ``concurrency`` greenlets."""
+
+    def worker() -> None:
+        for _ in range(queries):
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT pg_sleep(%s)", (sleep,))
+
+    started = time.perf_counter()
+    gevent.joinall([gevent.spawn(worker) for _ in range(concurrency)], raise_error=True)
+    return concurrency * queries / (time.perf_counter() - started)
+
+
+def main() -> None:
+    args = parse_args()
+    levels = [int(level) for level in args.concurrency.split(",")]
+    os.environ["SQLALCHEMY_DATABASE_URI"] = args.url
+    os.environ.setdefault("FLASK_ENV", "development")
+    # Every greenlet gets a connection, the pool is not what is measured.
+    os.environ["DB_POOL_SIZE"] = str(max(levels))
+    os.environ["DB_MAX_OVERFLOW"] = "0"
+
+    from blog import create_app
+    from blog.extensions import db
+    from blog.infrastructure.postgres import make_psycopg_green
+
+    app = create_app()
+    with app.app_context():
+        engine = db.engine
+        run(engine, max(levels), 1, 0)  # open the connections
+        print("{:>11} {:>12} {:>12}".format("greenlets", "blocking q/s", "green q/s"))
+        for level in levels:
+            psycopg2.extensions.set_wait_callback(None)
+            blocking = run(engine, level, args.queries, args.sleep)
+            make_psycopg_green()
+            green = run(engine, level, args.queries, args.sleep)
+            print("{:>11} {:>12.1f} {:>12.1f}".format(level, blocking, green))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Event loop stalls of a gevent worker while a huge post renders.
+
+    PYTHONPATH=. python benchmarks/render_latency.py
+
+A greenlet standing in for unrelated requests wakes every millisecond
+and records how late it ran, first while a large text renders inline and
+then while it renders through the RenderExecutor worker processes.
+Inline, the loop stalls for the whole render; offloaded, the lateness
+stays at the scheduling noise.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse
+import time
+from collections.abc import Callable
+
+import gevent
+
+from blog.infrastructure.markdown import RenderExecutor, render_markdown
+
+PARAGRAPH = "Some *emphasis*, a [link](https://example.com) and `code`.\n\n"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=(__doc__ or "").splitlines()[0])
+    parser.add_argument(
+        "--paragraphs", type=int, default=20000, help="size of the rendered text"
+    )
+    parser.add_argument("--workers", type=int, default=2, help="worker processes")
+    return parser.parse_args()
+
+
+def lateness_during(render: Callable[[], object]) -> tuple[float, list[float]]:
+    """Seconds ``render`` took and how late each 1 ms tick ran."""
+    late: list[float] = []
+    running = True
+
+    def ticker() -> None:
+        while running:
+            expected = time.perf_counter() + 0.001
+            gevent.sleep(0.001)
+            late.append(time.perf_counter() - expected)
+
+    greenlet = gevent.Greenlet(ticker)
+    greenlet.start()
+    gevent.sleep(0.01)
+    started = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - started
+    running = False
+    greenlet.join()
+    return elapsed, sorted(late)
+
+
+def report(name: str, elapsed: float, late: list[float]) -> None:
+    p99 = late[int(len(late) * 0.99) - 1] if late else 0.0
+    print(
+        "{:>9}: render {:7.1f} ms, loop lateness p99 {:7.1f} ms, max {:7.1f} ms".format(
+            name, elapsed * 1000, p99 * 1000, (late[-1] if late else 0.0) * 1000
+        )
+    )
+
+
+def main() -> None:
+    args = parse_args()
+    text = PARAGRAPH * args.paragraphs
+    executor = RenderExecutor(inline_limit=0, workers=args.workers, timeout=120)
+    # Started before measuring, a running worker has the pool warm.
+    executor.render("warm up")
+    try:
+        report("inline", *lateness_during(lambda: render_markdown(text)))
+        report("offloaded", *lateness_during(lambda: executor.render(text)))
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,25 @@
 
 import logging
 import os
+from collections.abc import Mapping
 
 from dotenv import load_dotenv
 from flask import Flask
 
 from blog.admin import create_admin
+from blog.archive.views import archive
+from blog.caching.invalidation import connect_cache_invalidation
 from blog.config import config
 from blog.config_validator import validate_config, ConfigValidationError
+from blog.events import connect_commit_events
 from blog.extensions import admin_ext, cache, db, login_manager, migrate, flask_sitemap
+from blog.infrastructure.markdown import configure_markdown
+from blog.infrastructure.postgres import configure_postgres
+from blog.infrastructure.query_stats import configure_query_stats
+from blog.infrastructure.sqlite import configure_sqlite
 from blog.post.views import post
+from blog.related import connect_related_posts
+from blog.search.views import search
 from blog.tags.views import tags
 from blog.user.views import user
 
@@ -20,9 +30,16 @@ logger = logging.getLogger(__name__)
 
 def configure_extensions(app: Flask) -> None:
     """Configures the extensions."""
+    configure_postgres(app)
     db.init_app(app)
+    connect_commit_events(db.session)
+    configure_sqlite(app)
+    configure_query_stats(app)
+    configure_markdown(app)
     admin_ext.init_app(app)
     cache.init_app(app)
+    connect_cache_invalidation()
+    connect_related_posts(app)
     migrate.init_app(app=app, db=db)
     login_manager.init_app(app=app)
     login_manager.login_view = "user.login"
@@ -63,11 +80,20 @@ def validate_application_config(app: Flask) -> None:
         raise ConfigValidationError(f"Configuration validation failed: {str(e)}") from e
 
 
-def create_app(init_admin: bool = False) -> Flask:
+def create_app(
+    init_admin: bool = False, overrides: Mapping[str, object] | None = None
+) -> Flask:
+    """Create the application.
+
+    ``overrides`` replace settings of the environment's config class;
+    they are applied before the extensions, and their engines, are set up.
+    """
     app = Flask(__name__)
     env = os.environ.get("FLASK_ENV", "development")
     logger.debug("current FLASK_ENV %s", env)
     app.config.from_object(config.get(env))
+    if overrides:
+        app.config.update(overrides)
 
     # Validate configuration at startup
     validate_application_config(app)
@@ -77,6 +103,8 @@ def create_app(init_admin: bool = False) -> Flask:
         create_admin(admin_ext)
     app.register_blueprint(post)
     app.register_blueprint(tags)
+    app.register_blueprint(archive)
+    app.register_blueprint(search)
     app.register_blueprint(user)
 
     # Register CLI commands
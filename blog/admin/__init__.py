@@ -1,11 +1,21 @@
 import os
 
-from typing import TYPE_CHECKING, override
+from typing import TYPE_CHECKING, Any, override
 
+import sqlalchemy as sa
+from blinker import NamedSignal
+from flask import g
 from flask_admin.contrib import fileadmin, sqla
 from flask_login import current_user
 
 from blog.category.models import Category
+from blog.events import (
+    ContentChange,
+    category_changed,
+    icon_changed,
+    post_changed,
+    tag_changed,
+)
 from blog.extensions import db
 from blog.post.models import Post, Icon
 from blog.tags.models import Tag
@@ -27,13 +37,118 @@ class UserView(sqla.ModelView):
         return current_user.is_authenticated
 
 
-class PostView(UserView):
+def _history_values(model: Any, attr: str) -> list[Any]:  # pyright: ignore[reportExplicitAny]
+    """Current and previous values of a model attribute within the session."""
+    history = sa.inspect(model).attrs[attr].load_history()
+    return [*history.added, *history.unchanged, *history.deleted]
+
+
+class ContentView(UserView):
+    """Model view that sends a content change signal for every save."""
+
+    change_signal: NamedSignal | None = None
+    # Whether saving the model changes the pages of its ``posts``.
+    touches_posts: bool = False
+
+    def describe_change(self, model: Any, action: str) -> ContentChange:  # pyright: ignore[reportExplicitAny]
+        return ContentChange(action=action)
+
+    @override
+    def on_model_change(self, form: Any, model: Any, is_created: bool) -> None:  # pyright: ignore[reportExplicitAny]
+        self._touch_posts(model)
+        self._stash_change(model, "created" if is_created else "updated")
+
+    @override
+    def after_model_change(self, form: Any, model: Any, is_created: bool) -> None:  # pyright: ignore[reportExplicitAny]
+        self._send_change(model)
+
+    @override
+    def on_model_delete(self, model: Any) -> None:  # pyright: ignore[reportExplicitAny]
+        self._touch_posts(model)
+        self._stash_change(model, "deleted")
+
+    @override
+    def after_model_delete(self, model: Any) -> None:  # pyright: ignore[reportExplicitAny]
+        self._send_change(model)
+
+    def _touch_posts(self, model: Any) -> None:  # pyright: ignore[reportExplicitAny]
+        if self.touches_posts:
+            for post in model.posts:
+                post.touch()
+
+    # Changes are described before the commit, while the session still
+    # holds previous values, and sent once the commit succeeded.
+    def _stash_change(self, model: Any, action: str) -> None:  # pyright: ignore[reportExplicitAny]
+        pending = g.setdefault("pending_content_changes", {})
+        pending[id(model)] = self.describe_change(model, action)
+
+    def _send_change(self, model: Any) -> None:  # pyright: ignore[reportExplicitAny]
+        change = g.get("pending_content_changes", {}).pop(id(model), None)
+        if change is not None and self.change_signal is not None:
+            self.change_signal.send(self, change=change)
+
+
+class PostView(ContentView):
     column_hide_backrefs = False
     column_list = (
         "pagetitle",
         "puslishedon",
         "tags",
     )
+    form_excluded_columns = (
+        "content_html",
+        "content_hash",
+        "renderer_version",
+        "updatedon",
+    )
+    change_signal = post_changed
+
+    @override
+    def on_model_change(self, form: Any, model: Post, is_created: bool) -> None:  # pyright: ignore[reportExplicitAny]
+        model.refresh_rendering()
+        model.touch()
+        super().on_model_change(form, model, is_created)
+
+    @override
+    def describe_change(self, model: Post, action: str) -> ContentChange:
+        return ContentChange(
+            action=action,
+            post_aliases=frozenset(_history_values(model, "alias")),
+            tag_aliases=frozenset(
+                tag.alias for tag in _history_values(model, "tags") if tag.alias
+            ),
+        )
+
+
+class TagView(ContentView):
+    change_signal = tag_changed
+    touches_posts = True
+
+    @override
+    def describe_change(self, model: Tag, action: str) -> ContentChange:
+        return ContentChange(
+            action=action,
+            post_aliases=frozenset(post.alias for post in model.posts),
+            tag_aliases=frozenset(
+                alias for alias in _history_values(model, "alias") if alias
+            ),
+        )
+
+
+class CategoryView(ContentView):
+    change_signal = category_changed
+    touches_posts = True
+
+    @override
+    def describe_change(self, model: Category, action: str) -> ContentChange:
+        return ContentChange(
+            action=action,
+            post_aliases=frozenset(post.alias for post in model.posts),
+        )
+
+
+class IconView(ContentView):
+    change_signal = icon_changed
 
 
 class MyFileAdmin(fileadmin.FileAdmin):
@@ -44,9 +159,9 @@ class MyFileAdmin(fileadmin.FileAdmin):
 
 def create_admin(config_admin: "Admin") -> None:
     config_admin.add_view(PostView(Post, db.session, endpoint="admin_post"))
-    config_admin.add_view(UserView(Category, db.session, endpoint="admin_category"))
-    config_admin.add_view(UserView(Tag, db.session, endpoint="admin_tag"))
+    config_admin.add_view(CategoryView(Category, db.session, endpoint="admin_category"))
+    config_admin.add_view(TagView(Tag, db.session, endpoint="admin_tag"))
     config_admin.add_view(UserView(User, db.session, endpoint="admin_user"))
-    config_admin.add_view(UserView(Icon, db.session, endpoint="admin_icon"))
+    config_admin.add_view(IconView(Icon, db.session, endpoint="admin_icon"))
     path = os.path.join(os.path.dirname(__file__), "../static/upload")
     config_admin.add_view(MyFileAdmin(path, "/static/upload", name="files"))
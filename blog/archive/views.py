@@ -0,0 +1,98 @@
+import datetime
+
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    render_template,
+    request,
+    url_for,
+)
+
+from blog.caching.validators import site_validators
+from blog.caching.views import HTMX_VARY, cached_view
+from blog.domain.post import PostCursor
+from blog.services.factory import ServiceFactory
+
+archive = Blueprint("archive", __name__, url_prefix="/archive")
+
+
+@archive.route("/")
+@cached_view(vary=HTMX_VARY, validators=site_validators)
+def index() -> Response | str:
+    template = "archive.htmx" if request.headers.get("HX-Request") else "archive.html"
+    post_service = ServiceFactory.create_post_service()
+    return render_template(template, years=post_service.get_archive())
+
+
+# Year and month pages are generational: a post change cannot tell which
+# of them listed the post.
+@archive.route("/<int:year>")
+@cached_view(vary=HTMX_VARY, validators=site_validators, generational=True)
+def year(year: int) -> Response | str:
+    return _render_period(year, None, None)
+
+
+@archive.route("/<int:year>/after/<cursor>")
+@cached_view(vary=HTMX_VARY, validators=site_validators, generational=True)
+def year_after(year: int, cursor: str) -> Response | str:
+    return _render_period(year, None, cursor)
+
+
+@archive.route("/<int:year>/<int:month>")
+@cached_view(vary=HTMX_VARY, validators=site_validators, generational=True)
+def month(year: int, month: int) -> Response | str:
+    return _render_period(year, month, None)
+
+
+@archive.route("/<int:year>/<int:month>/after/<cursor>")
+@cached_view(vary=HTMX_VARY, validators=site_validators, generational=True)
+def month_after(year: int, month: int, cursor: str) -> Response | str:
+    return _render_period(year, month, cursor)
+
+
+def _render_period(year: int, month: int | None, cursor: str | None) -> Response | str:
+    template = (
+        "posts.htmx" if request.headers.get("HX-Request") else "archive_posts.html"
+    )
+    post_service = ServiceFactory.create_post_service()
+    after = None
+    if cursor is not None:
+        # Pages are cached per cursor, only the ones links lead to are
+        # served: a published post of the period.
+        after = PostCursor.decode(cursor)
+        if (
+            after is None
+            or after.publishedon.year != year
+            or (month is not None and after.publishedon.month != month)
+            or not post_service.is_published_cursor(after)
+        ):
+            abort(404)
+
+    try:
+        page = post_service.get_archive_page(
+            year, month, current_app.config["POSTS_PER_PAGE"], after
+        )
+    except ValueError:
+        abort(404)
+    if not page.posts:
+        abort(404)
+
+    next_url = None
+    if page.next_cursor is not None:
+        next_cursor = page.next_cursor.encode()
+        if month is None:
+            next_url = url_for("archive.year_after", year=year, cursor=next_cursor)
+        else:
+            next_url = url_for(
+                "archive.month_after", year=year, month=month, cursor=next_cursor
+            )
+    period = datetime.date(year, month or 1, 1).strftime("%B %Y" if month else "%Y")
+    return render_template(
+        template,
+        years=page.by_year(),
+        period=period,
+        next_url=next_url,
+        continued_year=after.publishedon.year if after else None,
+    )
@@ -0,0 +1 @@
+"""Caching package for the application."""
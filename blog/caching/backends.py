@@ -0,0 +1,202 @@
+"""Cache backends for the application.
+
+``TwoTierCache`` keeps a bounded in-process LRU in front of a cache shared
+by all gunicorn workers (a file store under ``CACHE_DIR`` by default, or a
+Redis-compatible server when ``CACHE_REDIS_URL`` is set). Deletes bump an
+epoch in the shared tier, other workers notice it within
+``CACHE_SYNC_INTERVAL`` seconds and drop their local entries.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Self, override
+
+from flask import Flask
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+
+EPOCH_KEY = "two-tier:epoch"
+
+
+class LocalLRU:
+    """Bounded, thread-safe in-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()  # pyright: ignore[reportExplicitAny]
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:  # pyright: ignore[reportExplicitAny]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: float) -> None:  # pyright: ignore[reportExplicitAny]
+        expires = time.monotonic() + timeout if timeout else 0
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class TwoTierCache(BaseCache):
+    """In-process LRU in front of a cache shared across workers.
+
+    Args:
+        shared: The shared cache tier
+        local_maxsize: Maximum number of entries kept in process
+        local_timeout: Upper bound for the lifetime of a local entry
+        sync_interval: Seconds between checks of the shared invalidation epoch
+        default_timeout: Timeout used when ``set`` gets none
+    """
+
+    def __init__(
+        self,
+        shared: BaseCache,
+        local_maxsize: int = 256,
+        local_timeout: float = 60,
+        sync_interval: float = 1.0,
+        default_timeout: int = 300,
+    ):
+        super().__init__(default_timeout=default_timeout)
+        self.shared = shared
+        self.local = LocalLRU(local_maxsize)
+        self.local_timeout = local_timeout
+        self.sync_interval = sync_interval
+        self.counters = {
+            "local_hits": 0,
+            "local_misses": 0,
+            "shared_hits": 0,
+            "shared_misses": 0,
+        }
+        self._epoch = self.shared.get(EPOCH_KEY)
+        self._synced_at = time.monotonic()
+
+    @classmethod
+    @override
+    def factory(
+        cls,
+        app: Flask,
+        config: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+        args: list[Any],  # pyright: ignore[reportExplicitAny]
+        kwargs: dict[str, Any],  # pyright: ignore[reportExplicitAny]
+    ) -> Self:
+        shared_kwargs = dict(kwargs)
+        if config.get("CACHE_REDIS_URL"):
+            from flask_caching.backends.rediscache import RedisCache
+
+            shared = RedisCache.factory(app, config, [], shared_kwargs)
+        else:
+            shared = FileSystemCache.factory(app, config, [], shared_kwargs)
+        kwargs.update(
+            dict(
+                local_maxsize=config.get("CACHE_LOCAL_MAXSIZE", 256),
+                local_timeout=config.get("CACHE_LOCAL_TIMEOUT", 60),
+                sync_interval=config.get("CACHE_SYNC_INTERVAL", 1.0),
+            )
+        )
+        return cls(shared, *args, **kwargs)
+
+    def stats(self) -> dict[str, int]:
+        """Hit and miss counters per tier, for this process."""
+        return {**self.counters, "local_size": len(self.local)}
+
+    @override
+    def get(self, key: str) -> Any | None:  # pyright: ignore[reportExplicitAny]
+        self._sync()
+        value = self.local.get(key)
+        if value is not None:
+            self.counters["local_hits"] += 1
+            return value
+        self.counters["local_misses"] += 1
+
+        value = self.shared.get(key)
+        if value is None:
+            self.counters["shared_misses"] += 1
+            return None
+        self.counters["shared_hits"] += 1
+        self.local.set(key, value, self.local_timeout)
+        return value
+
+    @override
+    def set(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:  # pyright: ignore[reportExplicitAny]
+        timeout = self._normalize_timeout(timeout)
+        result = self.shared.set(key, value, timeout=timeout)
+        self.local.set(key, value, self._local_timeout(timeout))
+        return bool(result)
+
+    @override
+    def add(self, key: str, value: Any, timeout: int | timedelta | None = None) -> bool:  # pyright: ignore[reportExplicitAny]
+        timeout = self._normalize_timeout(timeout)
+        added = self.shared.add(key, value, timeout=timeout)
+        if added:
+            self.local.set(key, value, self._local_timeout(timeout))
+        return bool(added)
+
+    @override
+    def has(self, key: str) -> bool:
+        self._sync()
+        return self.local.get(key) is not None or self.shared.has(key)
+
+    @override
+    def delete(self, key: str) -> bool:
+        self.local.delete(key)
+        deleted = self.shared.delete(key)
+        self._bump_epoch()
+        return bool(deleted)
+
+    @override
+    def delete_many(self, *keys: str) -> list[str]:
+        for key in keys:
+            self.local.delete(key)
+            self.shared.delete(key)
+        self._bump_epoch()
+        return list(keys)
+
+    @override
+    def clear(self) -> bool:
+        self.local.clear()
+        cleared = self.shared.clear()
+        self._bump_epoch()
+        return bool(cleared)
+
+    def _local_timeout(self, timeout: int) -> float:
+        if not timeout:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def _bump_epoch(self) -> None:
+        # The new value is not remembered locally on purpose: the next
+        # sync must still drop entries invalidated by other workers.
+        self.shared.set(EPOCH_KEY, time.time_ns(), timeout=0)
+
+    def _sync(self) -> None:
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        epoch = self.shared.get(EPOCH_KEY)
+        if epoch != self._epoch:
+            self._epoch = epoch
+            self.local.clear()
@@ -0,0 +1,94 @@
+"""Event-driven invalidation of cached views.
+
+Subscribes to the content change signals and purges exactly the cached
+pages a change can affect, which lets public views use long timeouts.
+"""
+
+import logging
+from collections.abc import Iterable
+
+from flask import current_app
+
+from blog.caching.validators import bump_content_generation
+from blog.caching.views import HTMX_VARY, variant_cache_keys, view_cache_key
+from blog.events import (
+    ContentChange,
+    category_changed,
+    icon_changed,
+    post_changed,
+    tag_changed,
+)
+from blog.extensions import cache
+
+logger = logging.getLogger(__name__)
+
+# Pages listing posts, affected by any post or category change.
+LIST_ENDPOINTS = (
+    "post.posts",
+    "post.rss",
+    "flask_sitemap.sitemap",
+    "post.pages_hx",
+    "archive.index",
+)
+# Pages listing tags with their post counts.
+TAG_ENDPOINTS = ("tags.index", "tags.cloud_hx")
+
+
+def cache_keys_for_path(path: str) -> list[str]:
+    """Return every cache key a path can be stored under."""
+    return [view_cache_key(path, {}, ()), *variant_cache_keys(path, HTMX_VARY)]
+
+
+def purge_paths(paths: Iterable[str]) -> None:
+    # Bumped first: workers re-read it from the shared tier once the
+    # deletes below invalidate their local copies.
+    bump_content_generation()
+    keys = [key for path in set(paths) for key in cache_keys_for_path(path)]
+    # Not delete_many: flask-caching stops at the first absent key unless
+    # CACHE_IGNORE_ERRORS is set.
+    for key in keys:
+        cache.delete(key)
+    logger.debug("Purged %d cache keys", len(keys))
+
+
+def _build_paths(
+    endpoints: Iterable[str] = (),
+    post_aliases: Iterable[str] = (),
+    tag_aliases: Iterable[str] = (),
+) -> list[str]:
+    adapter = current_app.url_map.bind("")
+    paths = [
+        adapter.build(endpoint)
+        for endpoint in endpoints
+        if endpoint in current_app.view_functions
+    ]
+    paths += [adapter.build("post.view", {"alias": alias}) for alias in post_aliases]
+    paths += [adapter.build("tags.view", {"alias": alias}) for alias in tag_aliases]
+    return paths
+
+
+def on_post_changed(_sender: object, change: ContentChange) -> None:
+    endpoints = LIST_ENDPOINTS
+    if change.tag_aliases:
+        endpoints = (*endpoints, *TAG_ENDPOINTS)
+    purge_paths(_build_paths(endpoints, change.post_aliases, change.tag_aliases))
+
+
+def on_tag_changed(_sender: object, change: ContentChange) -> None:
+    purge_paths(_build_paths(TAG_ENDPOINTS, change.post_aliases, change.tag_aliases))
+
+
+def on_category_changed(_sender: object, change: ContentChange) -> None:
+    purge_paths(_build_paths(LIST_ENDPOINTS, change.post_aliases))
+
+
+def on_icon_changed(_sender: object, **_kwargs: object) -> None:
+    purge_paths(_build_paths(("post.icons_hx",)))
+
+
+def connect_cache_invalidation() -> None:
+    """Subscribe the cache purge handlers to the content change signals."""
+    post_changed.connect(on_post_changed)
+    tag_changed.connect(on_tag_changed)
+    category_changed.connect(on_category_changed)
+    icon_changed.connect(on_icon_changed)
@@ -0,0 +1,141 @@
+"""Single-flight cache fill with stale-while-revalidate.
+
+When a popular entry expires, only one greenlet per worker recomputes it.
+Concurrent requests for the same key get the stale value while it is
+being refreshed, or wait for the leader on a cold miss, instead of all
+querying the database and rendering templates at once. Freshness
+deadlines are jittered so entries written together do not expire together.
+"""
+
+import math
+import random
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any, Protocol, TypeVar
+
+T = TypeVar("T")
+
+
+class CacheStore(Protocol):
+    def get(self, key: str) -> Any: ...  # pyright: ignore[reportExplicitAny]
+
+    def set(self, key: str, value: Any, timeout: int | None = None) -> Any: ...  # pyright: ignore[reportExplicitAny]
+
+
+class SingleFlight:
+    """Per-key locks that are dropped once nobody holds or waits on them.
+
+    Locks are re-entrant so a cached view nested in another cached view
+    under the same key does not wait on itself.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, tuple[threading.RLock, int]] = {}
+        self._guard = threading.Lock()
+
+    @contextmanager
+    def lead(
+        self, key: str, blocking: bool = True, timeout: float = -1
+    ) -> Generator[bool, None, None]:
+        """Try to become the single caller working on ``key``.
+
+        Yields True when the lock was acquired.
+        """
+        lock = self._checkout(key)
+        acquired = lock.acquire(blocking, timeout if blocking else -1)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                lock.release()
+            self._checkin(key)
+
+    def _checkout(self, key: str) -> threading.RLock:
+        with self._guard:
+            lock, users = self._locks.get(key, (None, 0))
+            if lock is None:
+                lock = threading.RLock()
+            self._locks[key] = (lock, users + 1)
+            return lock
+
+    def _checkin(self, key: str) -> None:
+        with self._guard:
+            lock, users = self._locks[key]
+            if users <= 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+
+flights = SingleFlight()
+
+
+def jittered(timeout: float, jitter: float) -> float:
+    """Shorten ``timeout`` by a random fraction of at most ``jitter``."""
+    return timeout * (1 - random.uniform(0, jitter))
+
+
+def get_or_compute(
+    store: CacheStore,
+    key: str,
+    compute: Callable[[], T],
+    timeout: int,
+    stale_timeout: int = 0,
+    jitter: float = 0.0,
+    wait_timeout: float = 10.0,
+    should_store: Callable[[T], bool] = lambda value: True,
+) -> T:
+    """Return the cached value of ``key``, computing it one caller at a time.
+
+    Args:
+        store: Cache to read and write entries
+        key: Cache key
+        compute: Produces the value on a miss
+        timeout: Seconds the value is fresh, 0 for no expiry
+        stale_timeout: Seconds a value is still served while it is refreshed
+        jitter: Largest fraction ``timeout`` is randomly shortened by
+        wait_timeout: Seconds to wait for another caller filling a cold miss
+        should_store: Decides whether a computed value is cached
+    """
+    entry = store.get(key)
+    if entry is not None:
+        fresh_until, value = entry
+        if fresh_until > time.time():
+            return value
+        with flights.lead(key, blocking=False) as leader:
+            if not leader:
+                return value
+            return _compute_and_store(
+                store, key, compute, timeout, stale_timeout, jitter, should_store
+            )
+
+    with flights.lead(key, timeout=wait_timeout):
+        # Another caller may have filled the entry while this one waited.
+        entry = store.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        return _compute_and_store(
+            store, key, compute, timeout, stale_timeout, jitter, should_store
+        )
+
+
+def _compute_and_store(
+    store: CacheStore,
+    key: str,
+    compute: Callable[[], T],
+    timeout: int,
+    stale_timeout: int,
+    jitter: float,
+    should_store: Callable[[T], bool],
+) -> T:
+    value = compute()
+    if should_store(value):
+        if timeout:
+            fresh_for = jittered(timeout, jitter)
+            fresh_until = time.time() + fresh_for
+            store.set(key, (fresh_until, value), math.ceil(fresh_for + stale_timeout))
+        else:
+            store.set(key, (math.inf, value), 0)
+    return value
@@ -0,0 +1,62 @@
+"""HTTP validators for conditional GET.
+
+Validators are computed without rendering anything: a site-wide content
+generation that changes on every content change event, optionally
+combined with a per-post content hash. Clients presenting a matching
+``If-None-Match`` or ``If-Modified-Since`` get ``304 Not Modified``.
+"""
+
+import datetime
+import hashlib
+import uuid
+from collections.abc import Iterable
+
+from blog.extensions import cache
+
+GENERATION_KEY = "content:generation"
+
+# ETag seed and Last-Modified time of the current content generation.
+Generation = tuple[str, datetime.datetime]
+# ETag and Last-Modified of a response.
+Validators = tuple[str, datetime.datetime]
+
+# Used when the configured cache does not keep values (NullCache).
+_local_generation: Generation | None = None
+
+
+def _new_generation() -> Generation:
+    now = datetime.datetime.now(datetime.timezone.utc).replace(microsecond=0)
+    return uuid.uuid4().hex, now
+
+
+def content_generation() -> Generation:
+    """Return the current site-wide content generation."""
+    global _local_generation
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _new_generation(), timeout=0)
+        generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        if _local_generation is None:
+            _local_generation = _new_generation()
+        generation = _local_generation
+    return generation
+
+
+def bump_content_generation() -> None:
+    """Start a new content generation, changing every validator."""
+    global _local_generation
+    _local_generation = _new_generation()
+    cache.set(GENERATION_KEY, _local_generation, timeout=0)
+
+
+def make_validators(parts: Iterable[str] = ()) -> Validators:
+    """Combine the content generation with view specific parts."""
+    token, last_modified = content_generation()
+    digest = hashlib.sha256("|".join([token, *parts]).encode()).hexdigest()
+    return digest[:32], last_modified
+
+
+def site_validators(*_args: object, **_kwargs: object) -> Validators:
+    """Validators for pages that depend on the whole site's content."""
+    return make_validators()
@@ -0,0 +1,161 @@
+"""Full-response caching for public views.
+
+Responses are cached per path and per value of the declared request
+headers, so an HTMX fragment and a full page never share an entry and
+every response carries a matching ``Vary`` header. Misses are filled
+through ``blog.caching.singleflight``.
+"""
+
+import itertools
+from collections.abc import Callable, Mapping
+from functools import wraps
+from typing import ParamSpec
+
+from flask import Response, current_app, make_response, request
+from werkzeug.http import is_resource_modified
+
+from blog.caching.singleflight import get_or_compute
+from blog.caching.validators import Validators, content_generation, site_validators
+from blog.extensions import cache
+
+P = ParamSpec("P")
+
+# Body, status code and content type of a cached response.
+CachedPage = tuple[bytes, int, str | None]
+
+# Header name -> header values that get their own cache entry.
+VaryHeaders = Mapping[str, tuple[str, ...]]
+
+HTMX_VARY: VaryHeaders = {"HX-Request": ("", "true")}
+
+
+def header_variant(vary: VaryHeaders) -> tuple[str, ...] | None:
+    """Return the normalized values of the declared headers.
+
+    Returns None when a header carries a value that is not declared, such
+    requests bypass the cache instead of creating unbounded variants.
+    """
+    variant: list[str] = []
+    for header, allowed in vary.items():
+        value = request.headers.get(header, "").strip().lower()
+        if value not in allowed:
+            return None
+        variant.append(value)
+    return tuple(variant)
+
+
+def view_cache_key(path: str, vary: VaryHeaders, variant: tuple[str, ...]) -> str:
+    parts = [f"{header.lower()}={value}" for header, value in zip(vary, variant)]
+    if not parts:
+        return f"view:{path}"
+    return f"view:{path}?{'&'.join(parts)}"
+
+
+def variant_cache_keys(path: str, vary: VaryHeaders) -> list[str]:
+    """Return the cache keys of every declared variant of a path."""
+    return [
+        view_cache_key(path, vary, variant)
+        for variant in itertools.product(*vary.values())
+    ]
+
+
+def cached_view(
+    timeout: int | None = None,
+    vary: VaryHeaders | None = None,
+    validators: Callable[..., Validators | None] | None = None,
+    generational: bool = False,
+) -> Callable[[Callable[P, Response | str]], Callable[P, Response]]:
+    """Cache a view's response keyed by path and the ``vary`` headers.
+
+    Args:
+        timeout: Cache timeout in seconds, ``VIEW_CACHE_TIMEOUT`` when None
+        vary: Request headers the response depends on, with the values
+            that are cached separately
+        validators: Called with the view arguments, returns the ETag and
+            Last-Modified of the response, or None to skip conditional GET
+        generational: Key entries by the content generation too, for views
+            whose paths cannot be enumerated when purging
+    """
+    vary = vary or {}
+
+    def decorator(view: Callable[P, Response | str]) -> Callable[P, Response]:
+        @wraps(view)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> Response:
+            variant = header_variant(vary)
+            current: Validators | None = None
+            if validators is not None and variant is not None:
+                current = validators(*args, **kwargs)
+            if current is not None and variant is not None:
+                # Fragments and full pages are different representations.
+                etag = "-".join([current[0], *(value or "none" for value in variant)])
+                current = (etag, current[1])
+                if not is_resource_modified(
+                    request.environ, etag=etag, last_modified=current[1]
+                ):
+                    response = current_app.response_class(status=304)
+                    _set_validators(response, current)
+                    response.vary.update(vary)
+                    return response
+
+            if variant is None:
+                response = make_response(view(*args, **kwargs))
+            else:
+                key = view_cache_key(request.path, vary, variant)
+                if generational:
+                    # Entries of older generations are never read again
+                    # and expire on their own.
+                    key = f"{key}#{content_generation()[0]}"
+                response = _cached_response(
+                    key, lambda: make_response(view(*args, **kwargs)), timeout
+                )
+            if current is not None and response.status_code == 200:
+                _set_validators(response, current)
+            response.vary.update(vary)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _set_validators(response: Response, validators: Validators) -> None:
+    etag, last_modified = validators
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified
+
+
+def _cached_response(
+    key: str, render: Callable[[], Response], timeout: int | None
+) -> Response:
+    config = current_app.config
+    if timeout is None:
+        timeout = int(config["VIEW_CACHE_TIMEOUT"])
+
+    # The response rendered by this request, if any, is returned as is so
+    # headers set by the view are kept; only cache hits are rebuilt.
+    rendered: list[Response] = []
+
+    def compute() -> CachedPage:
+        response = render()
+        rendered.append(response)
+        if response.direct_passthrough:
+            # Streams a file or an iterator, reading it would consume it.
+            return (b"", response.status_code, None)
+        return (response.get_data(), response.status_code, response.content_type)
+
+    body, status, content_type = get_or_compute(
+        cache,
+        key,
+        compute,
+        timeout=timeout,
+        stale_timeout=config.get("VIEW_CACHE_STALE_TIMEOUT", 0),
+        jitter=config.get("VIEW_CACHE_JITTER", 0.0),
+        should_store=lambda page: page[1] == 200 and not rendered[0].direct_passthrough,
+    )
+    if rendered:
+        return rendered[0]
+    return current_app.response_class(body, status=status, content_type=content_type)
+
+
+# Used through SITEMAP_VIEW_DECORATORS, flask-sitemap owns the view.
+cached_sitemap = cached_view(validators=site_validators)
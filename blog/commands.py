@@ -1,10 +1,24 @@
 """Custom CLI commands for the blog application."""
 
+import datetime
+import os
+import time
 from typing import TYPE_CHECKING
 
 import click
+from flask import current_app
 from flask.cli import with_appcontext
+from blog.export import (
+    ExportError,
+    collect_pages,
+    read_export_time,
+    render_pages,
+    reusable_pages,
+    write_export,
+)
 from blog.extensions import db
+from blog.related import refresh_related_posts
+from blog.services.factory import ServiceFactory
 from blog.user.models import User
 
 if TYPE_CHECKING:
@@ -43,6 +57,116 @@ def create_admin(name: str, password: str) -> None:
     click.echo("Admin user '{}' created successfully.".format(name))
 
 
+@click.command("render-posts")
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Re-render every post, even if its stored HTML is up to date",
+)
+@with_appcontext
+def render_posts(force: bool) -> None:
+    """Re-render the stored HTML of posts after content or renderer changes."""
+    post_service = ServiceFactory.create_post_service()
+    refreshed = post_service.refresh_renderings(force=force)
+    db.session.commit()
+
+    click.echo("Re-rendered {} post(s).".format(refreshed))
+
+
+@click.command("search-reindex")
+@click.option(
+    "--full",
+    is_flag=True,
+    help="Rebuild the whole index instead of only missing and changed posts",
+)
+@with_appcontext
+def search_reindex(full: bool) -> None:
+    """Bring the full-text search index up to date."""
+    search_service = ServiceFactory.create_search_service()
+    started = time.perf_counter()
+    indexed = search_service.reindex(full=full)
+    db.session.commit()
+
+    click.echo(
+        "Indexed {} post(s) in {:.2f} s.".format(indexed, time.perf_counter() - started)
+    )
+
+
+@click.command("related-posts")
+@with_appcontext
+def related_posts() -> None:
+    """Rebuild the related posts of every post from their tags."""
+    started = time.perf_counter()
+    changed = refresh_related_posts()
+
+    click.echo(
+        "Related posts of {} post(s) changed in {:.2f} s.".format(
+            changed, time.perf_counter() - started
+        )
+    )
+
+
+@click.command("export")
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option(
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    show_default=True,
+    help="Number of worker processes rendering pages",
+)
+@click.option(
+    "--base-url",
+    default="http://localhost/",
+    show_default=True,
+    help="Site URL used for absolute links, e.g. in the sitemap",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Only render posts changed since the export in OUTPUT_DIR",
+)
+@with_appcontext
+def export(output_dir: str, jobs: int, base_url: str, incremental: bool) -> None:
+    """Render every public page into OUTPUT_DIR as static files."""
+    # Taken before reading posts, so changes made during the export are
+    # picked up by the next one.
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    pages = collect_pages()
+
+    reused = []
+    since = read_export_time(output_dir) if incremental else None
+    if since is not None:
+        post_service = ServiceFactory.create_post_service()
+        changed = {post.alias for post in post_service.get_posts_changed_since(since)}
+        reused = reusable_pages(output_dir, pages, changed)
+        pages = [page for page in pages if page not in reused]
+
+    started = time.perf_counter()
+    try:
+        rendered = write_export(
+            output_dir,
+            render_pages(current_app, pages, base_url, jobs=jobs),
+            reused=reused,
+            started=started_at,
+        )
+    except ExportError as e:
+        raise click.ClickException(str(e)) from e
+    elapsed = time.perf_counter() - started
+
+    for result in sorted(rendered, key=lambda r: r.seconds, reverse=True):
+        click.echo("{:9.1f} ms  {}".format(result.seconds * 1000, result.page.filename))
+    click.echo(
+        "Exported {} page(s) to {} in {:.2f} s, {} unchanged.".format(
+            len(rendered), output_dir, elapsed, len(reused)
+        )
+    )
+
+
 def init_app(app: "Flask") -> None:
     """Initialize the CLI commands with the Flask app."""
     app.cli.add_command(create_admin)
+    app.cli.add_command(render_posts)
+    app.cli.add_command(export)
+    app.cli.add_command(search_reindex)
+    app.cli.add_command(related_posts)
@@ -5,12 +5,61 @@ from os import environ, path
 basedir = path.abspath(path.dirname(__file__))
 
 
+def optional_int(value: str | None, default: int) -> int | None:
+    """An environment value as an int, None when it is empty or "none"."""
+    if value is None:
+        return default
+    if value.strip().lower() in ("", "none"):
+        return None
+    return int(value)
+
+
 class Config(object):
     CACHE_TYPE: str = "NullCache"
+    # Cached pages are purged on content changes, see blog.caching.invalidation
+    VIEW_CACHE_TIMEOUT: int = int(environ.get("VIEW_CACHE_TIMEOUT", 6 * 60 * 60))
+    # Expired pages are served for this long while one request refreshes them
+    VIEW_CACHE_STALE_TIMEOUT: int = 10 * 60
+    VIEW_CACHE_JITTER: float = 0.1
+    SITEMAP_VIEW_DECORATORS: list[str] = ["blog.caching.views.cached_sitemap"]
+    # Posts per page of the post list and tag pages
+    POSTS_PER_PAGE: int = 30
+    SEARCH_RESULTS_PER_PAGE: int = 20
+    # Markdown longer than this many characters renders in worker
+    # processes, off the gevent loop, see blog.infrastructure.markdown
+    MARKDOWN_INLINE_LIMIT: int = 20_000
+    MARKDOWN_RENDER_WORKERS: int = int(environ.get("MARKDOWN_RENDER_WORKERS", 2))
+    MARKDOWN_RENDER_TIMEOUT: float = 10.0
+    # Editor preview: requests per second and burst per admin and address,
+    # largest request body, previews and preview blocks kept per worker
+    MARKDOWN_PREVIEW_RATE: float = 2.0
+    MARKDOWN_PREVIEW_BURST: int = 10
+    MARKDOWN_PREVIEW_MAX_BYTES: int = 1024 * 1024
+    MARKDOWN_PREVIEW_CACHE_SIZE: int = 64
+    MARKDOWN_PREVIEW_BLOCK_CACHE_SIZE: int = 2048
+    # Related posts shown under a post, see blog.related
+    RELATED_POSTS_LIMIT: int = 5
+    # Seconds after a content change the related posts are rebuilt,
+    # None leaves it to the related-posts command
+    RELATED_POSTS_REFRESH_DELAY: float | None = 30.0
     PORT: str = environ.get("PORT") or "5555"
     SECRET_KEY: str = environ.get("SECRET_KEY") or "hard to guess string"
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     SQLALCHEMY_ECHO: bool = False
+    # Applied to every new SQLite connection, see blog.infrastructure.sqlite
+    SQLITE_PRAGMAS: dict[str, str | int] = {}
+    # Connection pool of a PostgreSQL database, per worker process, see
+    # blog.infrastructure.postgres
+    DB_POOL_SIZE: int = int(environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW: int = int(environ.get("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: int = int(environ.get("DB_POOL_TIMEOUT", 10))
+    DB_POOL_RECYCLE: int = int(environ.get("DB_POOL_RECYCLE", 30 * 60))
+    DB_POOL_PRE_PING: bool = True
+    # Statements a request may issue before a warning is logged, None
+    # turns the counting off, see blog.infrastructure.query_stats
+    QUERY_BUDGET: int | None = optional_int(environ.get("QUERY_BUDGET"), 20)
+    # Times one statement may run in a request before it counts as N+1
+    QUERY_REPEAT_LIMIT: int = 3
     YANDEX_VERIFICATION: str | None = environ.get("YANDEX_VERIFICATION", None)
     YANDEX_METRIKA: str = environ.get("YANDEX_METRIKA", "76938046")
 
@@ -21,11 +70,17 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI: str = environ.get(
         "SQLALCHEMY_DATABASE_URI", default_db_uri
     )
+    SQLITE_PRAGMAS: dict[str, str | int] = {
+        "journal_mode": "wal",
+        "busy_timeout": 5000,
+    }
 
 
 class TestingConfig(Config):
     TESTING: bool = True
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///:memory:"
+    RELATED_POSTS_REFRESH_DELAY: float | None = None
+    MARKDOWN_RENDER_WORKERS: int = 0
 
 
 class ProductionConfig(Config):
@@ -34,8 +89,24 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI: str = environ.get(
         "SQLALCHEMY_DATABASE_URI", default_db_uri
     )
-    CACHE_TYPE: str = "SimpleCache"
+    SQLITE_PRAGMAS: dict[str, str | int] = {
+        "journal_mode": "wal",
+        # Safe with WAL: a power loss may drop the last commits, never
+        # corrupt the database.
+        "synchronous": "normal",
+        "mmap_size": int(environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+        # Negative values are KiB, 64 MiB of page cache per connection.
+        "cache_size": -64 * 1024,
+        "busy_timeout": 5000,
+        "temp_store": "memory",
+    }
+    CACHE_TYPE: str = "blog.caching.backends.TwoTierCache"
     CACHE_DEFAULT_TIMEOUT: int = 300
+    CACHE_DIR: str = environ.get("CACHE_DIR", path.join(basedir, "../tmp/cache"))
+    CACHE_REDIS_URL: str | None = environ.get("CACHE_REDIS_URL", None)
+    CACHE_LOCAL_MAXSIZE: int = 512
+    CACHE_LOCAL_TIMEOUT: int = 60
+    CACHE_SYNC_INTERVAL: float = 1.0
 
 
 config = {
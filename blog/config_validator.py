@@ -2,6 +2,7 @@
 
 import logging
 import os
+import sqlite3
 from typing import Any
 
 logger = logging.getLogger(__name__)
@@ -80,11 +81,44 @@ def validate_config(config: dict[str, Any]) -> list[str]:  # pyright: ignore[rep
                 "Using NullCache in production. "
                 + "Consider using a proper cache implementation for better performance."
             )
+        if isinstance(db_uri, str) and db_uri.startswith("sqlite://"):
+            journal_mode = _sqlite_journal_mode(db_uri, config)
+            if journal_mode is not None and journal_mode != "wal":
+                warnings.append(
+                    f"SQLite database is in '{journal_mode}' journal mode. "
+                    + "Set journal_mode to 'wal' in SQLITE_PRAGMAS "
+                    + "so readers are not blocked by writers."
+                )
 
     logger.info("Configuration validation completed with %d warnings", len(warnings))
     return warnings
 
 
+def _sqlite_journal_mode(db_uri: str, config: dict[str, Any]) -> str | None:  # pyright: ignore[reportExplicitAny]
+    """Journal mode the SQLite database will run in, None for in-memory ones.
+
+    A mode set in ``SQLITE_PRAGMAS`` is applied on connect and wins,
+    otherwise the mode stored in an existing database file is used.
+    """
+    path = db_uri.removeprefix("sqlite://").removeprefix("/")
+    if not path or path == ":memory:":
+        return None
+    pragmas: dict[str, Any] = config.get("SQLITE_PRAGMAS") or {}  # pyright: ignore[reportExplicitAny]
+    if "journal_mode" in pragmas:
+        return str(pragmas["journal_mode"]).lower()
+    if not os.path.exists(path):
+        return "delete"
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            row = connection.execute("PRAGMA journal_mode").fetchone()
+        finally:
+            connection.close()
+    except sqlite3.Error:
+        return None
+    return str(row[0]).lower() if row else None
+
+
 def validate_required_configs(config: dict[str, Any], required_keys: list[str]) -> None:  # pyright: ignore[reportExplicitAny]
     """Validate that all required configuration keys are present.
 
@@ -1,11 +1,16 @@
 """Domain models for the Post entity."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import datetime
-import markdown
+import re
 
+from blog.domain.category import Category
+from blog.domain.tag import Tag
 
-MARKDOWN_EXTENSIONS = ["markdown.extensions.fenced_code"]
+from blog.infrastructure.markdown import (
+    is_rendering_current,
+    render_markdown,
+)
 
 
 @dataclass
@@ -18,9 +23,13 @@ class Post:
     content: str = ""
     createdon: datetime.datetime | None = None
     publishedon: datetime.datetime | None = None
+    updatedon: datetime.datetime | None = None
     category_id: int | None = None
     is_page: bool = False
     user_id: int | None = None
+    content_html: str | None = None
+    content_hash: str | None = None
+    renderer_version: str | None = None
 
     def __post_init__(self):
         if self.createdon is None:
@@ -28,4 +37,118 @@ class Post:
 
     @property
     def markdown(self):
-        return markdown.markdown(self.content or "", extensions=MARKDOWN_EXTENSIONS)
+        if self.content_html is not None and is_rendering_current(
+            self.content, self.content_hash, self.renderer_version
+        ):
+            return self.content_html
+        return render_markdown(self.content)
+
+
+@dataclass
+class PostSummary:
+    """Domain model for a post in lists, without its content."""
+
+    id: int | None = None
+    pagetitle: str = ""
+    alias: str = ""
+    publishedon: datetime.datetime | None = None
+    updatedon: datetime.datetime | None = None
+    category_id: int | None = None
+    is_page: bool = False
+
+
+@dataclass
+class PostPage:
+    """A post together with the tags and category its page shows."""
+
+    post: Post
+    tags: list[Tag] = field(default_factory=list)
+    category: Category | None = None
+
+
+@dataclass(frozen=True)
+class PostCursor:
+    """Position in a list of posts ordered by (publishedon, id), newest first.
+
+    Timestamps are encoded as stored, without a timezone, so a cursor
+    compares equal to the row it was taken from.
+    """
+
+    publishedon: datetime.datetime
+    id: int
+
+    _FORMAT = "%Y%m%d%H%M%S%f"
+    _PATTERN = re.compile(r"^(\d{20})-(\d+)$")
+
+    def encode(self) -> str:
+        return f"{self.publishedon.strftime(self._FORMAT)}-{self.id}"
+
+    @classmethod
+    def decode(cls, value: str) -> "PostCursor | None":
+        match = cls._PATTERN.match(value)
+        if match is None:
+            return None
+        try:
+            publishedon = datetime.datetime.strptime(match.group(1), cls._FORMAT)
+        except ValueError:
+            return None
+        cursor = cls(publishedon=publishedon, id=int(match.group(2)))
+        # One spelling per cursor, "0042" and "42" would be cached apart.
+        if cursor.encode() != value:
+            return None
+        return cursor
+
+
+@dataclass
+class PostYear:
+    """Published posts of one year, as lists show them under a heading."""
+
+    year: int
+    posts: list[PostSummary] = field(default_factory=list)
+
+
+@dataclass
+class PostSummaryPage:
+    """One page of post summaries and the cursor of the next page, if any."""
+
+    posts: list[PostSummary] = field(default_factory=list)
+    next_cursor: PostCursor | None = None
+
+    def by_year(self) -> list[PostYear]:
+        """Published posts of the page grouped by year, in page order.
+
+        Pages are ordered by publishedon, so a year is one run of posts.
+        """
+        years: list[PostYear] = []
+        for post in self.posts:
+            if post.publishedon is None:
+                continue
+            if not years or years[-1].year != post.publishedon.year:
+                years.append(PostYear(post.publishedon.year))
+            years[-1].posts.append(post)
+        return years
+
+
+@dataclass(frozen=True)
+class ArchiveMonth:
+    """Number of posts published in a month."""
+
+    year: int
+    month: int
+    post_count: int
+
+    @property
+    def date(self) -> datetime.date:
+        return datetime.date(self.year, self.month, 1)
+
+
+@dataclass
+class ArchiveYear:
+    """Months of a year with published posts, newest first."""
+
+    year: int
+    months: list[ArchiveMonth] = field(default_factory=list)
+
+    @property
+    def post_count(self) -> int:
+        return sum(month.post_count for month in self.months)
@@ -0,0 +1,27 @@
+"""Domain models for full-text search."""
+
+from dataclasses import dataclass, field
+
+from blog.domain.post import PostSummary
+
+
+@dataclass
+class SearchHit:
+    """A post matching a search, with the matching text around its hits.
+
+    ``snippet`` is escaped HTML, matches are wrapped in ``<mark>``.
+    """
+
+    post: PostSummary
+    snippet: str = ""
+    rank: float = 0.0
+
+
+@dataclass
+class SearchPage:
+    """One page of search results, best matches first."""
+
+    query: str = ""
+    hits: list[SearchHit] = field(default_factory=list)
+    page: int = 1
+    has_next: bool = False
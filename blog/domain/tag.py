@@ -15,3 +15,13 @@ class Tag:
     @override
     def __str__(self):
         return f"{self.title}"
+
+
+@dataclass
+class TagCount:
+    """A tag with the number of published posts carrying it."""
+
+    id: int | None = None
+    title: str = ""
+    alias: str = ""
+    post_count: int = 0
@@ -0,0 +1,72 @@
+"""Content change events.
+
+Services and the admin views send these signals after content changes.
+Each signal carries a ``ContentChange`` describing the aliases touched by
+the change, so subscribers such as cache invalidation can react without
+querying the database again.
+
+A signal is only sent once the change is committed: a subscriber that
+purges a page before the commit lets a concurrent request cache the old
+rows again, for as long as the view cache keeps pages. Services queue
+their changes with ``send_on_commit``; the admin views send theirs from
+``after_model_change``, which runs after Flask-Admin committed.
+"""
+
+from dataclasses import dataclass
+from typing import TypeVar
+
+import sqlalchemy as sa
+from blinker import Namespace, Signal
+from sqlalchemy.orm import Session, scoped_session
+
+content_signals = Namespace()
+
+post_changed = content_signals.signal("post-changed")
+tag_changed = content_signals.signal("tag-changed")
+category_changed = content_signals.signal("category-changed")
+icon_changed = content_signals.signal("icon-changed")
+
+
+@dataclass(frozen=True)
+class ContentChange:
+    """Aliases affected by a content change, old and new values included."""
+
+    action: str
+    post_aliases: frozenset[str] = frozenset()
+    tag_aliases: frozenset[str] = frozenset()
+
+
+_S = TypeVar("_S", bound=Session)
+
+# Key of the changes waiting for the commit in ``Session.info``.
+_PENDING = "pending_content_changes"
+
+
+def send_on_commit(
+    session: Session | scoped_session[_S],
+    signal: Signal,
+    sender: object,
+    change: ContentChange,
+) -> None:
+    """Send ``signal`` once the transaction of ``session`` commits.
+
+    The change is dropped if the transaction rolls back instead.
+    """
+    session.info.setdefault(_PENDING, []).append((signal, sender, change))
+
+
+def _send_pending(session: Session) -> None:
+    pending: list[tuple[Signal, object, ContentChange]] = session.info.pop(_PENDING, [])
+    for signal, sender, change in pending:
+        signal.send(sender, change=change)
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def connect_commit_events(session: scoped_session[_S]) -> None:
+    """Send the changes queued on the sessions of ``session`` at commit."""
+    if not sa.event.contains(session, "after_commit", _send_pending):
+        sa.event.listen(session, "after_commit", _send_pending)
+        sa.event.listen(session, "after_rollback", _discard_pending)
@@ -0,0 +1,282 @@
+"""Static export of the blog.
+
+Every public page is rendered through the application itself, so the
+exported files are byte for byte what the server would answer. Pages
+that are also requested by HTMX get their fragment written next to the
+full page (``index.htmx`` beside ``index.html``), a web server can pick
+one by the ``HX-Request`` header.
+
+The export is built in a staging directory next to the output directory
+and swapped in only once every page rendered, a failed export leaves
+the previous one untouched. An incremental export copies the pages of
+posts that did not change since the previous export instead of
+rendering them again.
+"""
+
+import datetime
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import TYPE_CHECKING
+
+from flask import current_app
+
+from blog.domain.post import PostCursor, PostSummaryPage
+from blog.services.factory import ServiceFactory
+
+if TYPE_CHECKING:
+    from flask import Flask
+    from flask.testing import FlaskClient
+
+
+# Written into the export, holds the time the export started.
+EXPORT_STATE = ".exported-at"
+
+
+@dataclass(frozen=True)
+class ExportPage:
+    """A page to export: its URL path and whether it is the HTMX fragment.
+
+    ``post_alias`` is set for the pages of a single post, which only
+    change when the post does.
+    """
+
+    path: str
+    htmx: bool = False
+    post_alias: str | None = None
+
+    @property
+    def filename(self) -> str:
+        """Relative output file for the page."""
+        relative = self.path.strip("/")
+        if os.path.splitext(relative)[1]:
+            return relative
+        name = "index.htmx" if self.htmx else "index.html"
+        return os.path.join(relative, name)
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    page: ExportPage
+    status: int
+    body: bytes
+    seconds: float
+
+
+class ExportError(Exception):
+    """Raised when a page cannot be exported."""
+
+    pass
+
+
+def collect_pages() -> list[ExportPage]:
+    """List every public page, needs an application context."""
+    post_service = ServiceFactory.create_post_service()
+    tag_service = ServiceFactory.create_tag_service()
+
+    adapter = current_app.url_map.bind("")
+    pages = [
+        ExportPage(adapter.build(endpoint))
+        for endpoint in (
+            "post.index",
+            "post.posts",
+            "post.pages_hx",
+            "post.icons_hx",
+            "tags.cloud_hx",
+            "post.rss",
+            "post.robots",
+            "flask_sitemap.sitemap",
+        )
+    ]
+    # Posts, tags and the tag index are also loaded as HTMX fragments.
+    content = [
+        *post_service.get_all_published_summaries(),
+        *post_service.get_page_summaries(),
+    ]
+    per_page = int(current_app.config["POSTS_PER_PAGE"])
+    for cursor in _cursors(
+        lambda after: post_service.get_published_summaries_page(per_page, after)
+    ):
+        pages.append(ExportPage(adapter.build("post.posts_after", {"cursor": cursor})))
+
+    fragment_pages: dict[str, str | None] = {
+        adapter.build("tags.index"): None,
+        adapter.build("archive.index"): None,
+    }
+    for year in post_service.get_archive():
+        periods = [(year.year, None), *((m.year, m.month) for m in year.months)]
+        for year_number, month in periods:
+            values = {"year": year_number}
+            if month is not None:
+                values["month"] = month
+            endpoint = "archive.month" if month else "archive.year"
+            fragment_pages[adapter.build(endpoint, values)] = None
+            for cursor in _cursors(
+                lambda after: post_service.get_archive_page(
+                    year_number, month, per_page, after
+                )
+            ):
+                fragment_pages[
+                    adapter.build(endpoint + "_after", {**values, "cursor": cursor})
+                ] = None
+    for post in content:
+        fragment_pages[adapter.build("post.view", {"alias": post.alias})] = post.alias
+    for tag in tag_service.get_all_tags():
+        fragment_pages[adapter.build("tags.view", {"alias": tag.alias})] = None
+        tag_id = tag.id or 0
+        for cursor in _cursors(
+            lambda after: post_service.get_summaries_page_by_tag(
+                tag_id, per_page, after
+            )
+        ):
+            values = {"alias": tag.alias, "cursor": cursor}
+            fragment_pages[adapter.build("tags.view_after", values)] = None
+    for path, post_alias in fragment_pages.items():
+        pages.append(ExportPage(path, post_alias=post_alias))
+        pages.append(ExportPage(path, htmx=True, post_alias=post_alias))
+    return pages
+
+
+def _cursors(
+    fetch: Callable[[PostCursor | None], PostSummaryPage],
+) -> Iterator[str]:
+    """Encoded cursors of every page after the first one."""
+    cursor = fetch(None).next_cursor
+    while cursor is not None:
+        yield cursor.encode()
+        cursor = fetch(cursor).next_cursor
+
+
+def read_export_time(output_dir: str) -> datetime.datetime | None:
+    """Return when the export in ``output_dir`` started, if there is one."""
+    try:
+        with open(os.path.join(output_dir, EXPORT_STATE)) as f:
+            return datetime.datetime.fromisoformat(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def reusable_pages(
+    output_dir: str, pages: list[ExportPage], changed_aliases: set[str]
+) -> list[ExportPage]:
+    """Pages of unchanged posts that the previous export already holds."""
+    return [
+        page
+        for page in pages
+        if page.post_alias is not None
+        and page.post_alias not in changed_aliases
+        and os.path.isfile(os.path.join(output_dir, page.filename))
+    ]
+
+
+def render_page(client: "FlaskClient", page: ExportPage, base_url: str) -> RenderedPage:
+    headers = {"HX-Request": "true"} if page.htmx else {}
+    started = time.perf_counter()
+    response = client.get(page.path, base_url=base_url, headers=headers)
+    seconds = time.perf_counter() - started
+    return RenderedPage(page, response.status_code, response.get_data(), seconds)
+
+
+# Application of a pool worker process, created once by _init_worker.
+_worker_app: "Flask | None" = None
+
+
+def _init_worker() -> None:
+    global _worker_app
+    from blog import create_app
+
+    _worker_app = create_app()
+
+
+def _render_in_worker(page: ExportPage, base_url: str) -> RenderedPage:
+    assert _worker_app is not None
+    return render_page(_worker_app.test_client(), page, base_url)
+
+
+def render_pages(
+    app: "Flask", pages: list[ExportPage], base_url: str, jobs: int = 1
+) -> Iterator[RenderedPage]:
+    """Render pages in this process, or across ``jobs`` worker processes.
+
+    Worker processes create their own application from the environment,
+    so they only see a database that is not private to this process.
+    """
+    if jobs <= 1:
+        client = app.test_client()
+        for page in pages:
+            yield render_page(client, page, base_url)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=get_context("spawn"), initializer=_init_worker
+    ) as pool:
+        chunksize = max(1, len(pages) // (jobs * 4))
+        yield from pool.map(
+            _render_in_worker, pages, [base_url] * len(pages), chunksize=chunksize
+        )
+
+
+def write_export(
+    output_dir: str,
+    rendered: Iterable[RenderedPage],
+    reused: Iterable[ExportPage] = (),
+    started: datetime.datetime | None = None,
+) -> list[RenderedPage]:
+    """Write rendered pages to a staging directory and swap it in.
+
+    Args:
+        output_dir: Directory that receives the export
+        rendered: Freshly rendered pages
+        reused: Pages copied from the current contents of ``output_dir``
+        started: Time the export started, recorded for incremental exports
+
+    Raises:
+        ExportError: If a page did not render successfully
+    """
+    output_dir = os.path.abspath(output_dir)
+    parent = os.path.dirname(output_dir)
+    os.makedirs(parent, exist_ok=True)
+    prefix = ".{}-".format(os.path.basename(output_dir))
+    staging = tempfile.mkdtemp(prefix=prefix, dir=parent)
+    written: list[RenderedPage] = []
+    try:
+        for result in rendered:
+            if result.status != 200:
+                raise ExportError(
+                    "{} answered {}".format(result.page.path, result.status)
+                )
+            target = os.path.join(staging, result.page.filename)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(result.body)
+            written.append(result)
+        for page in reused:
+            target = os.path.join(staging, page.filename)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(os.path.join(output_dir, page.filename), target)
+        if started is not None:
+            with open(os.path.join(staging, EXPORT_STATE), "w") as f:
+                f.write(started.isoformat())
+        os.chmod(staging, 0o755)
+        _swap(staging, output_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return written
+
+
+def _swap(staging: str, output_dir: str) -> None:
+    # Both renames stay on one filesystem; readers see either the old or
+    # the new tree, apart from the instant between the two renames.
+    if not os.path.exists(output_dir):
+        os.rename(staging, output_dir)
+        return
+    previous = staging + ".old"
+    os.rename(output_dir, previous)
+    os.rename(staging, output_dir)
+    shutil.rmtree(previous, ignore_errors=True)
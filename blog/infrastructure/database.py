@@ -9,14 +9,19 @@ from sqlalchemy import (
     Table,
     Column,
     Integer,
+    SmallInteger,
     String,
+    Float,
     Text,
     DateTime,
     ForeignKey,
     Boolean,
+    Index,
 )
 from sqlalchemy.sql.schema import MetaData
 
+from blog.infrastructure.search import install_search_ddl
+
 
 # Table definitions (Infrastructure layer)
 def get_users_table(metadata: "MetaData") -> Table:
@@ -33,19 +38,29 @@ def get_users_table(metadata: "MetaData") -> Table:
 
 
 def get_posts_table(metadata: MetaData) -> Table:
-    return Table(
+    table = Table(
         "posts",
         metadata,
         Column("id", Integer, primary_key=True),
         Column("pagetitle", String(255), nullable=False),
         Column("alias", String(255), nullable=False, unique=True),
         Column("content", Text),
+        Column("content_html", Text, nullable=True),
+        Column("content_hash", String(64), nullable=True),
+        Column("renderer_version", String(32), nullable=True),
         Column("createdon", DateTime(timezone=True)),
         Column("publishedon", DateTime(timezone=True)),
+        Column("updatedon", DateTime(timezone=True), nullable=True, index=True),
         Column("category_id", Integer, ForeignKey("categories.id"), nullable=True),
         Column("user_id", Integer, ForeignKey("users.id"), nullable=True),
+        # Keyset pagination and every published list order by this pair
+        Index("ix_posts_publishedon_id", "publishedon", "id"),
+        # Posts of a category, or outside categories, in published order
+        Index("ix_posts_category_id_publishedon", "category_id", "publishedon", "id"),
         extend_existing=True,
     )
+    install_search_ddl(table)
+    return table
 
 
 def get_categories_table(metadata: MetaData) -> Table:
@@ -73,10 +88,46 @@ def get_tags_table(metadata: MetaData) -> Table:
 
 
 def get_posts_tags_table(metadata: MetaData) -> Table:
+    # Both sides of the posts <-> tags relationship ask for this table,
+    # defining it twice would add its index twice.
+    if "posts_tags" in metadata.tables:
+        return metadata.tables["posts_tags"]
     return Table(
         "posts_tags",
         metadata,
-        Column("post_id", Integer, ForeignKey("posts.id")),
-        Column("tag_id", Integer, ForeignKey("tags.id")),
+        Column("post_id", Integer, ForeignKey("posts.id"), primary_key=True),
+        Column("tag_id", Integer, ForeignKey("tags.id"), primary_key=True),
+        # The primary key serves lookups by post, this one lookups by tag
+        Index("ix_posts_tags_tag_id", "tag_id", "post_id"),
+        extend_existing=True,
+    )
+
+
+def get_related_posts_table(metadata: MetaData) -> Table:
+    # Only the best few related posts of every post, rebuilt in bulk by
+    # PostRepository.rebuild_related_posts. Defined once, like posts_tags.
+    if "related_posts" in metadata.tables:
+        return metadata.tables["related_posts"]
+    return Table(
+        "related_posts",
+        metadata,
+        Column(
+            "post_id",
+            Integer,
+            ForeignKey("posts.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        Column("position", SmallInteger, primary_key=True),
+        # Left NULL when the related post is deleted, so the next rebuild
+        # sees the list changed and the page listing it is refreshed.
+        Column(
+            "related_id",
+            Integer,
+            ForeignKey("posts.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        Column("score", Float, nullable=False),
+        # Finds the posts listing a post, whose pages change with it
+        Index("ix_related_posts_related_id", "related_id"),
         extend_existing=True,
     )
@@ -0,0 +1,354 @@
+"""Markdown rendering (Infrastructure).
+
+This module is the single place that knows how post content is turned
+into HTML. The rendered HTML is persisted next to the post content and
+is keyed by a content hash and a renderer version, so changing the
+extensions below invalidates every stored rendering.
+"""
+
+import hashlib
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import TYPE_CHECKING, Any, Protocol
+
+import markdown
+import pygments
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+
+MARKDOWN_EXTENSIONS = [
+    "markdown.extensions.fenced_code",
+    "markdown.extensions.codehilite",
+]
+# Fenced code is highlighted by Pygments when rendered, pages need no
+# script for it. Code without a language is left plain, guessing is slow
+# and often wrong; the stylesheet targets the "highlight" class.
+MARKDOWN_EXTENSION_CONFIGS: dict[str, dict[str, Any]] = {  # pyright: ignore[reportExplicitAny]
+    "markdown.extensions.codehilite": {"css_class": "highlight", "guess_lang": False},
+}
+
+
+def _renderer_version() -> str:
+    signature = "|".join(
+        [
+            markdown.__version__,
+            pygments.__version__,
+            *MARKDOWN_EXTENSIONS,
+            repr(sorted(MARKDOWN_EXTENSION_CONFIGS.items())),
+        ]
+    )
+    return hashlib.sha256(signature.encode()).hexdigest()[:16]
+
+
+RENDERER_VERSION = _renderer_version()
+
+
+def content_hash(content: str | None) -> str:
+    """Return the hex digest used to key a stored rendering."""
+    return hashlib.sha256((content or "").encode()).hexdigest()
+
+
+class MarkdownPool:
+    """Reusable ``Markdown`` instances.
+
+    Building an instance loads its extensions and sets up every
+    processor, which costs more than converting a short text. A render
+    takes an idle instance, or builds one, and gives it back reset.
+
+    An instance keeps parser state while it converts, so it is never
+    shared. ``convert`` does no I/O and never yields to another greenlet,
+    and ``list.pop`` and ``list.append`` are atomic, so no lock is taken.
+    """
+
+    def __init__(
+        self,
+        extensions: list[str],
+        max_idle: int = 16,
+        extension_configs: dict[str, dict[str, Any]] | None = None,  # pyright: ignore[reportExplicitAny]
+    ):
+        self.extensions = extensions
+        self.extension_configs = extension_configs or {}
+        self.max_idle = max_idle
+        self._idle: list[markdown.Markdown] = []
+
+    def render(self, content: str) -> str:
+        try:
+            md = self._idle.pop()
+        except IndexError:
+            md = markdown.Markdown(
+                extensions=self.extensions, extension_configs=self.extension_configs
+            )
+        try:
+            return md.convert(content)
+        finally:
+            md.reset()
+            if len(self._idle) < self.max_idle:
+                self._idle.append(md)
+
+
+_pool = MarkdownPool(MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+
+
+class RenderError(Exception):
+    """Raised when a text could not be rendered by a worker process."""
+
+    pass
+
+
+class RenderTimeout(RenderError):
+    """Raised when a rendering did not finish, or start, in time."""
+
+    pass
+
+
+def _render_in_worker(content: str) -> str:
+    return _pool.render(content)
+
+
+class RenderExecutor:
+    """Renders large texts in a bounded pool of worker processes.
+
+    Rendering is pure CPU: in a gevent worker a long article stops every
+    other greenlet until it is converted. Texts up to ``inline_limit``
+    characters render in place, where a pool round trip would cost more
+    than the render; larger ones are sent to ``workers`` processes while
+    the greenlet waits cooperatively.
+
+    At most twice ``workers`` renders are in flight, so a flood of huge
+    previews queues up instead of piling work on the pool. A render that
+    runs past ``timeout`` cannot be cancelled: its processes are stopped,
+    failing the renders they run along with it, so the slots and the CPU
+    come back. The pool is started on the first large render, in the
+    process that renders, never before gunicorn forks.
+    """
+
+    def __init__(self, inline_limit: int, workers: int, timeout: float):
+        self.inline_limit = inline_limit
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max(1, workers * 2))
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+
+    def render(self, content: str) -> str:
+        """Render ``content`` to HTML.
+
+        Raises:
+            RenderTimeout: If the render did not start or finish in time
+            RenderError: If the worker process died
+        """
+        if self.workers < 1 or len(content) <= self.inline_limit:
+            return _pool.render(content)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise RenderTimeout("Too many renders in progress")
+        try:
+            future = self._get_executor().submit(_render_in_worker, content)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the future is done: finished, cancelled
+        # or failed by a stopped pool.
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError as e:
+            if not future.cancel():
+                # Already running, only stopping its process ends it.
+                self._terminate_executor()
+            raise RenderTimeout(
+                "Rendering took more than {} s".format(self.timeout)
+            ) from e
+        except BrokenProcessPool as e:
+            self._reset_executor()
+            raise RenderError("Rendering worker died") from e
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, a later render starts new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def _release(self, _future: Future[str]) -> None:
+        self._slots.release()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, forking a process running a gevent hub is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _terminate_executor(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # The pool has no public way to stop a running task before
+        # Python 3.14, its futures fail with BrokenProcessPool.
+        processes = list((executor._processes or {}).values())
+        for process in processes:
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Set up by configure_markdown; worker processes leave it unset and
+# render inline.
+_executor: RenderExecutor | None = None
+
+
+def render_markdown(content: str | None) -> str:
+    """Render markdown content to HTML.
+
+    Raises:
+        RenderError: If a large text could not be rendered in time
+    """
+    if _executor is None:
+        return _pool.render(content or "")
+    return _executor.render(content or "")
+
+
+def configure_markdown(app: "Flask") -> None:
+    """Send large renders to worker processes, per ``MARKDOWN_*`` config."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+    _executor = RenderExecutor(
+        inline_limit=app.config["MARKDOWN_INLINE_LIMIT"],
+        workers=app.config["MARKDOWN_RENDER_WORKERS"],
+        timeout=app.config["MARKDOWN_RENDER_TIMEOUT"],
+    )
+
+
+def is_rendering_current(
+    content: str | None, stored_hash: str | None, stored_version: str | None
+) -> bool:
+    """Check whether a stored rendering still matches content and renderer."""
+    return stored_version == RENDERER_VERSION and stored_hash == content_hash(content)
+
+
+# Incremental preview. A document is split into top-level blocks that
+# render the same alone as within the document; only blocks the editor
+# does not show yet are rendered, each cached by the hash of its source.
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_HTML_OPEN = re.compile(r"^<([a-zA-Z][a-zA-Z0-9-]*)[\s>/]")
+_LIST_ITEM = re.compile(r"^ {0,3}([*+-]|\d+[.)])\s")
+_REFERENCE = re.compile(r"^ {0,3}\[[^\]]+\]:\s*\S")
+
+
+class BlockCache(Protocol):
+    def get(self, key: str) -> Any: ...  # pyright: ignore[reportExplicitAny]
+
+    def set(self, key: str, value: Any, timeout: float) -> Any: ...  # pyright: ignore[reportExplicitAny]
+
+
+@dataclass(frozen=True)
+class PreviewBlock:
+    """A top-level block of a preview.
+
+    ``id`` is stable while the block source does not change; ``html`` is
+    None for blocks the editor already shows.
+    """
+
+    id: str
+    html: str | None
+
+
+def split_blocks(text: str) -> list[str]:
+    """Split markdown into top-level blocks separated by blank lines.
+
+    Blank lines inside fenced code and raw HTML blocks do not split, and
+    a block continuing the previous one (indented content, the next item
+    of a loose list) is merged into it. Merging is always safe, splitting
+    is only done where it cannot change the output.
+    """
+    blocks: list[list[str]] = []
+    current: list[str] = []
+    fence: str | None = None
+    html_tag: str | None = None
+    for line in text.splitlines():
+        if fence is not None:
+            current.append(line)
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            continue
+        if html_tag is not None:
+            current.append(line)
+            if "</{}>".format(html_tag) in line:
+                html_tag = None
+            continue
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = []
+            continue
+        if not current and blocks and _continues(blocks[-1], line):
+            current = [*blocks.pop(), ""]
+        match = _FENCE.match(line)
+        if match:
+            fence = match.group(1)
+        elif not current:
+            match = _HTML_OPEN.match(line)
+            if match and "</{}>".format(match.group(1)) not in line:
+                html_tag = match.group(1)
+        current.append(line)
+    if current:
+        blocks.append(current)
+    return ["\n".join(block) for block in blocks]
+
+
+def _continues(previous: list[str], line: str) -> bool:
+    if line.startswith(("    ", "\t")):
+        return True
+    return bool(_LIST_ITEM.match(line) and _LIST_ITEM.match(previous[0]))
+
+
+def render_blocks(text: str, shown: set[str], cache: BlockCache) -> list[PreviewBlock]:
+    """Render the blocks of ``text`` the editor does not show yet.
+
+    Args:
+        text: The whole document
+        shown: Ids of the blocks the editor currently shows
+        cache: Rendered blocks by source hash, shared between requests
+    """
+    blocks = split_blocks(text)
+    # Reference links resolve across blocks, every block gets them all.
+    references = "\n".join(
+        line
+        for block in blocks
+        for line in block.splitlines()
+        if _REFERENCE.match(line)
+    )
+    preview: list[PreviewBlock] = []
+    occurrences: dict[str, int] = {}
+    for block in blocks:
+        source = block + "\n\n" + references if references else block
+        digest = content_hash(source)
+        # Identical blocks, e.g. two rules, need ids of their own.
+        occurrence = occurrences[digest] = occurrences.get(digest, 0) + 1
+        block_id = "md-{}-{}".format(digest[:16], occurrence)
+        if block_id in shown:
+            preview.append(PreviewBlock(block_id, None))
+            continue
+        html = cache.get(digest)
+        if html is None:
+            html = render_markdown(source)
+            cache.set(digest, html, 0)
+        preview.append(PreviewBlock(block_id, html))
+    return preview
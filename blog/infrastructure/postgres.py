@@ -0,0 +1,72 @@
+"""PostgreSQL connection handling for gevent workers.
+
+psycopg2 waits for the server inside libpq, which gevent cannot switch
+away from: one slow query stalls every greenlet of the worker. A wait
+callback hands those waits to the gevent hub instead. The pool is sized
+from the config, and engines inherited from the gunicorn master are
+dropped in every forked worker so processes never share a socket.
+"""
+
+from typing import Any
+
+from flask import Flask
+
+from blog.extensions import db
+
+
+def is_postgres(database_uri: str | None) -> bool:
+    return bool(database_uri) and str(database_uri).startswith(
+        ("postgresql://", "postgresql+psycopg2://", "postgres://")
+    )
+
+
+def engine_options(config: dict[str, Any]) -> dict[str, Any]:  # pyright: ignore[reportExplicitAny]
+    """Pool settings for a PostgreSQL engine, merged over explicit options."""
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+
+
+def configure_postgres(app: Flask) -> None:
+    """Size the connection pool, must run before ``db.init_app``."""
+    if is_postgres(app.config.get("SQLALCHEMY_DATABASE_URI")):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+
+
+def gevent_wait_callback(conn: Any, timeout: float | None = None) -> None:  # pyright: ignore[reportExplicitAny]
+    """Wait for a psycopg2 connection by yielding to the gevent hub."""
+    import psycopg2.extensions
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            break
+        elif state == psycopg2.extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError("Bad result from poll: {}".format(state))
+
+
+def make_psycopg_green() -> None:
+    """Make psycopg2 cooperative with gevent, for the whole process."""
+    import psycopg2.extensions
+
+    psycopg2.extensions.set_wait_callback(gevent_wait_callback)
+
+
+def dispose_engines(app: Flask) -> None:
+    """Forget pooled connections inherited from the parent process.
+
+    The connections stay open for the parent, the child opens its own.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
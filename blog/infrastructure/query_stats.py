@@ -0,0 +1,148 @@
+"""Per-request SQL statement counting.
+
+Engine events of the ``db`` extension record every statement, and how
+long it took, into the active ``QueryStats`` collectors. Each request
+gets one; when it issued more than ``QUERY_BUDGET`` statements, or ran
+the same statement ``QUERY_REPEAT_LIMIT`` times or more (usually an N+1
+lazy load in a loop), a warning with the offending statements is
+logged. Tests open their own collector with ``collect_queries``.
+"""
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+import sqlalchemy as sa
+from sqlalchemy.engine.interfaces import DBAPICursor, ExecutionContext
+from flask import Flask, current_app, g, request
+
+from blog.extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    """Statements issued while a collector was active."""
+
+    statements: int = 0
+    seconds: float = 0.0
+    counts: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements += 1
+        self.seconds += seconds
+        self.counts[statement] += 1
+
+    def repeated(self, limit: int) -> list[tuple[str, int]]:
+        """Statements issued at least ``limit`` times, most repeated first."""
+        return [
+            (statement, count)
+            for statement, count in self.counts.most_common()
+            if count >= limit
+        ]
+
+    def report(self) -> str:
+        """Every statement with its count, for warnings and test failures."""
+        lines = [
+            "{} statement(s) in {:.1f} ms".format(self.statements, self.seconds * 1000)
+        ]
+        for statement, count in self.counts.most_common():
+            lines.append("{:4d} x {}".format(count, " ".join(statement.split())))
+        return "\n".join(lines)
+
+
+# Start times of the statements in flight. Keyed by execution context, a
+# failing statement takes its entry along instead of leaving it on the
+# pooled connection.
+_started: WeakKeyDictionary[ExecutionContext, float] = WeakKeyDictionary()
+
+# Collectors of the current request, or test, nested ones included.
+_collectors: ContextVar[tuple[QueryStats, ...]] = ContextVar(
+    "query_collectors", default=()
+)
+
+
+@contextmanager
+def collect_queries() -> Generator[QueryStats, None, None]:
+    """Count the statements issued inside the block."""
+    stats = QueryStats()
+    token = _collectors.set((*_collectors.get(), stats))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+def install_query_stats(engine: sa.Engine) -> None:
+    """Record the statements of ``engine`` into the active collectors."""
+
+    def before(
+        _conn: sa.Connection,
+        _cursor: DBAPICursor,
+        _statement: str,
+        _parameters: object,
+        context: ExecutionContext | None,
+        _executemany: bool,
+    ) -> None:
+        if context is not None:
+            _started[context] = time.perf_counter()
+
+    def after(
+        _conn: sa.Connection,
+        _cursor: DBAPICursor,
+        statement: str,
+        _parameters: object,
+        context: ExecutionContext | None,
+        _executemany: bool,
+    ) -> None:
+        started = _started.pop(context, None) if context is not None else None
+        seconds = time.perf_counter() - started if started is not None else 0.0
+        for stats in _collectors.get():
+            stats.record(statement, seconds)
+
+    sa.event.listen(engine, "before_cursor_execute", before)
+    sa.event.listen(engine, "after_cursor_execute", after)
+
+
+def _start_request() -> None:
+    g.query_stats = QueryStats()
+    g.query_stats_token = _collectors.set((*_collectors.get(), g.query_stats))
+
+
+def _check_budget(_exc: BaseException | None) -> None:
+    stats: QueryStats | None = g.pop("query_stats", None)
+    token = g.pop("query_stats_token", None)
+    if token is not None:
+        _collectors.reset(token)
+    if stats is None:
+        return
+
+    budget = int(current_app.config["QUERY_BUDGET"])
+    repeated = stats.repeated(current_app.config["QUERY_REPEAT_LIMIT"])
+    if stats.statements > budget or repeated:
+        logger.warning(
+            "%s %s: %d statement(s) for a budget of %d, %d repeated\n%s",
+            request.method,
+            request.path,
+            stats.statements,
+            budget,
+            len(repeated),
+            stats.report(),
+        )
+
+
+def configure_query_stats(app: Flask) -> None:
+    """Count statements per request, unless ``QUERY_BUDGET`` is None."""
+    if app.config.get("QUERY_BUDGET") is None:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            install_query_stats(engine)
+    app.before_request(_start_request)
+    app.teardown_request(_check_budget)
@@ -0,0 +1,49 @@
+"""In-process rate limiting.
+
+Token buckets live in the memory of one worker process: with several
+gunicorn workers a client gets the configured rate from each of them.
+That is enough to keep a single client from pinning the CPU of a small
+box, without a shared store.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class TokenBucketLimiter:
+    """One token bucket per key, refilled at ``rate`` tokens per second.
+
+    A key may spend up to ``burst`` tokens at once. Buckets of the least
+    recently seen keys are dropped beyond ``max_keys``, a dropped key
+    starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10_000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # key -> (tokens, time of the last refill)
+        self._buckets: OrderedDict[Hashable, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token from the bucket of ``key``.
+
+        Returns 0 when a token was taken, otherwise the seconds until one
+        is available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
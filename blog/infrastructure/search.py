@@ -0,0 +1,260 @@
+"""Full-text index of posts.
+
+Each database gets the index it does best, behind one ``SearchIndex``
+interface:
+
+* SQLite keeps an FTS5 table, ``posts_search``, filled by triggers on
+  ``posts``. It stores the ``updatedon`` of every row it indexed, so an
+  incremental reindex finds the rows that went stale.
+* PostgreSQL keeps a weighted ``tsvector`` in ``posts.search_vector``,
+  filled by a trigger and served by a GIN index.
+
+The DDL runs with ``metadata.create_all`` and from the migration, so
+the index exists wherever the ``posts`` table does. A SQLite migration
+that recreates ``posts`` (``batch_alter_table``) drops its triggers and
+has to run ``create_ddl`` again; the migration tests fail until it does.
+Autogenerate skips these objects, see ``include_object`` in
+``migrations/env.py``.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, override
+
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from markupsafe import Markup, escape
+
+# Text search configuration of PostgreSQL, the blog is in Russian.
+SEARCH_LANGUAGE = "russian"
+# Terms of a query beyond this are ignored.
+MAX_TERMS = 8
+
+# Snippet highlight markers, replaced by <mark> once the text is escaped.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_STOP = "\x03"
+
+
+def query_terms(query: str) -> list[str]:
+    """Words of a user query, without any search operator syntax."""
+    return re.findall(r"[^\W_]+", query.lower())[:MAX_TERMS]
+
+
+def highlight(snippet: str | None) -> str:
+    """HTML of a snippet, with its matches in ``<mark>``."""
+    html = str(escape(snippet or ""))
+    html = html.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+    return Markup(html)
+
+
+@dataclass(frozen=True)
+class SearchClauses:
+    """What a search query needs from the index.
+
+    Attributes:
+        source: Selectable to join ``posts`` with, or None
+        post_id: Column holding the id of the post a match is for
+        condition: Filter keeping matching posts
+        rank: Sort key, best matches first when sorted ascending
+        snippet: Text around the matches, with highlight markers
+    """
+
+    source: sa.FromClause | None
+    post_id: sa.ColumnElement[int]
+    condition: sa.ColumnElement[bool]
+    rank: sa.ColumnElement[Any]  # pyright: ignore[reportExplicitAny]
+    snippet: sa.ColumnElement[Any]  # pyright: ignore[reportExplicitAny]
+
+
+class SearchIndex(ABC):
+    """Full-text index of the ``posts`` table for one database dialect."""
+
+    dialect: str = ""
+
+    @abstractmethod
+    def create_ddl(self) -> list[str]:
+        """Statements creating the index, run after ``posts`` is created."""
+        pass
+
+    @abstractmethod
+    def drop_ddl(self) -> list[str]:
+        """Statements dropping what ``posts`` does not take along."""
+        pass
+
+    @abstractmethod
+    def match(self, posts: sa.Table, terms: list[str]) -> SearchClauses:
+        """Clauses matching and ranking posts for ``terms``."""
+        pass
+
+    @abstractmethod
+    def reindex(self, connection: sa.Connection, full: bool = False) -> int:
+        """Bring the index up to date, returns the number of rows indexed.
+
+        Without ``full`` only rows missing from the index or changed
+        since they were indexed are indexed again.
+        """
+        pass
+
+
+class SqliteSearchIndex(SearchIndex):
+    dialect = "sqlite"
+
+    table = sa.table(
+        "posts_search",
+        sa.column("rowid", sa.Integer),
+        sa.column("pagetitle", sa.String),
+        sa.column("content", sa.Text),
+        sa.column("updatedon", sa.String),
+    )
+
+    _columns = "rowid, pagetitle, content, updatedon"
+    _values = "{row}.id, {row}.pagetitle, coalesce({row}.content, ''), {row}.updatedon"
+
+    @override
+    def create_ddl(self) -> list[str]:
+        values = self._values.format(row="new")
+        return [
+            # remove_diacritics folds ё into е, as readers type it.
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_search USING fts5("
+            + "pagetitle, content, updatedon UNINDEXED, "
+            + "tokenize = 'unicode61 remove_diacritics 2')",
+            "CREATE TRIGGER IF NOT EXISTS posts_search_insert "
+            + "AFTER INSERT ON posts BEGIN "
+            + f"INSERT INTO posts_search ({self._columns}) VALUES ({values}); END",
+            "CREATE TRIGGER IF NOT EXISTS posts_search_update "
+            + "AFTER UPDATE OF pagetitle, content, updatedon ON posts BEGIN "
+            + "DELETE FROM posts_search WHERE rowid = old.id; "
+            + f"INSERT INTO posts_search ({self._columns}) VALUES ({values}); END",
+            "CREATE TRIGGER IF NOT EXISTS posts_search_delete "
+            + "AFTER DELETE ON posts BEGIN "
+            + "DELETE FROM posts_search WHERE rowid = old.id; END",
+        ]
+
+    @override
+    def drop_ddl(self) -> list[str]:
+        return ["DROP TABLE IF EXISTS posts_search"]
+
+    @override
+    def match(self, posts: sa.Table, terms: list[str]) -> SearchClauses:
+        # Every term must match, as a prefix so "кэш" finds "кэширование".
+        expression = " ".join('"{}"*'.format(term) for term in terms)
+        fts = sa.literal_column("posts_search", sa.Text())
+        return SearchClauses(
+            source=self.table,
+            post_id=self.table.c.rowid,
+            condition=fts.op("MATCH")(expression),
+            # bm25 is negative, lower is better; titles weigh ten times more.
+            rank=sa.func.bm25(fts, 10.0, 1.0),
+            snippet=sa.func.snippet(fts, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 24),
+        )
+
+    @override
+    def reindex(self, connection: sa.Connection, full: bool = False) -> int:
+        if full:
+            connection.exec_driver_sql("DELETE FROM posts_search")
+        else:
+            connection.exec_driver_sql(
+                "DELETE FROM posts_search WHERE rowid NOT IN (SELECT id FROM posts) "
+                + "OR rowid IN (SELECT posts.id FROM posts "
+                + "JOIN posts_search ON posts_search.rowid = posts.id "
+                + "WHERE posts_search.updatedon IS NOT posts.updatedon)"
+            )
+        result = connection.exec_driver_sql(
+            f"INSERT INTO posts_search ({self._columns}) "
+            + f"SELECT {self._values.format(row='posts')} FROM posts "
+            + "WHERE posts.id NOT IN (SELECT rowid FROM posts_search)"
+        )
+        if full:
+            # Merges the index segments, the cheapest index to query.
+            connection.exec_driver_sql(
+                "INSERT INTO posts_search (posts_search) VALUES ('optimize')"
+            )
+        return result.rowcount
+
+
+class PostgresSearchIndex(SearchIndex):
+    dialect = "postgresql"
+
+    _vector = (
+        f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce({{row}}.pagetitle, '')), 'A')"
+        + f" || setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce({{row}}.content, '')), 'B')"
+    )
+
+    @override
+    def create_ddl(self) -> list[str]:
+        return [
+            "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector",
+            "CREATE OR REPLACE FUNCTION posts_search_vector_update() "
+            + "RETURNS trigger AS $$ BEGIN "
+            + f"NEW.search_vector := {self._vector.format(row='NEW')}; "
+            + "RETURN NEW; END $$ LANGUAGE plpgsql",
+            "DROP TRIGGER IF EXISTS posts_search_vector ON posts",
+            "CREATE TRIGGER posts_search_vector "
+            + "BEFORE INSERT OR UPDATE OF pagetitle, content ON posts "
+            + "FOR EACH ROW EXECUTE FUNCTION posts_search_vector_update()",
+            "CREATE INDEX IF NOT EXISTS ix_posts_search_vector "
+            + "ON posts USING GIN (search_vector)",
+        ]
+
+    @override
+    def drop_ddl(self) -> list[str]:
+        return [
+            "DROP TRIGGER IF EXISTS posts_search_vector ON posts",
+            "DROP FUNCTION IF EXISTS posts_search_vector_update()",
+        ]
+
+    @override
+    def match(self, posts: sa.Table, terms: list[str]) -> SearchClauses:
+        expression = " & ".join("{}:*".format(term) for term in terms)
+        query = sa.func.to_tsquery(SEARCH_LANGUAGE, expression)
+        vector = sa.literal_column("posts.search_vector", TSVECTOR())
+        return SearchClauses(
+            source=None,
+            post_id=posts.c.id,
+            condition=vector.op("@@")(query),
+            rank=-sa.func.ts_rank_cd(vector, query),
+            snippet=sa.func.ts_headline(
+                SEARCH_LANGUAGE,
+                sa.func.coalesce(posts.c.content, ""),
+                query,
+                f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+                + "MaxWords=30, MinWords=12, MaxFragments=1",
+            ),
+        )
+
+    @override
+    def reindex(self, connection: sa.Connection, full: bool = False) -> int:
+        condition = "" if full else " WHERE search_vector IS NULL"
+        result = connection.exec_driver_sql(
+            f"UPDATE posts SET search_vector = {self._vector.format(row='posts')}"
+            + condition
+        )
+        return result.rowcount
+
+
+_INDEXES: dict[str, SearchIndex] = {
+    index.dialect: index for index in (SqliteSearchIndex(), PostgresSearchIndex())
+}
+
+
+def search_index_for(dialect: str) -> SearchIndex | None:
+    """The index of a database dialect, None when search is not supported."""
+    return _INDEXES.get(dialect)
+
+
+def install_search_ddl(posts: sa.Table) -> None:
+    """Create and drop the search index together with the ``posts`` table."""
+    for index in _INDEXES.values():
+        for statement in index.create_ddl():
+            sa.event.listen(
+                posts,
+                "after_create",
+                sa.DDL(statement).execute_if(dialect=index.dialect),
+            )
+        for statement in index.drop_ddl():
+            sa.event.listen(
+                posts,
+                "before_drop",
+                sa.DDL(statement).execute_if(dialect=index.dialect),
+            )
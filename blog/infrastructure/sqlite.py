@@ -0,0 +1,48 @@
+"""SQLite connection tuning.
+
+SQLite keeps most settings per connection, so the pragmas from
+``SQLITE_PRAGMAS`` are applied by an engine ``connect`` hook to every
+connection the pool opens. With the default rollback journal a writer
+blocks every reader; in WAL mode gevent workers keep reading while the
+admin saves a post.
+"""
+
+from typing import Any
+
+import sqlalchemy as sa
+from flask import Flask
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.pool import ConnectionPoolEntry
+
+from blog.extensions import db
+
+
+def pragma_statements(pragmas: dict[str, Any]) -> list[str]:  # pyright: ignore[reportExplicitAny]
+    """``PRAGMA`` statements for the configured settings, in order."""
+    return ["PRAGMA {} = {}".format(name, value) for name, value in pragmas.items()]
+
+
+def install_pragmas(engine: sa.Engine, pragmas: dict[str, Any]) -> None:  # pyright: ignore[reportExplicitAny]
+    """Run ``pragmas`` on every new connection of a SQLite ``engine``."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+    statements = pragma_statements(pragmas)
+
+    def apply(
+        dbapi_connection: DBAPIConnection, _connection_record: ConnectionPoolEntry
+    ) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    sa.event.listen(engine, "connect", apply)
+
+
+def configure_sqlite(app: Flask) -> None:
+    """Install the pragmas of the application config on its engines."""
+    with app.app_context():
+        for engine in db.engines.values():
+            install_pragmas(engine, app.config.get("SQLITE_PRAGMAS") or {})
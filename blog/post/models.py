@@ -1,11 +1,20 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING, override
 
-import markdown
 from sqlalchemy.orm import Mapped, relationship
 
 from blog.extensions import db
-from blog.infrastructure.database import get_posts_table, get_posts_tags_table
+from blog.infrastructure.database import (
+    get_posts_table,
+    get_posts_tags_table,
+    get_related_posts_table,
+)
+from blog.infrastructure.markdown import (
+    RENDERER_VERSION,
+    content_hash,
+    is_rendering_current,
+    render_markdown,
+)
 
 if TYPE_CHECKING:
     from blog.category.models import Category
@@ -13,9 +22,6 @@ if TYPE_CHECKING:
     from blog.tags.models import Tag
 
 
-MARKDOWN_EXTENSIONS = ["markdown.extensions.fenced_code"]
-
-
 class Post(db.Model):
     """orm model for blog post."""
 
@@ -26,8 +32,12 @@ class Post(db.Model):
     pagetitle: Mapped[str]
     alias: Mapped[str]
     content: Mapped[str | None]
+    content_html: Mapped[str | None]
+    content_hash: Mapped[str | None]
+    renderer_version: Mapped[str | None]
     createdon: Mapped[datetime | None]
     publishedon: Mapped[datetime | None]
+    updatedon: Mapped[datetime | None]
     category_id: Mapped[int | None]
     user_id: Mapped[int | None]
 
@@ -39,13 +49,40 @@ class Post(db.Model):
 
     @property
     def markdown(self):
-        return markdown.markdown(self.content or "", extensions=MARKDOWN_EXTENSIONS)
+        if self.is_rendering_current():
+            return self.content_html
+        return render_markdown(self.content)
+
+    def touch(self) -> None:
+        """Record that the post changed."""
+        self.updatedon = datetime.now(timezone.utc)
+
+    def is_rendering_current(self) -> bool:
+        return self.content_html is not None and is_rendering_current(
+            self.content, self.content_hash, self.renderer_version
+        )
+
+    def refresh_rendering(self, force: bool = False) -> bool:
+        """Re-render stored HTML if content or renderer changed.
+
+        Returns True when the stored HTML was rewritten.
+        """
+        if not force and self.is_rendering_current():
+            return False
+        self.content_html = render_markdown(self.content)
+        self.content_hash = content_hash(self.content)
+        self.renderer_version = RENDERER_VERSION
+        return True
 
     @override
     def __str__(self):
         return f"{self.pagetitle}"
 
 
+# Read and rebuilt with Core statements, it has no model of its own.
+related_posts = get_related_posts_table(db.metadata)
+
+
 class Icon(db.Model):
     """orm model for icons."""
 
@@ -1,10 +1,11 @@
 import datetime
+import math
 from typing import ParamSpec, TypeVar
 
-import markdown
 from flask import (
     Blueprint,
     Response,
+    current_app,
     jsonify,
     make_response,
     render_template,
@@ -12,9 +13,23 @@ from flask import (
     url_for,
     abort,
 )
-
-
-from blog.extensions import flask_sitemap, cache
+from flask_login import current_user
+from jinja2 import Template
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+from blog.caching.backends import LocalLRU
+from blog.caching.validators import Validators, make_validators, site_validators
+from blog.caching.views import HTMX_VARY, cached_view
+from blog.domain.post import PostCursor
+from blog.extensions import flask_sitemap
+from blog.infrastructure.markdown import (
+    RenderError,
+    content_hash,
+    render_blocks,
+    render_markdown,
+)
+from blog.infrastructure.rate_limit import TokenBucketLimiter
 from blog.services.factory import ServiceFactory
 
 post = Blueprint("post", __name__)
@@ -25,100 +40,224 @@ R = TypeVar("R")
 
 
 @post.route("/")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view()
 def index(**kwargs: str) -> Response | str:
     return render_template("index.html", **kwargs)
 
 
 @post.route("/posts")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view(validators=site_validators)
 def posts(**kwargs: str) -> Response | str:
+    return _render_posts(None, **kwargs)
+
+
+@post.route("/posts/after/<cursor>")
+@cached_view(validators=site_validators, generational=True)
+def posts_after(cursor: str, **kwargs: str) -> Response | str:
+    after = PostCursor.decode(cursor)
+    # Pages are cached per cursor, only the ones links lead to are served.
+    post_service = ServiceFactory.create_post_service()
+    if after is None or not post_service.is_published_cursor(after):
+        abort(404)
+    return _render_posts(after, **kwargs)
+
+
+def _render_posts(after: PostCursor | None, **kwargs: str) -> Response | str:
     post_service = ServiceFactory.create_post_service()
-    posts = post_service.get_all_published_content()
-    return render_template("posts.html", posts=posts, **kwargs)
+    page = post_service.get_published_summaries_page(
+        current_app.config["POSTS_PER_PAGE"], after
+    )
+    next_url = None
+    if page.next_cursor is not None:
+        next_url = url_for("post.posts_after", cursor=page.next_cursor.encode())
+    return render_template(
+        "posts.html",
+        years=page.by_year(),
+        next_url=next_url,
+        continued_year=after.publishedon.year if after else None,
+        **kwargs,
+    )
 
 
 @post.route("/hx/pages")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view(validators=site_validators)
 def pages_hx() -> Response | str:
     post_service = ServiceFactory.create_post_service()
-    pages = post_service.get_page_posts()
+    pages = post_service.get_page_summaries()
     return render_template("pages.htmx", pages=pages)
 
 
 @post.route("/hx/icons")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view(validators=site_validators)
 def icons_hx() -> Response | str:
     icon_service = ServiceFactory.create_icon_service()
     icons = icon_service.get_all_icons()
     return render_template("icons/icons.htmx", icons=icons)
 
 
+def post_validators(alias: str | None = None, **_kwargs: str) -> Validators | None:
+    if alias is None:
+        return None
+    post_service = ServiceFactory.create_post_service()
+    digest = post_service.get_content_hash(alias)
+    if digest is None:
+        return None
+    return make_validators([alias, digest])
+
+
 @post.route("/<alias>")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view(vary=HTMX_VARY, validators=post_validators)
 def view(alias: str | None = None, **kwargs: str) -> Response | str:
     template = "post.htmx" if request.headers.get("HX-Request") else "post.html"
     if alias is None:
         abort(404)
 
     post_service = ServiceFactory.create_post_service()
-    post = post_service.get_post_by_alias(alias)
-    if not post:
+    post_page = post_service.get_post_page(alias)
+    if not post_page:
         abort(404)
 
+    post = post_page.post
     # For page categories, we need to check if it's a page or a regular post
     is_published = post.publishedon is not None
 
     if not (is_published or post.is_page):
         abort(404)
 
-    # Get tags for the post
-    tags = post_service.get_tags_for_post(post.id) if post.id else []
-
-    page_category_obj = None
-    if post.category_id:
-        category_service = ServiceFactory.create_category_service()
-        page_category_obj = category_service.get_category_by_id(post.category_id)
-
-    if page_category_obj and page_category_obj.template:
-        return render_template(template, post=post, tags=tags, **kwargs)
-    return render_template(template, post=post, tags=tags, **kwargs)
+    # Categories may render their full pages with their own template
+    category = post_page.category
+    templates: list[str | Template] = [template]
+    if template == "post.html" and category and category.template:
+        templates.insert(0, category.template)
+    related = [] if post.is_page else post_service.get_related_posts(post.id or 0)
+    return render_template(
+        templates,
+        post=post,
+        tags=post_page.tags,
+        category=category,
+        related=related,
+        **kwargs,
+    )
 
 
 @flask_sitemap.register_generator
 def site_map_gen():
     post_service = ServiceFactory.create_post_service()
-    pages = post_service.get_page_posts()
-    for page in pages:
-        yield url_for("post.view", alias=page.alias)
-
-    posts = post_service.get_published_posts()
-    for post in posts:
-        yield url_for("post.view", alias=post.alias)
-
-
-@post.route("/md/", methods=["POST", "GET"])
-def getmd():
+    pages = post_service.get_page_summaries()
+    posts = post_service.get_published_summaries()
+    for post in [*pages, *posts]:
+        lastmod = post.updatedon or post.publishedon
+        if lastmod is None:
+            yield ("post.view", {"alias": post.alias})
+        else:
+            yield ("post.view", {"alias": post.alias}, lastmod.date().isoformat())
+
+
+@post.route("/md/", methods=["POST"])
+def getmd() -> Response | tuple[Response, int]:
+    """Render the admin editor preview."""
+    error = _check_preview_request()
+    if error is not None:
+        return error
     post_data = request.form.get("data", "")
-    out = {"data": markdown.markdown(post_data)}
-    return jsonify(out)
+
+    # Editors send the same text again and again, e.g. toggling preview.
+    previews = _preview_cache("markdown_preview_cache", "MARKDOWN_PREVIEW_CACHE_SIZE")
+    key = content_hash(post_data)
+    html = previews.get(key)
+    if html is None:
+        try:
+            html = render_markdown(post_data)
+        except RenderError as e:
+            return jsonify({"error": str(e)}), 503
+        previews.set(key, html, 0)
+    return jsonify({"data": html})
+
+
+@post.route("/md/blocks", methods=["POST"])
+def preview_blocks() -> Response | tuple[Response, int] | str:
+    """Render the blocks of the live editor preview that changed.
+
+    ``have`` lists the ids of the blocks the editor shows. Those come back
+    as empty ``hx-preserve`` placeholders, which HTMX fills with the
+    elements already on the page, so a keystroke renders and sends only
+    the block it changed.
+    """
+    error = _check_preview_request()
+    if error is not None:
+        return error
+    content = request.form.get("content", "")
+    shown = set(filter(None, request.form.get("have", "").split(",")))
+    blocks = _preview_cache(
+        "markdown_preview_blocks", "MARKDOWN_PREVIEW_BLOCK_CACHE_SIZE"
+    )
+    try:
+        preview = render_blocks(content, shown, blocks)
+    except RenderError as e:
+        return jsonify({"error": str(e)}), 503
+    return render_template("snippets/preview_blocks.htmx", blocks=preview)
+
+
+def _check_preview_request() -> tuple[Response, int] | None:
+    """Error response for a preview request that must not render, if any."""
+    if not current_user.is_authenticated:
+        return jsonify({"error": "Login required"}), 401
+    # Keyed by the session's user too, admins behind one address do not
+    # share a bucket; each preview endpoint has its own.
+    key = (request.endpoint, request.remote_addr, current_user.get_id())
+    wait = _preview_limiter().acquire(key)
+    if wait:
+        response = jsonify({"error": "Too many previews, slow down"})
+        response.headers["Retry-After"] = str(math.ceil(wait))
+        return response, 429
+
+    # Larger bodies are refused before they are parsed.
+    request.max_content_length = current_app.config["MARKDOWN_PREVIEW_MAX_BYTES"]
+    try:
+        # Parses the form now, so an oversized body is a 413 here.
+        _ = request.form
+    except RequestEntityTooLarge:
+        return jsonify({"error": "Text too large to preview"}), 413
+    return None
+
+
+def _preview_limiter() -> TokenBucketLimiter:
+    limiter = current_app.extensions.get("markdown_preview_limiter")
+    if limiter is None:
+        limiter = current_app.extensions.setdefault(
+            "markdown_preview_limiter",
+            TokenBucketLimiter(
+                current_app.config["MARKDOWN_PREVIEW_RATE"],
+                current_app.config["MARKDOWN_PREVIEW_BURST"],
+            ),
+        )
+    return limiter
+
+
+def _preview_cache(name: str, size_setting: str) -> LocalLRU:
+    previews = current_app.extensions.get(name)
+    if previews is None:
+        previews = current_app.extensions.setdefault(
+            name, LocalLRU(current_app.config[size_setting])
+        )
+    return previews
 
 
 @post.route("/robots.txt")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view()
 def robots() -> Response | str:
     response = make_response(
-        """\nUser-agent: *\nCrawl-delay: 2\nDisallow: /tag/*\nHost: gunlinux.ru\n"""
+        """\nUser-agent: *\nCrawl-delay: 2\nDisallow: /tag/*\nDisallow: /search\nHost: gunlinux.ru\n"""
     )
     response.headers["Content-Type"] = "text/plain"
     return response
 
 
 @post.route("/rss.xml")
-@cache.cached(timeout=50)  # pyright: ignore[reportUntypedFunctionDecorator]
+@cached_view(validators=site_validators)
 def rss():
     post_service = ServiceFactory.create_post_service()
-    list_posts = post_service.get_published_posts()
+    list_posts = post_service.get_published_summaries()
 
     date = datetime.datetime.now()
     rss_xml = render_template("rss.xml", posts=list_posts, date=date)
@@ -0,0 +1,97 @@
+"""Related posts index upkeep.
+
+The index is rebuilt in bulk, by the ``related-posts`` command or by a
+``RelatedPostsRefresher`` a while after content changes. Changes arriving
+while a rebuild is pending join it, so editing a batch of posts costs a
+single rebuild. Cached pages of the posts whose list changed, and of the
+posts listing a changed post, are purged afterwards.
+"""
+
+import logging
+import threading
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from flask import current_app, has_app_context
+
+from blog.caching.invalidation import purge_paths
+from blog.events import ContentChange, post_changed, tag_changed
+from blog.extensions import db
+from blog.services.factory import ServiceFactory
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_related_posts(changed_aliases: Iterable[str] = ()) -> int:
+    """Rebuild the index and purge the pages it changed, needs an app context.
+
+    Args:
+        changed_aliases: Posts changed since the last rebuild, the pages
+            listing them show their old title or alias
+
+    Returns:
+        The number of posts whose related posts changed
+    """
+    post_service = ServiceFactory.create_post_service()
+    rebuilt = post_service.rebuild_related_posts(
+        current_app.config["RELATED_POSTS_LIMIT"]
+    )
+    referrers = post_service.get_related_referrers(set(changed_aliases))
+    aliases = {*rebuilt, *referrers}
+    # Their pages changed with the related posts they show; incremental
+    # exports go by updatedon.
+    post_service.touch_posts(aliases)
+    db.session.commit()
+
+    if aliases:
+        adapter = current_app.url_map.bind("")
+        purge_paths(adapter.build("post.view", {"alias": alias}) for alias in aliases)
+    return len(rebuilt)
+
+
+class RelatedPostsRefresher:
+    """Rebuilds the related posts index ``delay`` seconds after a change."""
+
+    def __init__(self, app: "Flask", delay: float):
+        self.app = app
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._aliases: set[str] = set()
+
+    def schedule(self, _sender: object, change: ContentChange) -> None:
+        # Signals are global, other applications of the process send them too.
+        if has_app_context() and current_app._get_current_object() is not self.app:
+            return
+        with self._lock:
+            self._aliases |= change.post_aliases
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.run)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def run(self) -> None:
+        with self._lock:
+            self._timer = None
+            aliases, self._aliases = self._aliases, set()
+        with self.app.app_context():
+            try:
+                changed = refresh_related_posts(aliases)
+            except Exception:
+                logger.exception("Rebuilding related posts failed")
+                return
+        logger.info("Related posts of %d post(s) changed", changed)
+
+
+def connect_related_posts(app: "Flask") -> None:
+    """Rebuild related posts after content changes, unless disabled."""
+    if app.config["RELATED_POSTS_REFRESH_DELAY"] is None:
+        return
+    refresher = RelatedPostsRefresher(app, app.config["RELATED_POSTS_REFRESH_DELAY"])
+    # Signals hold their receivers weakly, the application keeps it alive.
+    app.extensions["related_posts"] = refresher
+    post_changed.connect(refresher.schedule)
+    tag_changed.connect(refresher.schedule)
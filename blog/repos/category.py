@@ -1,5 +1,7 @@
 """Repository for Category entities."""
 
+import datetime
+
 import sqlalchemy as sa
 from typing import Any, override
 
@@ -46,6 +48,13 @@ class CategoryRepository(BaseRepository[CategoryDomain, int]):
         categories_orm = list(self.session.scalars(stmt).unique().all())
         return [self._to_domain_model(category_orm) for category_orm in categories_orm]
 
+    def get_post_aliases(self, category_id: int) -> list[str]:
+        """Get the aliases of all posts in a specific category."""
+        from blog.post.models import Post as PostORM
+
+        stmt = sa.select(PostORM.alias).where(PostORM.category_id == category_id)
+        return list(self.session.scalars(stmt).all())
+
     @override
     def create(self, entity: CategoryDomain) -> CategoryDomain:
         category_orm = CategoryORM()
@@ -73,6 +82,7 @@ class CategoryRepository(BaseRepository[CategoryDomain, int]):
         if entity.template is not None:
             category_orm.template = entity.template
         self.session.flush()
+        self.touch_posts(category_orm.id)
         return entity
 
     @override
@@ -80,10 +90,22 @@ class CategoryRepository(BaseRepository[CategoryDomain, int]):
         stmt = sa.select(CategoryORM).where(CategoryORM.id == id)
         category_orm = self.session.scalar(stmt)
         if category_orm:
+            self.touch_posts(category_orm.id)
             self.session.delete(category_orm)
             return True
         return False
 
+    def touch_posts(self, category_id: int) -> None:
+        """Mark posts in a category as changed, their pages depend on it."""
+        from blog.post.models import Post as PostORM
+
+        stmt = (
+            sa.update(PostORM)
+            .where(PostORM.category_id == category_id)
+            .values(updatedon=datetime.datetime.now(datetime.timezone.utc))
+        )
+        self.session.execute(stmt)
+
     def _to_domain_model(self, category_orm: CategoryORM) -> CategoryDomain:
         return CategoryDomain(
             id=category_orm.id,
@@ -1,16 +1,31 @@
 """Repository for Post entities."""
 
+import datetime
+from collections.abc import Iterable
+
 import sqlalchemy as sa
 from typing import Any, override
 
 from blog.category.models import Category as CategoryOrm
 from blog.extensions import db
+from blog.infrastructure.database import get_posts_tags_table, get_related_posts_table
 from blog.post.models import Post as PostORM
 from blog.tags.models import Tag as TagORM
-from blog.domain.post import Post as PostDomain
+from blog.domain.category import Category as CategoryDomain
+from blog.domain.post import (
+    ArchiveMonth,
+    Post as PostDomain,
+    PostCursor,
+    PostPage,
+    PostSummary,
+    PostSummaryPage,
+)
 from blog.domain.tag import Tag as TagDomain
 from blog.repos.base import BaseRepository
 
+# Decimal digits of related post scores that tell two scores apart.
+RELATED_SCORE_DIGITS = 6
+
 
 class PostRepository(BaseRepository[PostDomain, int]):
     """Repository for Post entities."""
@@ -46,10 +61,15 @@ class PostRepository(BaseRepository[PostDomain, int]):
 
     def get_posts_by_tag(self, tag_id: int) -> list[PostDomain]:
         """Get all posts associated with a specific tag."""
-        stmt = sa.select(PostORM).join(PostORM.tags).where(TagORM.id == tag_id)
+        stmt = self._select_posts().join(PostORM.tags).where(TagORM.id == tag_id)
         posts_orm = list(self.session.scalars(stmt).all())
         return [self._to_domain_model(post_orm) for post_orm in posts_orm]
 
+    def get_summaries_by_tag(self, tag_id: int) -> list[PostSummary]:
+        """Get summaries of all posts associated with a specific tag."""
+        stmt = self._summary_select().join(PostORM.tags).where(TagORM.id == tag_id)
+        return self._to_summaries(stmt)
+
     def _tag_to_domain_model(self, tag_orm: TagORM) -> TagDomain:
         """Convert Tag ORM model to Tag domain model."""
         return TagDomain(
@@ -60,32 +80,230 @@ class PostRepository(BaseRepository[PostDomain, int]):
 
     @override
     def get_by_id(self, id: int) -> PostDomain | None:
-        stmt = sa.select(PostORM).where(PostORM.id == id)
+        stmt = self._select_posts().where(PostORM.id == id)
         post_orm = self.session.scalar(stmt)
         if post_orm:
             return self._to_domain_model(post_orm)
         return None
 
     def get_by_alias(self, alias: str) -> PostDomain | None:
-        stmt = (
-            sa.select(PostORM)
-            .where(PostORM.alias == alias)
-            .join(CategoryOrm, PostORM.category_id == CategoryOrm.id, isouter=True)
-        )
+        stmt = self._select_posts().where(PostORM.alias == alias)
         post_orm = self.session.scalar(stmt)
         if post_orm:
             return self._to_domain_model(post_orm)
         return None
 
+    def get_page_by_alias(self, alias: str) -> PostPage | None:
+        """Get a post with its tags and category in a single statement."""
+        # Flat outer joins: joinedload nests the tag join in parentheses,
+        # which SQLite materializes by scanning posts_tags.
+        posts_tags = get_posts_tags_table(db.metadata)
+        stmt = (
+            self._select_posts()
+            .outerjoin(posts_tags, posts_tags.c.post_id == PostORM.id)
+            .outerjoin(TagORM, TagORM.id == posts_tags.c.tag_id)
+            .where(PostORM.alias == alias)
+            .options(sa.orm.contains_eager(PostORM.tags))
+        )
+        post_orm = self.session.scalars(stmt).unique().one_or_none()
+        if post_orm is None:
+            return None
+        category = post_orm.category
+        return PostPage(
+            post=self._to_domain_model(post_orm),
+            tags=[self._tag_to_domain_model(tag_orm) for tag_orm in post_orm.tags],
+            category=CategoryDomain(
+                id=category.id,
+                title=category.title or "",
+                alias=category.alias or "",
+                template=category.template,
+                page=category.page,
+            )
+            if category
+            else None,
+        )
+
+    def get_content_hash(self, alias: str) -> str | None:
+        """Get the stored content hash of a post, without loading the post.
+
+        Returns None when there is no such post and an empty string when
+        the post has not been rendered yet.
+        """
+        stmt = sa.select(PostORM.id, PostORM.content_hash).where(PostORM.alias == alias)
+        row = self.session.execute(stmt).first()
+        if row is None:
+            return None
+        return row.content_hash or ""
+
+    def get_related_summaries(self, post_id: int) -> list[PostSummary]:
+        """Summaries of the posts related to a post, most related first.
+
+        Reads the index built by rebuild_related_posts.
+        """
+        related = get_related_posts_table(db.metadata)
+        stmt = (
+            self._summary_select()
+            .join(related, related.c.related_id == PostORM.id)
+            .where(related.c.post_id == post_id)
+            .order_by(related.c.position)
+        )
+        return self._to_summaries(stmt)
+
+    def get_related_referrers(self, aliases: set[str]) -> list[str]:
+        """Aliases of the posts listing any of ``aliases`` as related."""
+        if not aliases:
+            return []
+        related = get_related_posts_table(db.metadata)
+        listed = sa.select(PostORM.id).where(PostORM.alias.in_(aliases))
+        stmt = (
+            sa.select(PostORM.alias)
+            .where(
+                PostORM.id.in_(
+                    sa.select(related.c.post_id).where(related.c.related_id.in_(listed))
+                )
+            )
+            .order_by(PostORM.alias)
+        )
+        return list(self.session.scalars(stmt))
+
+    def touch_posts(self, aliases: Iterable[str]) -> None:
+        """Mark posts as changed, e.g. when their related posts changed."""
+        ordered = sorted(aliases)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        # Chunks stay below the bound parameter limit of SQLite.
+        for start in range(0, len(ordered), 500):
+            stmt = (
+                sa.update(PostORM)
+                .where(PostORM.alias.in_(ordered[start : start + 500]))
+                .values(updatedon=now)
+            )
+            self.session.execute(stmt)
+
+    def rebuild_related_posts(self, limit: int) -> list[str]:
+        """Rebuild the related posts index from the tags of published posts.
+
+        Posts are related by the Jaccard index of their tag sets, shared
+        tags over tags of either post; the ``limit`` best of every post
+        are kept. Only posts whose list changed are rewritten.
+
+        Returns the aliases of the posts whose list changed.
+        """
+        related = get_related_posts_table(db.metadata)
+        # Scores are compared rounded, a float computed by the database
+        # and one read back from the table may differ in the last bits.
+        current: dict[int, list[tuple[int, float]]] = {}
+        for row in self.session.execute(self._related_select(limit)):
+            score = round(row.score, RELATED_SCORE_DIGITS)
+            current.setdefault(row.post_id, []).append((row.related_id, score))
+        stored: dict[int, list[tuple[int, float]]] = {}
+        stmt = sa.select(related).order_by(related.c.post_id, related.c.position)
+        for row in self.session.execute(stmt):
+            score = round(row.score, RELATED_SCORE_DIGITS)
+            stored.setdefault(row.post_id, []).append((row.related_id, score))
+
+        changed = sorted(
+            post_id
+            for post_id in current.keys() | stored.keys()
+            if current.get(post_id) != stored.get(post_id)
+        )
+        aliases: list[str] = []
+        # Chunks stay below the bound parameter limit of SQLite.
+        for start in range(0, len(changed), 500):
+            chunk = changed[start : start + 500]
+            self.session.execute(sa.delete(related).where(related.c.post_id.in_(chunk)))
+            rows = [
+                {
+                    "post_id": post_id,
+                    "position": position,
+                    "related_id": related_id,
+                    "score": score,
+                }
+                for post_id in chunk
+                for position, (related_id, score) in enumerate(
+                    current.get(post_id, []), 1
+                )
+            ]
+            if rows:
+                self.session.execute(sa.insert(related), rows)
+            aliases += self.session.scalars(
+                sa.select(PostORM.alias).where(PostORM.id.in_(chunk))
+            )
+        self.session.flush()
+        return sorted(aliases)
+
+    def _related_select(self, limit: int) -> sa.Select[Any]:  # pyright: ignore[reportExplicitAny]
+        # The whole post x tag incidence matrix is scored in one set-based
+        # statement: pairs of posts sharing a tag are counted by a self-join
+        # on posts_tags, never post by post.
+        posts_tags = get_posts_tags_table(db.metadata)
+        page_categories = sa.select(CategoryOrm.id).where(CategoryOrm.page)  # pyright: ignore[reportArgumentType]
+        incidence = (
+            sa.select(posts_tags.c.post_id, posts_tags.c.tag_id)
+            .join(PostORM, PostORM.id == posts_tags.c.post_id)
+            .where(
+                PostORM.publishedon.isnot(None),
+                sa.or_(
+                    PostORM.category_id.is_(None),
+                    PostORM.category_id.not_in(page_categories),
+                ),
+            )
+            .cte("incidence")
+        )
+        sizes = (
+            sa.select(incidence.c.post_id, sa.func.count().label("tags"))
+            .group_by(incidence.c.post_id)
+            .cte("sizes")
+        )
+        a, b = incidence.alias("a"), incidence.alias("b")
+        shared = (
+            sa.select(
+                a.c.post_id,
+                b.c.post_id.label("related_id"),
+                sa.func.count().label("shared"),
+            )
+            .join(
+                b,
+                sa.and_(b.c.tag_id == a.c.tag_id, b.c.post_id != a.c.post_id),
+            )
+            .group_by(a.c.post_id, b.c.post_id)
+            .cte("shared")
+        )
+        size_a, size_b = sizes.alias("size_a"), sizes.alias("size_b")
+        score = sa.cast(shared.c.shared, sa.Float()) / (
+            size_a.c.tags + size_b.c.tags - shared.c.shared
+        )
+        ranked = (
+            sa.select(
+                shared.c.post_id,
+                shared.c.related_id,
+                score.label("score"),
+                sa.func.row_number()
+                .over(
+                    partition_by=shared.c.post_id,
+                    # Newer posts first among equally related ones
+                    order_by=(score.desc(), shared.c.related_id.desc()),
+                )
+                .label("position"),
+            )
+            .join(size_a, size_a.c.post_id == shared.c.post_id)
+            .join(size_b, size_b.c.post_id == shared.c.related_id)
+            .subquery("ranked")
+        )
+        return (
+            sa.select(ranked.c.post_id, ranked.c.related_id, ranked.c.score)
+            .where(ranked.c.position <= limit)
+            .order_by(ranked.c.post_id, ranked.c.position)
+        )
+
     @override
     def get_all(self) -> list[PostDomain]:
-        stmt = sa.select(PostORM)
+        stmt = self._select_posts()
         posts_orm = list(self.session.scalars(stmt).all())
         return [self._to_domain_model(post_orm) for post_orm in posts_orm]
 
     def get_published_posts(self) -> list[PostDomain]:
         stmt = (
-            sa.select(PostORM)
+            self._select_posts()
             .where(
                 PostORM.publishedon.isnot(None),
                 PostORM.category_id.is_(None),
@@ -98,8 +316,7 @@ class PostRepository(BaseRepository[PostDomain, int]):
     def get_all_published_content(self) -> list[PostDomain]:
         """Get all published content including posts and pages."""
         stmt = (
-            sa.select(PostORM)
-            .join(CategoryOrm, PostORM.category_id == CategoryOrm.id, isouter=True)
+            self._select_posts()
             .where(PostORM.publishedon.isnot(None))
             .where(CategoryOrm.page.isnot(True))
             .order_by(PostORM.publishedon.desc())
@@ -108,17 +325,123 @@ class PostRepository(BaseRepository[PostDomain, int]):
         return [self._to_domain_model(post_orm) for post_orm in posts_orm]
 
     def get_page_posts(self) -> list[PostDomain]:
+        stmt = self._select_posts().where(self._in_page_category())
+        posts_orm = list(self.session.scalars(stmt).all())
+        return [self._to_domain_model(post_orm) for post_orm in posts_orm]
+
+    def get_changed_since(self, since: datetime.datetime) -> list[PostDomain]:
+        """Get posts created or updated after ``since``, oldest change first.
+
+        Unpublished posts are included, so callers can drop what was
+        unpublished since.
+        """
         stmt = (
-            sa.select(PostORM)
-            .join_from(
-                PostORM,
-                CategoryOrm,
-            )
-            .where(CategoryOrm.page)  # pyright: ignore[reportArgumentType]
+            self._select_posts()
+            .where(PostORM.updatedon > since)
+            .order_by(PostORM.updatedon, PostORM.id)
         )
         posts_orm = list(self.session.scalars(stmt).all())
         return [self._to_domain_model(post_orm) for post_orm in posts_orm]
 
+    def get_last_updated(self) -> datetime.datetime | None:
+        """Get the time of the most recent post change."""
+        return self.session.scalar(sa.select(sa.func.max(PostORM.updatedon)))
+
+    def get_published_summaries(self) -> list[PostSummary]:
+        """Summaries of published posts outside categories, newest first."""
+        stmt = (
+            self._summary_select()
+            .where(
+                PostORM.publishedon.isnot(None),
+                PostORM.category_id.is_(None),
+            )
+            .order_by(PostORM.publishedon.desc())
+        )
+        return self._to_summaries(stmt)
+
+    def get_all_published_summaries(self) -> list[PostSummary]:
+        """Summaries of published posts and non-page content, newest first."""
+        stmt = (
+            self._summary_select()
+            .where(PostORM.publishedon.isnot(None))
+            .where(CategoryOrm.page.isnot(True))
+            .order_by(PostORM.publishedon.desc())
+        )
+        return self._to_summaries(stmt)
+
+    def get_published_summaries_page(
+        self,
+        limit: int,
+        after: PostCursor | None = None,
+        since: datetime.datetime | None = None,
+        until: datetime.datetime | None = None,
+    ) -> PostSummaryPage:
+        """One page of get_all_published_summaries, starting after ``after``.
+
+        ``since`` and ``until`` restrict the page to posts published in
+        ``[since, until)``, a range over the publishedon index.
+        """
+        stmt = (
+            self._summary_select()
+            .where(PostORM.publishedon.isnot(None))
+            .where(CategoryOrm.page.isnot(True))
+        )
+        if since is not None:
+            stmt = stmt.where(PostORM.publishedon >= since)
+        if until is not None:
+            stmt = stmt.where(PostORM.publishedon < until)
+        return self._keyset_page(stmt, limit, after)
+
+    def is_published_cursor(self, cursor: PostCursor) -> bool:
+        """Whether ``cursor`` was taken from a published post."""
+        stmt = sa.select(PostORM.id).where(
+            PostORM.id == cursor.id,
+            PostORM.publishedon == cursor.publishedon,
+        )
+        return self.session.scalar(stmt) is not None
+
+    def get_archive_months(self) -> list[ArchiveMonth]:
+        """Post counts of every month with published content, newest first."""
+        year = sa.extract("year", PostORM.publishedon)
+        month = sa.extract("month", PostORM.publishedon)
+        page_categories = sa.select(CategoryOrm.id).where(CategoryOrm.page)  # pyright: ignore[reportArgumentType]
+        # Counted from the (category_id, publishedon) index alone, the
+        # category filter is the one of get_all_published_summaries.
+        stmt = (
+            sa.select(
+                year.label("year"), month.label("month"), sa.func.count().label("posts")
+            )
+            .where(
+                PostORM.publishedon.isnot(None),
+                sa.or_(
+                    PostORM.category_id.is_(None),
+                    PostORM.category_id.not_in(page_categories),
+                ),
+            )
+            .group_by(year, month)
+            .order_by(year.desc(), month.desc())
+        )
+        return [
+            ArchiveMonth(year=int(row.year), month=int(row.month), post_count=row.posts)
+            for row in self.session.execute(stmt)
+        ]
+
+    def get_summaries_page_by_tag(
+        self, tag_id: int, limit: int, after: PostCursor | None = None
+    ) -> PostSummaryPage:
+        """One page of published posts with a tag, starting after ``after``."""
+        stmt = (
+            self._summary_select()
+            .join(PostORM.tags)
+            .where(TagORM.id == tag_id, PostORM.publishedon.isnot(None))
+        )
+        return self._keyset_page(stmt, limit, after)
+
+    def get_page_summaries(self) -> list[PostSummary]:
+        """Summaries of posts in page categories."""
+        stmt = self._summary_select().where(self._in_page_category())
+        return self._to_summaries(stmt)
+
     @override
     def create(self, entity: PostDomain) -> PostDomain:
         post_orm = PostORM()
@@ -134,10 +457,14 @@ class PostRepository(BaseRepository[PostDomain, int]):
             post_orm.category_id = entity.category_id
         if entity.user_id is not None:
             post_orm.user_id = entity.user_id
+        post_orm.refresh_rendering()
+        post_orm.touch()
 
         self.session.add(post_orm)
         self.session.flush()  # Get the ID without committing
         entity.id = post_orm.id
+        entity.updatedon = post_orm.updatedon
+        self._copy_rendering(post_orm, entity)
         return entity
 
     @override
@@ -159,7 +486,11 @@ class PostRepository(BaseRepository[PostDomain, int]):
             post_orm.category_id = entity.category_id
         if entity.user_id is not None:
             post_orm.user_id = entity.user_id
+        post_orm.refresh_rendering()
+        post_orm.touch()
         self.session.flush()
+        entity.updatedon = post_orm.updatedon
+        self._copy_rendering(post_orm, entity)
         return entity
 
     @override
@@ -171,6 +502,93 @@ class PostRepository(BaseRepository[PostDomain, int]):
             return True
         raise ValueError(f"Post not found {id}")
 
+    def refresh_renderings(self, force: bool = False) -> int:
+        """Re-render stored HTML for every post whose rendering is stale.
+
+        Returns the number of posts that were re-rendered.
+        """
+        stmt = sa.select(PostORM).execution_options(yield_per=100)
+        refreshed = 0
+        for post_orm in self.session.scalars(stmt):
+            if post_orm.refresh_rendering(force=force):
+                refreshed += 1
+        self.session.flush()
+        return refreshed
+
+    def _copy_rendering(self, post_orm: PostORM, entity: PostDomain) -> None:
+        entity.content_html = post_orm.content_html
+        entity.content_hash = post_orm.content_hash
+        entity.renderer_version = post_orm.renderer_version
+
+    def _in_page_category(self) -> sa.ColumnElement[bool]:
+        # Filtering on the joined category row would make SQLite scan posts,
+        # page categories are few and their posts are found by index.
+        page_categories = sa.select(CategoryOrm.id).where(CategoryOrm.page)  # pyright: ignore[reportArgumentType]
+        return PostORM.category_id.in_(page_categories)
+
+    def _select_posts(self) -> sa.Select[Any]:  # pyright: ignore[reportExplicitAny]
+        # Categories are loaded by the same query, is_page needs them.
+        return (
+            sa.select(PostORM)
+            .join(CategoryOrm, PostORM.category_id == CategoryOrm.id, isouter=True)
+            .options(sa.orm.contains_eager(PostORM.category))
+        )
+
+    def _summary_select(self) -> sa.Select[Any]:  # pyright: ignore[reportExplicitAny]
+        # Only the columns lists need, never the content or its rendering.
+        return sa.select(
+            PostORM.id,
+            PostORM.pagetitle,
+            PostORM.alias,
+            PostORM.publishedon,
+            PostORM.updatedon,
+            PostORM.category_id,
+            CategoryOrm.page,
+        ).join(CategoryOrm, PostORM.category_id == CategoryOrm.id, isouter=True)
+
+    def _keyset_page(
+        self,
+        stmt: sa.Select[Any],  # pyright: ignore[reportExplicitAny]
+        limit: int,
+        after: PostCursor | None,
+    ) -> PostSummaryPage:
+        # Seeks past the cursor instead of using an offset, so deep pages
+        # cost the same as the first one.
+        if after is not None:
+            stmt = stmt.where(
+                sa.or_(
+                    PostORM.publishedon < after.publishedon,
+                    sa.and_(
+                        PostORM.publishedon == after.publishedon,
+                        PostORM.id < after.id,
+                    ),
+                )
+            )
+        stmt = stmt.order_by(PostORM.publishedon.desc(), PostORM.id.desc())
+        summaries = self._to_summaries(stmt.limit(limit + 1))
+        if len(summaries) <= limit:
+            return PostSummaryPage(posts=summaries)
+        summaries = summaries[:limit]
+        last = summaries[-1]
+        assert last.publishedon is not None and last.id is not None
+        return PostSummaryPage(
+            posts=summaries, next_cursor=PostCursor(last.publishedon, last.id)
+        )
+
+    def _to_summaries(self, stmt: sa.Select[Any]) -> list[PostSummary]:  # pyright: ignore[reportExplicitAny]
+        return [
+            PostSummary(
+                id=row.id,
+                pagetitle=row.pagetitle or "",
+                alias=row.alias or "",
+                publishedon=row.publishedon,
+                updatedon=row.updatedon,
+                category_id=row.category_id,
+                is_page=bool(row.page),
+            )
+            for row in self.session.execute(stmt)
+        ]
+
     def _to_domain_model(self, post_orm: PostORM) -> PostDomain:
         return PostDomain(
             id=post_orm.id,
@@ -179,7 +597,11 @@ class PostRepository(BaseRepository[PostDomain, int]):
             content=post_orm.content or "",
             createdon=post_orm.createdon,
             publishedon=post_orm.publishedon,
+            updatedon=post_orm.updatedon,
             category_id=post_orm.category_id,
-            is_page=bool(post_orm.category.page) if post_orm.category_id else False,
+            is_page=bool(post_orm.category.page) if post_orm.category else False,
             user_id=post_orm.user_id,
+            content_html=post_orm.content_html,
+            content_hash=post_orm.content_hash,
+            renderer_version=post_orm.renderer_version,
         )
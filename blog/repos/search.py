@@ -0,0 +1,111 @@
+"""Repository for full-text search over posts."""
+
+from typing import Any
+
+import sqlalchemy as sa
+
+from blog.category.models import Category as CategoryOrm
+from blog.domain.post import PostSummary
+from blog.domain.search import SearchHit
+from blog.extensions import db
+from blog.infrastructure.search import (
+    SearchClauses,
+    SearchIndex,
+    highlight,
+    search_index_for,
+)
+from blog.post.models import Post as PostORM
+
+
+class SearchError(Exception):
+    """Raised when the database has no full-text index."""
+
+    pass
+
+
+class SearchRepository:
+    """Searches posts through the full-text index of the database."""
+
+    def __init__(self, session: Any = None):  # pyright: ignore[reportExplicitAny]
+        self.session = session or db.session
+
+    @property
+    def index(self) -> SearchIndex:
+        dialect = self.session.get_bind().dialect.name
+        index = search_index_for(dialect)
+        if index is None:
+            raise SearchError("No full-text search for {}".format(dialect))
+        return index
+
+    def search(self, terms: list[str], limit: int, offset: int = 0) -> list[SearchHit]:
+        """Published posts and pages matching every term, best first."""
+        clauses = self.index.match(PostORM.__table__, terms)
+        page_categories = sa.select(CategoryOrm.id).where(CategoryOrm.page)  # pyright: ignore[reportArgumentType]
+
+        # Ranking reads every match, snippets are only cut for the page.
+        score = clauses.rank.label("score")
+        ranked = self.session.execute(
+            self._matching(clauses, sa.select(PostORM.id, score))
+            .where(
+                sa.or_(
+                    PostORM.publishedon.isnot(None),
+                    PostORM.category_id.in_(page_categories),
+                )
+            )
+            .order_by(score, PostORM.id.desc())
+            .limit(limit)
+            .offset(offset)
+        ).all()
+        if not ranked:
+            return []
+
+        stmt = self._matching(
+            clauses,
+            sa.select(
+                PostORM.id,
+                PostORM.pagetitle,
+                PostORM.alias,
+                PostORM.publishedon,
+                PostORM.updatedon,
+                PostORM.category_id,
+                CategoryOrm.page,
+                clauses.snippet.label("snippet"),
+            ),
+        )
+        stmt = stmt.join(
+            CategoryOrm, PostORM.category_id == CategoryOrm.id, isouter=True
+        ).where(clauses.post_id.in_([row.id for row in ranked]))
+        rows = {row.id: row for row in self.session.execute(stmt)}
+        return [
+            SearchHit(
+                post=PostSummary(
+                    id=row.id,
+                    pagetitle=row.pagetitle or "",
+                    alias=row.alias or "",
+                    publishedon=row.publishedon,
+                    updatedon=row.updatedon,
+                    category_id=row.category_id,
+                    is_page=bool(row.page),
+                ),
+                snippet=highlight(row.snippet),
+                rank=float(score or 0),
+            )
+            for row, score in ((rows.get(id), score) for id, score in ranked)
+            if row is not None
+        ]
+
+    def reindex(self, full: bool = False) -> int:
+        """Index posts missing from the index or changed since, or all of them."""
+        return self.index.reindex(self.session.connection(), full=full)
+
+    def _matching(
+        self,
+        clauses: SearchClauses,
+        stmt: sa.Select[Any],  # pyright: ignore[reportExplicitAny]
+    ) -> sa.Select[Any]:  # pyright: ignore[reportExplicitAny]
+        if clauses.source is not None:
+            # The index drives the query, posts are looked up by id.
+            stmt = stmt.select_from(clauses.source).join(
+                PostORM, clauses.post_id == PostORM.id
+            )
+        return stmt.where(clauses.condition)
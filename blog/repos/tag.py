@@ -1,11 +1,14 @@
 """Repository for Tag entities."""
 
+import datetime
+
 import sqlalchemy as sa
 from typing import Any, override
 
 from blog.extensions import db
+from blog.infrastructure.database import get_posts_tags_table
 from blog.tags.models import Tag as TagORM
-from blog.domain.tag import Tag as TagDomain
+from blog.domain.tag import Tag as TagDomain, TagCount
 from blog.repos.base import BaseRepository
 
 
@@ -37,14 +40,46 @@ class TagRepository(BaseRepository[TagDomain, int]):
         return [self._to_domain_model(tag_orm) for tag_orm in tags_orm]
 
     def get_tags_with_posts(self) -> list[TagDomain]:
-        """Get all tags with their posts loaded.
+        """Get all tags.
 
-        Note: This method loads relationships but doesn't include them in the domain model
-        since we've removed relationship fields to avoid circular dependencies.
+        Posts are not loaded: the domain model has no relationship fields,
+        use get_tag_counts for the number of posts of each tag.
         """
-        stmt = sa.select(TagORM).options(sa.orm.joinedload(TagORM.posts))
-        tags_orm = list(self.session.scalars(stmt).unique().all())
-        return [self._to_domain_model(tag_orm) for tag_orm in tags_orm]
+        return self.get_all()
+
+    def get_tag_counts(self) -> list[TagCount]:
+        """Get every tag with its count of published posts, by title."""
+        from blog.post.models import Post as PostORM
+
+        posts_tags = get_posts_tags_table(db.metadata)
+        stmt = (
+            sa.select(
+                TagORM.id,
+                TagORM.title,
+                TagORM.alias,
+                sa.func.count(PostORM.id).label("post_count"),
+            )
+            .join(posts_tags, posts_tags.c.tag_id == TagORM.id, isouter=True)
+            .join(
+                PostORM,
+                sa.and_(
+                    PostORM.id == posts_tags.c.post_id,
+                    PostORM.publishedon.isnot(None),
+                ),
+                isouter=True,
+            )
+            .group_by(TagORM.id, TagORM.title, TagORM.alias)
+            .order_by(TagORM.title, TagORM.id)
+        )
+        return [
+            TagCount(
+                id=row.id,
+                title=row.title or "",
+                alias=row.alias or "",
+                post_count=row.post_count,
+            )
+            for row in self.session.execute(stmt)
+        ]
 
     def get_tags_for_post(self, post_id: int) -> list[TagDomain]:
         """Get all tags associated with a specific post."""
@@ -54,6 +89,13 @@ class TagRepository(BaseRepository[TagDomain, int]):
         tags_orm = list(self.session.scalars(stmt).all())
         return [self._to_domain_model(tag_orm) for tag_orm in tags_orm]
 
+    def get_post_aliases(self, tag_id: int) -> list[str]:
+        """Get the aliases of all posts associated with a specific tag."""
+        from blog.post.models import Post as PostORM
+
+        stmt = sa.select(PostORM.alias).join(PostORM.tags).where(TagORM.id == tag_id)
+        return list(self.session.scalars(stmt).all())
+
     @override
     def create(self, entity: TagDomain) -> TagDomain:
         tag_orm = TagORM()
@@ -74,6 +116,7 @@ class TagRepository(BaseRepository[TagDomain, int]):
         tag_orm.title = entity.title
         tag_orm.alias = entity.alias
         self.session.flush()
+        self.touch_posts(tag_orm.id)
         return entity
 
     @override
@@ -81,10 +124,24 @@ class TagRepository(BaseRepository[TagDomain, int]):
         stmt = sa.select(TagORM).where(TagORM.id == id)
         tag_orm = self.session.scalar(stmt)
         if tag_orm:
+            self.touch_posts(tag_orm.id)
             self.session.delete(tag_orm)
             return True
         return False
 
+    def touch_posts(self, tag_id: int) -> None:
+        """Mark posts associated with a tag as changed, they list the tag."""
+        from blog.post.models import Post as PostORM
+
+        posts_tags = get_posts_tags_table(db.metadata)
+        post_ids = sa.select(posts_tags.c.post_id).where(posts_tags.c.tag_id == tag_id)
+        stmt = (
+            sa.update(PostORM)
+            .where(PostORM.id.in_(post_ids))
+            .values(updatedon=datetime.datetime.now(datetime.timezone.utc))
+        )
+        self.session.execute(stmt)
+
     def _to_domain_model(self, tag_orm: TagORM) -> TagDomain:
         return TagDomain(
             id=tag_orm.id,
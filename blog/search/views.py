@@ -0,0 +1,22 @@
+from flask import Blueprint, Response, current_app, render_template, request, url_for
+
+from blog.services.factory import ServiceFactory
+
+search = Blueprint("search", __name__)
+
+
+# Not cached: every typed query is a page of its own, caching them would
+# only push the post pages out of the cache.
+@search.route("/search")
+def index() -> Response | str:
+    template = "search.htmx" if request.headers.get("HX-Request") else "search.html"
+    query = request.args.get("q", "")
+    page = request.args.get("page", 1, type=int)
+    search_service = ServiceFactory.create_search_service()
+    results = search_service.search(
+        query, page=page, per_page=current_app.config["SEARCH_RESULTS_PER_PAGE"]
+    )
+    next_url = None
+    if results.has_next:
+        next_url = url_for("search.index", q=results.query, page=results.page + 1)
+    return render_template(template, results=results, next_url=next_url)
@@ -1,6 +1,7 @@
 """Service layer for Category entities."""
 
 import logging
+from blog.events import ContentChange, category_changed, send_on_commit
 from blog.repos.category import CategoryRepository
 from blog.domain.category import Category
 
@@ -52,25 +53,30 @@ class CategoryService:
 
     def create_category(self, category: Category) -> Category:
         try:
-            return self.category_repository.create(category)
+            created = self.category_repository.create(category)
         except Exception as e:
             # Log the error with details
             logger.error(f"Failed to create category: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise CategoryCreationError(f"Failed to create category: {str(e)}") from e
+        self._send_change("created", created.id)
+        return created
 
     def update_category(self, category: Category) -> Category:
         try:
-            return self.category_repository.update(category)
+            updated = self.category_repository.update(category)
         except ValueError as e:
             # Log the error with details
             logger.error(f"Failed to update category: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise CategoryUpdateError(f"Failed to update category: {str(e)}") from e
+        self._send_change("updated", updated.id)
+        return updated
 
     def delete_category(self, category_id: int) -> bool:
+        post_aliases = self.category_repository.get_post_aliases(category_id)
         try:
-            return self.category_repository.delete(category_id)
+            deleted = self.category_repository.delete(category_id)
         except Exception as e:
             # Log the error with details
             logger.error(
@@ -79,3 +85,26 @@ class CategoryService:
             )
             # Return False to indicate failure
             return False
+        if deleted:
+            send_on_commit(
+                self.category_repository.session,
+                category_changed,
+                self,
+                change=ContentChange(
+                    action="deleted", post_aliases=frozenset(post_aliases)
+                ),
+            )
+        return deleted
+
+    def _send_change(self, action: str, category_id: int | None):
+        post_aliases = (
+            self.category_repository.get_post_aliases(category_id)
+            if category_id
+            else []
+        )
+        send_on_commit(
+            self.category_repository.session,
+            category_changed,
+            self,
+            change=ContentChange(action=action, post_aliases=frozenset(post_aliases)),
+        )
@@ -4,11 +4,13 @@ from blog.extensions import db
 from blog.repos.post import PostRepository
 from blog.repos.category import CategoryRepository
 from blog.repos.icon import IconRepository
+from blog.repos.search import SearchRepository
 from blog.repos.tag import TagRepository
 from blog.repos.user import UserRepository
 from blog.services.post import PostService
 from blog.services.category import CategoryService
 from blog.services.icon import IconService
+from blog.services.search import SearchService
 from blog.services.tag import TagService
 from blog.services.user import UserService
 
@@ -34,6 +36,12 @@ class ServiceFactory:
         icon_repository = IconRepository(db.session)
         return IconService(icon_repository)
 
+    @staticmethod
+    def create_search_service():
+        """Create a SearchService instance with its dependencies."""
+        search_repository = SearchRepository(db.session)
+        return SearchService(search_repository)
+
     @staticmethod
     def create_tag_service():
         """Create a TagService instance with its dependencies."""
@@ -1,6 +1,7 @@
 """Service layer for Icon entities."""
 
 import logging
+from blog.events import ContentChange, icon_changed, send_on_commit
 from blog.repos.icon import IconRepository
 from blog.domain.icon import Icon
 
@@ -49,25 +50,39 @@ class IconService:
 
     def create_icon(self, icon: Icon) -> Icon:
         try:
-            return self.icon_repository.create(icon)
+            created = self.icon_repository.create(icon)
         except Exception as e:
             # Log the error with details
             logger.error(f"Failed to create icon: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise IconCreationError(f"Failed to create icon: {str(e)}") from e
+        send_on_commit(
+            self.icon_repository.session,
+            icon_changed,
+            self,
+            change=ContentChange(action="created"),
+        )
+        return created
 
     def update_icon(self, icon: Icon) -> Icon:
         try:
-            return self.icon_repository.update(icon)
+            updated = self.icon_repository.update(icon)
         except ValueError as e:
             # Log the error with details
             logger.error(f"Failed to update icon: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise IconUpdateError(f"Failed to update icon: {str(e)}") from e
+        send_on_commit(
+            self.icon_repository.session,
+            icon_changed,
+            self,
+            change=ContentChange(action="updated"),
+        )
+        return updated
 
     def delete_icon(self, icon_id: int) -> bool:
         try:
-            return self.icon_repository.delete(icon_id)
+            deleted = self.icon_repository.delete(icon_id)
         except Exception as e:
             # Log the error with details
             logger.error(
@@ -75,3 +90,11 @@ class IconService:
             )
             # Return False to indicate failure
             return False
+        if deleted:
+            send_on_commit(
+                self.icon_repository.session,
+                icon_changed,
+                self,
+                change=ContentChange(action="deleted"),
+            )
+        return deleted
@@ -1,6 +1,16 @@
+import datetime
 import logging
+from collections.abc import Iterable
+from blog.events import ContentChange, post_changed, send_on_commit
 from blog.repos.post import PostRepository
-from blog.domain.post import Post
+from blog.domain.post import (
+    ArchiveYear,
+    Post,
+    PostCursor,
+    PostPage,
+    PostSummary,
+    PostSummaryPage,
+)
 from blog.domain.tag import Tag
 
 
@@ -43,6 +53,13 @@ class PostService:
     def get_post_by_alias(self, alias: str) -> Post | None:
         return self.post_repository.get_by_alias(alias)
 
+    def get_post_page(self, alias: str) -> PostPage | None:
+        """Get a post with the tags and category shown on its page."""
+        return self.post_repository.get_page_by_alias(alias)
+
+    def get_content_hash(self, alias: str) -> str | None:
+        return self.post_repository.get_content_hash(alias)
+
     def get_all_posts(self) -> list[Post]:
         return self.post_repository.get_all()
 
@@ -59,34 +76,157 @@ class PostService:
         """Get all posts associated with a specific tag."""
         return self.post_repository.get_posts_by_tag(tag_id)
 
+    def get_published_summaries(self) -> list[PostSummary]:
+        return self.post_repository.get_published_summaries()
+
+    def get_all_published_summaries(self) -> list[PostSummary]:
+        return self.post_repository.get_all_published_summaries()
+
+    def get_published_summaries_page(
+        self, limit: int, after: PostCursor | None = None
+    ) -> PostSummaryPage:
+        return self.post_repository.get_published_summaries_page(limit, after)
+
+    def is_published_cursor(self, cursor: PostCursor) -> bool:
+        """Whether ``cursor`` points at a published post, as links do."""
+        return self.post_repository.is_published_cursor(cursor)
+
+    def get_archive(self) -> list[ArchiveYear]:
+        """Years with published posts and their months, newest first."""
+        years: list[ArchiveYear] = []
+        for month in self.post_repository.get_archive_months():
+            if not years or years[-1].year != month.year:
+                years.append(ArchiveYear(month.year))
+            years[-1].months.append(month)
+        return years
+
+    def get_archive_page(
+        self,
+        year: int,
+        month: int | None,
+        limit: int,
+        after: PostCursor | None = None,
+    ) -> PostSummaryPage:
+        """One page of the posts published in a year, or a month of it.
+
+        Raises:
+            ValueError: If the year or month does not exist
+        """
+        # Naive bounds, compared with publishedon as stored like cursors.
+        since = datetime.datetime(year, month or 1, 1)
+        if month is None or month == 12:
+            next_year, next_month = year + 1, 1
+        else:
+            next_year, next_month = year, month + 1
+        until = None
+        if next_year <= datetime.MAXYEAR:
+            until = datetime.datetime(next_year, next_month, 1)
+        return self.post_repository.get_published_summaries_page(
+            limit, after, since=since, until=until
+        )
+
+    def get_summaries_page_by_tag(
+        self, tag_id: int, limit: int, after: PostCursor | None = None
+    ) -> PostSummaryPage:
+        return self.post_repository.get_summaries_page_by_tag(tag_id, limit, after)
+
+    def get_page_summaries(self) -> list[PostSummary]:
+        return self.post_repository.get_page_summaries()
+
+    def get_summaries_by_tag(self, tag_id: int) -> list[PostSummary]:
+        """Get summaries of all posts associated with a specific tag."""
+        return self.post_repository.get_summaries_by_tag(tag_id)
+
     def get_tags_for_post(self, post_id: int) -> list[Tag]:
         """Get all tags associated with a specific post."""
         return self.post_repository.get_tags_for_post(post_id)
 
+    def get_related_posts(self, post_id: int) -> list[PostSummary]:
+        """Get the posts sharing the most tags with a post."""
+        return self.post_repository.get_related_summaries(post_id)
+
+    def get_related_referrers(self, aliases: set[str]) -> list[str]:
+        """Get aliases of the posts listing any of ``aliases`` as related."""
+        return self.post_repository.get_related_referrers(aliases)
+
+    def rebuild_related_posts(self, limit: int) -> list[str]:
+        """Rebuild the related posts index, returns aliases of changed lists."""
+        return self.post_repository.rebuild_related_posts(limit)
+
+    def touch_posts(self, aliases: Iterable[str]) -> None:
+        """Mark posts as changed, their pages show other posts that did."""
+        self.post_repository.touch_posts(aliases)
+
+    def get_posts_changed_since(self, since: datetime.datetime) -> list[Post]:
+        """Get posts created or updated after ``since``."""
+        return self.post_repository.get_changed_since(since)
+
+    def get_last_updated(self) -> datetime.datetime | None:
+        return self.post_repository.get_last_updated()
+
+    def refresh_renderings(self, force: bool = False) -> int:
+        """Re-render stored HTML for posts with a stale rendering."""
+        return self.post_repository.refresh_renderings(force=force)
+
     def create_post(self, post: Post) -> Post:
         try:
-            return self.post_repository.create(post)
+            created = self.post_repository.create(post)
         except Exception as e:
             # Log the error with details
             logger.error(f"Failed to create post: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise PostCreationError(f"Failed to create post: {str(e)}") from e
+        self._send_change("created", created)
+        return created
 
     def update_post(self, post: Post) -> Post:
+        previous = self.post_repository.get_by_id(post.id) if post.id else None
         try:
-            return self.post_repository.update(post)
+            updated = self.post_repository.update(post)
         except ValueError as e:
             # Log the error with details
             logger.error(f"Failed to update post: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise PostUpdateError(f"Failed to update post: {str(e)}") from e
+        self._send_change("updated", updated, previous)
+        return updated
 
     def delete_post(self, post_id: int) -> bool:
+        previous = self.post_repository.get_by_id(post_id)
+        tags = self.post_repository.get_tags_for_post(post_id) if previous else []
         try:
-            return self.post_repository.delete(post_id)
+            deleted = self.post_repository.delete(post_id)
         except Exception as e:
             # Log the error with details
             logger.error(
                 f"Failed to delete post with id {post_id}: {str(e)}", exc_info=True
             )
             raise PostNotFoundError(f"Failed to delete post with id: {str(e)}") from e
+        if previous:
+            send_on_commit(
+                self.post_repository.session,
+                post_changed,
+                self,
+                change=ContentChange(
+                    action="deleted",
+                    post_aliases=frozenset({previous.alias}),
+                    tag_aliases=frozenset(tag.alias for tag in tags),
+                ),
+            )
+        return deleted
+
+    def _send_change(self, action: str, post: Post, previous: Post | None = None):
+        aliases = {post.alias}
+        if previous:
+            aliases.add(previous.alias)
+        tags = self.post_repository.get_tags_for_post(post.id) if post.id else []
+        send_on_commit(
+            self.post_repository.session,
+            post_changed,
+            self,
+            change=ContentChange(
+                action=action,
+                post_aliases=frozenset(aliases),
+                tag_aliases=frozenset(tag.alias for tag in tags),
+            ),
+        )
@@ -0,0 +1,44 @@
+"""Service layer for full-text search."""
+
+import logging
+
+from blog.domain.search import SearchPage
+from blog.infrastructure.search import query_terms
+from blog.repos.search import SearchRepository
+
+logger = logging.getLogger(__name__)
+
+
+class SearchService:
+    """Service layer for searching posts."""
+
+    # Ranked results are paged by offset, deep pages cost more and are
+    # never read.
+    MAX_PAGE = 50
+
+    def __init__(self, search_repository: SearchRepository):
+        self.search_repository = search_repository
+
+    def search(self, query: str, page: int = 1, per_page: int = 20) -> SearchPage:
+        """One page of posts matching ``query``, best matches first.
+
+        Queries without words, and pages past MAX_PAGE, have no results.
+        """
+        query = query.strip()
+        terms = query_terms(query)
+        if not terms or not 1 <= page <= self.MAX_PAGE:
+            return SearchPage(query=query, page=page)
+        hits = self.search_repository.search(
+            terms, limit=per_page + 1, offset=(page - 1) * per_page
+        )
+        return SearchPage(
+            query=query,
+            hits=hits[:per_page],
+            page=page,
+            has_next=len(hits) > per_page and page < self.MAX_PAGE,
+        )
+
+    def reindex(self, full: bool = False) -> int:
+        indexed = self.search_repository.reindex(full=full)
+        logger.info("Indexed %d post(s) for search", indexed)
+        return indexed
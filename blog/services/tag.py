@@ -1,8 +1,9 @@
 """Service layer for Tag entities."""
 
 import logging
+from blog.events import ContentChange, tag_changed, send_on_commit
 from blog.repos.tag import TagRepository
-from blog.domain.tag import Tag
+from blog.domain.tag import Tag, TagCount
 
 
 logger = logging.getLogger(__name__)
@@ -50,27 +51,37 @@ class TagService:
     def get_tags_with_posts(self) -> list[Tag]:
         return self.tag_repository.get_tags_with_posts()
 
+    def get_tag_counts(self) -> list[TagCount]:
+        return self.tag_repository.get_tag_counts()
+
     def create_tag(self, tag: Tag) -> Tag:
         try:
-            return self.tag_repository.create(tag)
+            created = self.tag_repository.create(tag)
         except Exception as e:
             # Log the error with details
             logger.error(f"Failed to create tag: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise TagCreationError(f"Failed to create tag: {str(e)}") from e
+        self._send_change("created", created)
+        return created
 
     def update_tag(self, tag: Tag) -> Tag:
+        previous = self.tag_repository.get_by_id(tag.id) if tag.id else None
         try:
-            return self.tag_repository.update(tag)
+            updated = self.tag_repository.update(tag)
         except ValueError as e:
             # Log the error with details
             logger.error(f"Failed to update tag: {str(e)}", exc_info=True)
             # Re-raise as a more specific exception for the service layer
             raise TagUpdateError(f"Failed to update tag: {str(e)}") from e
+        self._send_change("updated", updated, previous)
+        return updated
 
     def delete_tag(self, tag_id: int) -> bool:
+        previous = self.tag_repository.get_by_id(tag_id)
+        post_aliases = self.tag_repository.get_post_aliases(tag_id) if previous else []
         try:
-            return self.tag_repository.delete(tag_id)
+            deleted = self.tag_repository.delete(tag_id)
         except Exception as e:
             # Log the error with details
             logger.error(
@@ -78,3 +89,31 @@ class TagService:
             )
             # Return False to indicate failure
             return False
+        if deleted and previous:
+            send_on_commit(
+                self.tag_repository.session,
+                tag_changed,
+                self,
+                change=ContentChange(
+                    action="deleted",
+                    post_aliases=frozenset(post_aliases),
+                    tag_aliases=frozenset({previous.alias}),
+                ),
+            )
+        return deleted
+
+    def _send_change(self, action: str, tag: Tag, previous: Tag | None = None):
+        aliases = {tag.alias}
+        if previous:
+            aliases.add(previous.alias)
+        post_aliases = self.tag_repository.get_post_aliases(tag.id) if tag.id else []
+        send_on_commit(
+            self.tag_repository.session,
+            tag_changed,
+            self,
+            change=ContentChange(
+                action=action,
+                post_aliases=frozenset(post_aliases),
+                tag_aliases=frozenset(aliases),
+            ),
+        )
@@ -1,7 +1,18 @@
 from typing import TYPE_CHECKING
 
-from flask import Blueprint, render_template, Response, abort, request
+from flask import (
+    Blueprint,
+    Response,
+    abort,
+    current_app,
+    render_template,
+    request,
+    url_for,
+)
 
+from blog.caching.validators import site_validators
+from blog.caching.views import HTMX_VARY, cached_view
+from blog.domain.post import PostCursor
 from blog.services.factory import ServiceFactory
 
 if TYPE_CHECKING:
@@ -11,25 +22,64 @@ tags = Blueprint("tags", __name__, url_prefix="/tags")
 
 
 @tags.route("/")
+@cached_view(vary=HTMX_VARY, validators=site_validators)
 def index() -> Response | str:
     template = "tags.htmx" if request.headers.get("HX-Request") else "tags.html"
     tag_service = ServiceFactory.create_tag_service()
-    tags = tag_service.get_all_tags()
+    tags = tag_service.get_tag_counts()
     return render_template(template, tags=tags)
 
 
+@tags.route("/hx/cloud")
+@cached_view(validators=site_validators)
+def cloud_hx() -> Response | str:
+    tag_service = ServiceFactory.create_tag_service()
+    tags = [tag for tag in tag_service.get_tag_counts() if tag.post_count]
+    max_count = max((tag.post_count for tag in tags), default=1)
+    return render_template("tag_cloud.htmx", tags=tags, max_count=max_count)
+
+
 @tags.route("/<alias>")
+@cached_view(vary=HTMX_VARY, validators=site_validators)
 def view(alias: str | None = None) -> Response | str:
+    return _render_tag(alias, None)
+
+
+@tags.route("/<alias>/after/<cursor>")
+@cached_view(vary=HTMX_VARY, validators=site_validators, generational=True)
+def view_after(alias: str, cursor: str) -> Response | str:
+    after = PostCursor.decode(cursor)
+    # Pages are cached per cursor, only the ones links lead to are served.
+    post_service = ServiceFactory.create_post_service()
+    if after is None or not post_service.is_published_cursor(after):
+        abort(404)
+    return _render_tag(alias, after)
+
+
+def _render_tag(alias: str | None, after: PostCursor | None) -> Response | str:
     template = "posts.htmx" if request.headers.get("HX-Request") else "tag.html"
     if alias is None:
         abort(404)
 
     tag_service = ServiceFactory.create_tag_service()
     tag = tag_service.get_tag_by_alias(alias)
-    if not tag:
+    if not tag or not tag.id:
         abort(404)
 
     # Get posts for this tag through the post service
     post_service = ServiceFactory.create_post_service()
-    posts = post_service.get_posts_by_tag(tag.id) if tag.id else []
-    return render_template(template, posts=posts, tag=tag)
+    page = post_service.get_summaries_page_by_tag(
+        tag.id, current_app.config["POSTS_PER_PAGE"], after
+    )
+    next_url = None
+    if page.next_cursor is not None:
+        next_url = url_for(
+            "tags.view_after", alias=alias, cursor=page.next_cursor.encode()
+        )
+    return render_template(
+        template,
+        years=page.by_year(),
+        tag=tag,
+        next_url=next_url,
+        continued_year=after.publishedon.year if after else None,
+    )
@@ -1,3 +1,8 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from gunicorn.workers.base import Worker
+
 workers = 2
 backlog = 2048
 worker_class = "gevent"
@@ -9,3 +14,17 @@ accesslog = "-"
 errorlog = "-"
 loglevel = "info"
 wsgi_app = "app:create_app()"
+
+
+def post_worker_init(worker: "Worker") -> None:
+    # Runs after the gevent worker patched the standard library: importing
+    # blog creates threading locks, they have to be the patched ones.
+    from blog.infrastructure.postgres import dispose_engines, make_psycopg_green
+
+    if worker.cfg.worker_class_str == "gevent":
+        make_psycopg_green()
+    # Loaded by now; when the master preloaded it, its engines hold
+    # connections of the master.
+    app = getattr(worker.app, "callable", None)
+    if app is not None:
+        dispose_engines(app)
@@ -17,17 +17,18 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-fileConfig(str(config.config_file_name))
+# Keeps the loggers of the application, which is already imported.
+fileConfig(str(config.config_file_name), disable_existing_loggers=False)
 logger = logging.getLogger("alembic.env")
 
 
 def get_engine():
     try:
-        # this works with Flask-SQLAlchemy<3 and Alchemical
-        return current_app.extensions["migrate"].db.get_engine()
-    except (TypeError, AttributeError):
         # this works with Flask-SQLAlchemy>=3
         return current_app.extensions["migrate"].db.engine
+    except (TypeError, AttributeError):
+        # this works with Flask-SQLAlchemy<3 and Alchemical
+        return current_app.extensions["migrate"].db.get_engine()
 
 
 def get_engine_url():
@@ -56,6 +57,21 @@ def get_metadata():
     return target_db.metadata
 
 
+# The full-text index of posts is created by raw DDL (see
+# blog.infrastructure.search), autogenerate must not drop it: the FTS5
+# table with its shadow tables on SQLite, the tsvector column and its
+# GIN index on PostgreSQL.
+SEARCH_TABLE = "posts_search"
+SEARCH_OBJECTS = {("column", "search_vector"), ("index", "ix_posts_search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name is not None:
+        if name == SEARCH_TABLE or name.startswith(SEARCH_TABLE + "_"):
+            return False
+    return (type_, name) not in SEARCH_OBJECTS
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -69,7 +85,12 @@ def run_migrations_offline():
 
     """
     url = config.get_main_option("sqlalchemy.url")
-    context.configure(url=url, target_metadata=get_metadata(), literal_binds=True)
+    context.configure(
+        url=url,
+        target_metadata=get_metadata(),
+        literal_binds=True,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -98,6 +119,7 @@ def run_migrations_online():
     conf_args = current_app.extensions["migrate"].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,37 @@
+"""Store pre-rendered post HTML
+
+Revision ID: 3f9c1d2a7b40
+Revises: b7b6e253e6fb
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f9c1d2a7b40"
+down_revision = "b7b6e253e6fb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("content_html", sa.Text(), nullable=True))
+        batch_op.add_column(
+            sa.Column("content_hash", sa.String(length=64), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("renderer_version", sa.String(length=32), nullable=True)
+        )
+    # Existing rows are rendered by `flask render-posts`; until then views
+    # fall back to rendering on the fly.
+
+
+def downgrade():
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_column("renderer_version")
+        batch_op.drop_column("content_hash")
+        batch_op.drop_column("content_html")
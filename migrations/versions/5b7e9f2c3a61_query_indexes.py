@@ -0,0 +1,62 @@
+"""Index hot post queries and give posts_tags a primary key
+
+Revision ID: 5b7e9f2c3a61
+Revises: 8e2a6c4f1d95
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b7e9f2c3a61"
+down_revision = "8e2a6c4f1d95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.create_index(
+            "ix_posts_publishedon_id", ["publishedon", "id"], unique=False
+        )
+        batch_op.create_index(
+            "ix_posts_category_id_publishedon",
+            ["category_id", "publishedon", "id"],
+            unique=False,
+        )
+
+    # The primary key needs unique pairs without NULLs, keep one copy of
+    # every link and drop half-empty ones.
+    op.execute(
+        "CREATE TABLE posts_tags_dedup AS SELECT DISTINCT post_id, tag_id "
+        "FROM posts_tags WHERE post_id IS NOT NULL AND tag_id IS NOT NULL"
+    )
+    op.execute("DELETE FROM posts_tags")
+    op.execute(
+        "INSERT INTO posts_tags (post_id, tag_id) "
+        "SELECT post_id, tag_id FROM posts_tags_dedup"
+    )
+    op.drop_table("posts_tags_dedup")
+
+    with op.batch_alter_table("posts_tags", schema=None) as batch_op:
+        batch_op.alter_column("post_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column("tag_id", existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key("pk_posts_tags", ["post_id", "tag_id"])
+        batch_op.create_index(
+            "ix_posts_tags_tag_id", ["tag_id", "post_id"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("posts_tags", schema=None) as batch_op:
+        batch_op.drop_index("ix_posts_tags_tag_id")
+        batch_op.drop_constraint("pk_posts_tags", type_="primary")
+        batch_op.alter_column("tag_id", existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column("post_id", existing_type=sa.Integer(), nullable=True)
+
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_index("ix_posts_category_id_publishedon")
+        batch_op.drop_index("ix_posts_publishedon_id")
@@ -0,0 +1,38 @@
+"""Track when posts change
+
+Revision ID: 8e2a6c4f1d95
+Revises: 3f9c1d2a7b40
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8e2a6c4f1d95"
+down_revision = "3f9c1d2a7b40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("updatedon", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.create_index(
+            batch_op.f("ix_posts_updatedon"), ["updatedon"], unique=False
+        )
+    # The best known approximation of the last change of existing posts.
+    op.execute(
+        "UPDATE posts SET updatedon = COALESCE(publishedon, createdon) "
+        "WHERE updatedon IS NULL"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("posts", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_posts_updatedon"))
+        batch_op.drop_column("updatedon")
@@ -0,0 +1,38 @@
+"""Related posts index
+
+Revision ID: 9a2f6c1e4b85
+Revises: c4d8a1e7f203
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9a2f6c1e4b85"
+down_revision = "c4d8a1e7f203"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "related_posts",
+        sa.Column("post_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.SmallInteger(), nullable=False),
+        sa.Column("related_id", sa.Integer(), nullable=True),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["post_id"], ["posts.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["related_id"], ["posts.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("post_id", "position"),
+    )
+    op.create_index(
+        "ix_related_posts_related_id", "related_posts", ["related_id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("ix_related_posts_related_id", table_name="related_posts")
+    op.drop_table("related_posts")
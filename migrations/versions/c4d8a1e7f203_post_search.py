@@ -0,0 +1,90 @@
+"""Full-text search index of posts
+
+Revision ID: c4d8a1e7f203
+Revises: 5b7e9f2c3a61
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c4d8a1e7f203"
+down_revision = "5b7e9f2c3a61"
+branch_labels = None
+depends_on = None
+
+
+SQLITE_VALUES = (
+    "{row}.id, {row}.pagetitle, coalesce({row}.content, ''), {row}.updatedon"
+)
+
+POSTGRES_VECTOR = (
+    "setweight(to_tsvector('russian', coalesce({row}.pagetitle, '')), 'A')"
+    " || setweight(to_tsvector('russian', coalesce({row}.content, '')), 'B')"
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        new = SQLITE_VALUES.format(row="new")
+        op.execute(
+            "CREATE VIRTUAL TABLE posts_search USING fts5("
+            "pagetitle, content, updatedon UNINDEXED, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_search_insert AFTER INSERT ON posts BEGIN "
+            "INSERT INTO posts_search (rowid, pagetitle, content, updatedon) "
+            f"VALUES ({new}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_search_update "
+            "AFTER UPDATE OF pagetitle, content, updatedon ON posts BEGIN "
+            "DELETE FROM posts_search WHERE rowid = old.id; "
+            "INSERT INTO posts_search (rowid, pagetitle, content, updatedon) "
+            f"VALUES ({new}); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_search_delete AFTER DELETE ON posts BEGIN "
+            "DELETE FROM posts_search WHERE rowid = old.id; END"
+        )
+        op.execute(
+            "INSERT INTO posts_search (rowid, pagetitle, content, updatedon) "
+            f"SELECT {SQLITE_VALUES.format(row='posts')} FROM posts"
+        )
+    elif dialect == "postgresql":
+        op.execute("ALTER TABLE posts ADD COLUMN search_vector tsvector")
+        op.execute(
+            "CREATE OR REPLACE FUNCTION posts_search_vector_update() "
+            "RETURNS trigger AS $$ BEGIN "
+            f"NEW.search_vector := {POSTGRES_VECTOR.format(row='NEW')}; "
+            "RETURN NEW; END $$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_search_vector "
+            "BEFORE INSERT OR UPDATE OF pagetitle, content ON posts "
+            "FOR EACH ROW EXECUTE FUNCTION posts_search_vector_update()"
+        )
+        op.execute(
+            f"UPDATE posts SET search_vector = {POSTGRES_VECTOR.format(row='posts')}"
+        )
+        op.execute(
+            "CREATE INDEX ix_posts_search_vector ON posts USING GIN (search_vector)"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS posts_search_delete")
+        op.execute("DROP TRIGGER IF EXISTS posts_search_update")
+        op.execute("DROP TRIGGER IF EXISTS posts_search_insert")
+        op.execute("DROP TABLE IF EXISTS posts_search")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_posts_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS posts_search_vector ON posts")
+        op.execute("DROP FUNCTION IF EXISTS posts_search_vector_update()")
+        op.execute("ALTER TABLE posts DROP COLUMN IF EXISTS search_vector")
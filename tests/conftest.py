@@ -1,7 +1,10 @@
 import pytest
 import os
+from contextlib import contextmanager
+
 from blog import create_app
 from blog.extensions import db, admin_ext
+from blog.infrastructure.query_stats import collect_queries
 
 os.environ["FLASK_ENV"] = "testing"
 
@@ -30,3 +33,20 @@ def admin_app():
 @pytest.fixture()
 def client_admin(admin_app):
     return admin_app.test_client()
+
+
+@pytest.fixture()
+def query_budget():
+    """Assert that a block issues at most ``statements`` SQL statements.
+
+    A statement repeated ``repeat_limit`` times fails too, that is an N+1.
+    """
+
+    @contextmanager
+    def budget(statements, repeat_limit=3):
+        with collect_queries() as stats:
+            yield stats
+        assert stats.statements <= statements, stats.report()
+        assert not stats.repeated(repeat_limit), stats.report()
+
+    return budget
@@ -107,3 +107,17 @@ def test_admin_view(authenticated_client, user_repository):
         assert rv.status_code == 200
     rv = authenticated_client.get("/admin/myfileadmin/")
     assert rv.status_code == 200
+
+
+def test_post_view_on_model_change_renders(admin_app):
+    """Test that saving a post through the admin refreshes its rendered HTML."""
+    from blog.admin import PostView
+    from blog.post.models import Post as PostORM
+
+    with admin_app.app_context():
+        view = PostView(PostORM, db.session, endpoint="test_admin_post")
+        post_orm = PostORM(content="# Hi")
+        view.on_model_change(None, post_orm, True)
+    assert post_orm.content_html == "<h1>Hi</h1>"
+    assert post_orm.is_rendering_current()
+    assert post_orm.updatedon is not None
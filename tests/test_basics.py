@@ -1,8 +1,12 @@
 import pytest
 import os
 
+import sqlalchemy as sa
+
 from blog import create_app
 from blog import db
+from blog.infrastructure.postgres import configure_postgres
+from blog.infrastructure.sqlite import install_pragmas
 
 
 @pytest.fixture()
@@ -35,3 +39,29 @@ def test_rss(test_client):
     rv = test_client.get("/rss.xml")
     assert rv.status_code == 200
     assert rv.mimetype == "application/rss+xml"
+
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'blog.db'}")
+    install_pragmas(engine, {"journal_mode": "wal", "busy_timeout": 1234})
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+    engine.dispose()
+
+
+def test_postgres_pool_options(monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    app = create_app()
+    app.config.update(
+        {
+            "SQLALCHEMY_DATABASE_URI": "postgresql://blog@localhost/blog",
+            "DB_POOL_SIZE": 7,
+            "SQLALCHEMY_ENGINE_OPTIONS": {"pool_recycle": 60},
+        }
+    )
+    configure_postgres(app)
+    options = app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 60
@@ -0,0 +1,432 @@
+"""Tests for the view caching layer."""
+
+import pytest
+import datetime
+
+from blog import create_app
+from flask import make_response, redirect
+
+from blog.caching.views import HTMX_VARY, cached_view, variant_cache_keys
+from blog.extensions import cache, db
+from blog.domain.post import Post as PostDomain
+from blog.domain.tag import Tag as TagDomain
+from blog.domain.category import Category as CategoryDomain
+from blog.domain.icon import Icon as IconDomain
+from blog.events import ContentChange
+from blog.post.models import Post as PostORM
+from blog.related import RelatedPostsRefresher, refresh_related_posts
+from blog.services.factory import ServiceFactory
+from blog.tags.models import Tag as TagORM
+
+
+@pytest.fixture()
+def test_client(monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    app = create_app()
+    cache.init_app(app, config={"CACHE_TYPE": "SimpleCache"})
+    with app.test_client() as client:
+        with app.app_context():
+            db.create_all()
+            yield client
+            cache.clear()
+            db.session.remove()
+            db.drop_all()
+
+
+def create_test_post(alias="test-post"):
+    post_service = ServiceFactory.create_post_service()
+    post = post_service.create_post(
+        PostDomain(
+            pagetitle="Test Post",
+            alias=alias,
+            content="Test content",
+            publishedon=datetime.datetime.now(datetime.timezone.utc),
+        )
+    )
+    db.session.commit()
+    return post
+
+
+def test_htmx_and_full_page_are_cached_separately(test_client):
+    """Test that the HX-Request header selects its own cache entry."""
+    create_test_post()
+
+    full = test_client.get("/test-post")
+    fragment = test_client.get("/test-post", headers={"HX-Request": "true"})
+    full_again = test_client.get("/test-post")
+
+    assert b"<html" in full.data
+    assert b"<html" not in fragment.data
+    assert full_again.data == full.data
+    assert "HX-Request" in full.headers["Vary"]
+    assert "HX-Request" in fragment.headers["Vary"]
+
+
+def test_cached_response_is_served_from_cache(test_client):
+    """Test that a second request does not hit the view again."""
+    create_test_post()
+    test_client.get("/test-post")
+
+    # Bypass the service layer so no change event is sent
+    db.session.execute(db.update(PostORM).values(pagetitle="Changed Title"))
+    db.session.commit()
+
+    rv = test_client.get("/test-post")
+    assert b"Test Post" in rv.data
+    assert b"Changed Title" not in rv.data
+
+
+def test_undeclared_header_value_bypasses_cache(test_client):
+    """Test that unknown header values are rendered but never stored."""
+    create_test_post()
+
+    rv = test_client.get("/test-post", headers={"HX-Request": "bogus"})
+    assert rv.status_code == 200
+    assert cache.get("view:/test-post?hx-request=bogus") is None
+    for key in variant_cache_keys("/test-post", HTMX_VARY):
+        assert cache.get(key) is None
+
+
+def test_tags_views_are_cached_per_variant(test_client):
+    """Test that tag pages are cached and vary on HX-Request."""
+    tag_service = ServiceFactory.create_tag_service()
+    tag_service.create_tag(TagDomain(title="Python", alias="python"))
+
+    full = test_client.get("/tags/")
+    fragment = test_client.get("/tags/", headers={"HX-Request": "true"})
+
+    assert b"<html" in full.data
+    assert b"<html" not in fragment.data
+    assert "HX-Request" in fragment.headers["Vary"]
+    for key in variant_cache_keys("/tags/", HTMX_VARY):
+        assert cache.get(key) is not None
+
+    rv = test_client.get("/tags/python", headers={"HX-Request": "true"})
+    assert rv.status_code == 200
+    assert "HX-Request" in rv.headers["Vary"]
+
+
+def test_missing_pages_are_not_cached(test_client):
+    """Test that 404 responses do not populate the cache."""
+    rv = test_client.get("/missing")
+    assert rv.status_code == 404
+    for key in variant_cache_keys("/missing", HTMX_VARY):
+        assert cache.get(key) is None
+
+
+def test_rendered_response_keeps_view_headers(test_client):
+    """Test that a miss returns the view's response, headers included."""
+    app = test_client.application
+
+    @app.route("/cached-headers")
+    @cached_view()
+    def cached_headers():
+        response = make_response("body")
+        response.headers["X-View"] = "set"
+        response.set_cookie("seen", "1")
+        return response
+
+    @app.route("/cached-redirect")
+    @cached_view()
+    def cached_redirect():
+        return redirect("/elsewhere")
+
+    rv = test_client.get("/cached-headers")
+    assert rv.headers["X-View"] == "set"
+    assert "seen=1" in rv.headers["Set-Cookie"]
+    assert test_client.get("/cached-headers").data == b"body"
+
+    rv = test_client.get("/cached-redirect")
+    assert rv.status_code == 302
+    assert rv.headers["Location"] == "/elsewhere"
+    assert cache.get("view:/cached-redirect") is None
+
+
+def test_streamed_responses_are_not_cached(test_client):
+    """Test that direct passthrough responses are neither read nor stored."""
+    app = test_client.application
+
+    @app.route("/cached-stream")
+    @cached_view()
+    def cached_stream():
+        response = app.response_class(iter([b"streamed"]))
+        response.direct_passthrough = True
+        return response
+
+    assert test_client.get("/cached-stream").data == b"streamed"
+    assert cache.get("view:/cached-stream") is None
+
+
+def test_post_update_purges_post_and_list_pages(test_client):
+    """Test that updating a post purges its page and every list page."""
+    post = create_test_post()
+    for path in ("/test-post", "/posts", "/rss.xml", "/sitemap.xml"):
+        assert test_client.get(path).status_code == 200
+
+    post_service = ServiceFactory.create_post_service()
+    post.pagetitle = "Changed Title"
+    post_service.update_post(post)
+    db.session.commit()
+
+    for path in ("/test-post", "/posts", "/rss.xml"):
+        assert b"Changed Title" in test_client.get(path).data
+
+
+def test_changes_purge_only_once_committed(test_client):
+    """Test that change events wait for the commit and die with a rollback."""
+
+    def cached():
+        keys = variant_cache_keys("/test-post", HTMX_VARY)
+        return [key for key in keys if cache.get(key) is not None]
+
+    post = create_test_post()
+    test_client.get("/test-post")
+    assert cached()
+
+    post_service = ServiceFactory.create_post_service()
+    post.pagetitle = "Rolled Back"
+    post_service.update_post(post)
+    assert cached()
+    db.session.rollback()
+    db.session.commit()
+    assert cached()
+
+    post_service.update_post(post)
+    db.session.commit()
+    assert not cached()
+
+
+def test_post_alias_change_purges_old_alias(test_client):
+    """Test that renaming a post purges the page under its old alias."""
+    post = create_test_post()
+    assert test_client.get("/test-post").status_code == 200
+
+    post_service = ServiceFactory.create_post_service()
+    post.alias = "renamed-post"
+    post_service.update_post(post)
+    db.session.commit()
+
+    assert test_client.get("/test-post").status_code == 404
+
+
+def test_new_post_purges_post_list(test_client):
+    """Test that creating a post purges the cached post list."""
+    create_test_post()
+    test_client.get("/posts")
+
+    create_test_post(alias="second-post")
+
+    assert b"second-post" in test_client.get("/posts").data
+
+
+def test_tag_rename_purges_tag_pages(test_client):
+    """Test that renaming a tag purges the tags index and its pages."""
+    tag_service = ServiceFactory.create_tag_service()
+    tag = tag_service.create_tag(TagDomain(title="Python", alias="python"))
+    db.session.commit()
+    test_client.get("/tags/")
+    test_client.get("/tags/python")
+
+    tag.title = "Snake"
+    tag_service.update_tag(tag)
+    db.session.commit()
+
+    assert b"Snake" in test_client.get("/tags/").data
+    assert b"Snake" in test_client.get("/tags/python").data
+
+
+def test_post_delete_purges_tag_counts(test_client):
+    """Test that deleting a tagged post purges the tag counts."""
+    post = create_test_post()
+    post_orm = db.session.get(PostORM, post.id)
+    post_orm.tags.append(TagORM(title="Python", alias="python"))
+    db.session.commit()
+    assert b"Python" in test_client.get("/tags/hx/cloud").data
+
+    post_service = ServiceFactory.create_post_service()
+    post_service.delete_post(post.id)
+    db.session.commit()
+
+    assert b"Python" not in test_client.get("/tags/hx/cloud").data
+    assert b">0<" in test_client.get("/tags/").data
+
+
+def test_related_posts_rebuild_purges_post_pages(test_client):
+    """Test that pages whose related posts changed are purged."""
+    tag = TagORM(title="Python", alias="python")
+    db.session.add(tag)
+    for alias in ("first", "second"):
+        post = create_test_post(alias)
+        tag.posts.append(db.session.get(PostORM, post.id))
+    db.session.commit()
+    assert b"Related posts" not in test_client.get("/first").data
+
+    long_ago = datetime.datetime(2000, 1, 1)
+    db.session.execute(db.update(PostORM).values(updatedon=long_ago))
+    db.session.commit()
+
+    assert refresh_related_posts() == 2
+
+    assert b"/second" in test_client.get("/first").data
+    assert b"/first" in test_client.get("/second").data
+    # Incremental exports render the touched pages again.
+    touched = db.session.scalars(db.select(PostORM.updatedon)).all()
+    assert all(updatedon > long_ago for updatedon in touched)
+
+
+def test_related_posts_refresher_batches_changes(test_client):
+    """Test that changes before a pending rebuild join it."""
+    tag = TagORM(title="Python", alias="python")
+    db.session.add(tag)
+    posts = [create_test_post(alias) for alias in ("first", "second")]
+    for post in posts:
+        tag.posts.append(db.session.get(PostORM, post.id))
+    db.session.commit()
+    refresh_related_posts()
+    assert b"Test Post" in test_client.get("/first").data
+
+    refresher = RelatedPostsRefresher(test_client.application, delay=60)
+    post_service = ServiceFactory.create_post_service()
+    posts[1].pagetitle = "Renamed"
+    post_service.update_post(posts[1])
+    db.session.commit()
+    refresher.schedule(None, ContentChange("updated", frozenset({"second"})))
+    timer = refresher._timer
+    refresher.schedule(None, ContentChange("updated", frozenset({"other"})))
+    assert refresher._timer is timer
+    timer.cancel()
+
+    # The rename purged /second only, /first lists it under its old title.
+    assert b"Renamed" not in test_client.get("/first").data
+    refresher.run()
+    assert b"Renamed" in test_client.get("/first").data
+    assert refresher._timer is None
+
+
+def test_category_change_purges_page_navigation(test_client):
+    """Test that category changes purge the pages navigation fragment."""
+    category_service = ServiceFactory.create_category_service()
+    category = category_service.create_category(
+        CategoryDomain(title="page", alias="page", page=True)
+    )
+    post_service = ServiceFactory.create_post_service()
+    post_service.create_post(
+        PostDomain(pagetitle="About", alias="about", category_id=category.id)
+    )
+    db.session.commit()
+    assert b"about" in test_client.get("/hx/pages").data
+
+    category_service.delete_category(category.id)
+    db.session.commit()
+
+    assert cache.get("view:/hx/pages") is None
+
+
+def test_icon_change_purges_icons_fragment(test_client):
+    """Test that icon changes purge the icons fragment."""
+    icon_service = ServiceFactory.create_icon_service()
+    test_client.get("/hx/icons")
+
+    icon_service.create_icon(IconDomain(title="github", url="https://github.com"))
+    db.session.commit()
+
+    assert b"github" in test_client.get("/hx/icons").data
+
+
+def test_admin_post_change_includes_previous_alias(test_client):
+    """Test that admin change events carry the alias before the edit."""
+    from blog.admin import PostView
+
+    create_test_post()
+    post_orm = db.session.scalar(db.select(PostORM).where(PostORM.alias == "test-post"))
+    post_orm.alias = "edited-post"
+
+    change = PostView.__new__(PostView).describe_change(post_orm, "updated")
+
+    assert change.post_aliases == frozenset({"test-post", "edited-post"})
+
+
+def test_post_view_conditional_get(test_client):
+    """Test that a matching ETag or Last-Modified returns 304."""
+    create_test_post()
+
+    rv = test_client.get("/test-post")
+    etag = rv.headers["ETag"]
+    assert rv.headers["Last-Modified"]
+
+    not_modified = test_client.get("/test-post", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == etag
+
+    since = test_client.get(
+        "/test-post", headers={"If-Modified-Since": rv.headers["Last-Modified"]}
+    )
+    assert since.status_code == 304
+
+
+def test_etag_changes_after_post_update(test_client):
+    """Test that a content change produces a new validator."""
+    post = create_test_post()
+    etag = test_client.get("/test-post").headers["ETag"]
+
+    post.content = "Changed content"
+    ServiceFactory.create_post_service().update_post(post)
+
+    rv = test_client.get("/test-post", headers={"If-None-Match": etag})
+    assert rv.status_code == 200
+    assert rv.headers["ETag"] != etag
+
+
+def test_htmx_and_full_page_have_different_etags(test_client):
+    """Test that fragments and full pages are separate representations."""
+    create_test_post()
+
+    full = test_client.get("/test-post")
+    fragment = test_client.get("/test-post", headers={"HX-Request": "true"})
+    assert full.headers["ETag"] != fragment.headers["ETag"]
+
+    rv = test_client.get(
+        "/test-post",
+        headers={"HX-Request": "true", "If-None-Match": full.headers["ETag"]},
+    )
+    assert rv.status_code == 200
+
+
+def test_missing_post_has_no_etag(test_client):
+    """Test that not found responses carry no validators."""
+    rv = test_client.get("/no-such-post")
+    assert rv.status_code == 404
+    assert "ETag" not in rv.headers
+
+
+def test_list_views_use_site_validators(test_client):
+    """Test that list pages answer conditional requests."""
+    create_test_post()
+
+    etag = test_client.get("/posts").headers["ETag"]
+    assert test_client.get("/posts", headers={"If-None-Match": etag}).status_code == 304
+
+    create_test_post(alias="other-post")
+    assert test_client.get("/posts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_load_more_pages_follow_content_changes(test_client):
+    """Test that cursor pages, which cannot be purged, are keyed by generation."""
+    test_client.application.config["POSTS_PER_PAGE"] = 1
+    create_test_post(alias="older")
+    create_test_post(alias="newer")
+
+    first = test_client.get("/posts")
+    next_url = first.data.split(b'href="/posts/after/')[1].split(b'"')[0]
+    path = "/posts/after/" + next_url.decode()
+    assert b"older" in test_client.get(path).data
+
+    # Renaming through the service bumps the content generation
+    post_service = ServiceFactory.create_post_service()
+    older = post_service.get_post_by_alias("older")
+    older.pagetitle = "Renamed"
+    post_service.update_post(older)
+    db.session.commit()
+
+    assert b"Renamed" in test_client.get(path).data
@@ -0,0 +1,99 @@
+"""Tests for the two-tier cache backend."""
+
+import os
+
+from flask import Flask
+from flask_caching import Cache
+from flask_caching.backends.simplecache import SimpleCache
+
+from blog.caching.backends import LocalLRU, TwoTierCache
+
+
+def make_worker(shared, **kwargs):
+    kwargs.setdefault("sync_interval", 0)
+    return TwoTierCache(shared, **kwargs)
+
+
+def test_local_lru_is_bounded():
+    lru = LocalLRU(maxsize=2)
+    lru.set("a", 1, 60)
+    lru.set("b", 2, 60)
+    lru.get("a")
+    lru.set("c", 3, 60)
+
+    assert lru.get("a") == 1
+    assert lru.get("b") is None
+    assert lru.get("c") == 3
+
+
+def test_hits_and_misses_are_counted_per_tier():
+    shared = SimpleCache()
+    worker = make_worker(shared)
+
+    assert worker.get("key") is None
+    shared.set("key", "value")
+    assert worker.get("key") == "value"
+    assert worker.get("key") == "value"
+
+    stats = worker.stats()
+    assert stats["local_hits"] == 1
+    assert stats["local_misses"] == 2
+    assert stats["shared_hits"] == 1
+    assert stats["shared_misses"] == 1
+
+
+def test_set_writes_through_to_shared_tier():
+    shared = SimpleCache()
+    first = make_worker(shared)
+    second = make_worker(shared)
+
+    first.set("key", "value")
+
+    assert shared.get("key") == "value"
+    assert second.get("key") == "value"
+    assert second.stats()["shared_hits"] == 1
+
+
+def test_delete_invalidates_other_workers():
+    shared = SimpleCache()
+    first = make_worker(shared)
+    second = make_worker(shared)
+    first.set("key", "value")
+    assert second.get("key") == "value"
+
+    first.delete("key")
+
+    assert second.get("key") is None
+
+
+def test_other_workers_sync_after_interval():
+    shared = SimpleCache()
+    first = make_worker(shared)
+    second = make_worker(shared, sync_interval=3600)
+    first.set("key", "value")
+    assert second.get("key") == "value"
+
+    first.delete("key")
+    # Still within the sync interval, the local copy is served.
+    assert second.get("key") == "value"
+
+    second._synced_at -= 3600
+    assert second.get("key") is None
+
+
+def test_factory_uses_file_store_as_shared_tier(tmp_path):
+    app = Flask(__name__)
+    cache = Cache()
+    cache.init_app(
+        app,
+        config={
+            "CACHE_TYPE": "blog.caching.backends.TwoTierCache",
+            "CACHE_DIR": os.fspath(tmp_path),
+            "CACHE_LOCAL_MAXSIZE": 8,
+        },
+    )
+    with app.app_context():
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+        assert cache.cache.local.maxsize == 8
+        assert list(tmp_path.iterdir())
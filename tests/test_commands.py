@@ -0,0 +1,179 @@
+"""Tests for the custom CLI commands."""
+
+import pytest
+import datetime
+
+from blog import create_app
+from blog.extensions import db
+from blog.domain.post import Post as PostDomain
+from blog.domain.tag import Tag as TagDomain
+from blog.post.models import Post as PostORM
+from blog.services.factory import ServiceFactory
+from blog.tags.models import Tag as TagORM
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_render_posts(app):
+    """Test that render-posts refreshes stale stored HTML."""
+    post_service = ServiceFactory.create_post_service()
+    created_post = post_service.create_post(
+        PostDomain(pagetitle="Post", alias="post", content="# Heading")
+    )
+    post_orm = db.session.get(PostORM, created_post.id)
+    post_orm.content_html = None
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["render-posts"])
+    assert result.exit_code == 0
+    assert "Re-rendered 1 post(s)." in result.output
+    assert db.session.get(PostORM, created_post.id).content_html == ("<h1>Heading</h1>")
+
+    result = app.test_cli_runner().invoke(args=["render-posts"])
+    assert "Re-rendered 0 post(s)." in result.output
+
+
+def test_export(app, tmp_path):
+    """Test that export writes full pages, fragments and feeds."""
+    post_service = ServiceFactory.create_post_service()
+    tag_service = ServiceFactory.create_tag_service()
+    tag_service.create_tag(TagDomain(title="Python", alias="python"))
+    post_service.create_post(
+        PostDomain(
+            pagetitle="Exported Post",
+            alias="exported-post",
+            content="# Heading",
+            publishedon=datetime.datetime.now(datetime.timezone.utc),
+        )
+    )
+
+    output_dir = tmp_path / "site"
+    output_dir.mkdir()
+    (output_dir / "stale.html").write_text("old")
+
+    result = app.test_cli_runner().invoke(
+        args=["export", str(output_dir), "--jobs", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "exported-post/index.html" in result.output
+
+    full = (output_dir / "exported-post" / "index.html").read_text()
+    fragment = (output_dir / "exported-post" / "index.htmx").read_text()
+    assert "<html" in full
+    assert "<html" not in fragment
+    assert "<h1>Heading</h1>" in fragment
+    assert (output_dir / "tags" / "python" / "index.htmx").exists()
+    assert (output_dir / "tags" / "index.html").exists()
+    assert "exported-post" in (output_dir / "rss.xml").read_text()
+    assert (output_dir / "robots.txt").exists()
+    assert (output_dir / "sitemap.xml").exists()
+    assert not (output_dir / "stale.html").exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["site"]
+
+
+def test_export_failure_keeps_previous_export(app, tmp_path, monkeypatch):
+    """Test that a page failing to render leaves the old export in place."""
+    from blog import export
+
+    output_dir = tmp_path / "site"
+    output_dir.mkdir()
+    (output_dir / "index.html").write_text("old")
+    monkeypatch.setattr(
+        export,
+        "collect_pages",
+        lambda: [export.ExportPage("/"), export.ExportPage("/missing")],
+    )
+    monkeypatch.setattr("blog.commands.collect_pages", export.collect_pages)
+
+    result = app.test_cli_runner().invoke(
+        args=["export", str(output_dir), "--jobs", "1"]
+    )
+    assert result.exit_code != 0
+    assert "/missing answered 404" in result.output
+    assert (output_dir / "index.html").read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["site"]
+
+
+def test_incremental_export_reuses_unchanged_posts(app, tmp_path):
+    """Test that only posts changed since the last export are rendered."""
+    post_service = ServiceFactory.create_post_service()
+    published = datetime.datetime.now(datetime.timezone.utc)
+    unchanged = post_service.create_post(
+        PostDomain(
+            pagetitle="Same", alias="same", content="Same", publishedon=published
+        )
+    )
+    changed = post_service.create_post(
+        PostDomain(pagetitle="Edit", alias="edit", content="Old", publishedon=published)
+    )
+    for post in (unchanged, changed):
+        db.session.get(PostORM, post.id).updatedon = datetime.datetime(
+            2020, 1, 1, tzinfo=datetime.timezone.utc
+        )
+    db.session.commit()
+
+    output_dir = tmp_path / "site"
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["export", str(output_dir), "--jobs", "1"])
+    assert result.exit_code == 0, result.output
+    (output_dir / "same" / "index.html").write_text("kept")
+
+    changed.content = "New"
+    post_service.update_post(changed)
+    db.session.commit()
+
+    result = runner.invoke(
+        args=["export", str(output_dir), "--jobs", "1", "--incremental"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "2 unchanged" in result.output
+    assert "same/index.html" not in result.output
+    assert (output_dir / "same" / "index.html").read_text() == "kept"
+    assert "New" in (output_dir / "edit" / "index.htmx").read_text()
+
+
+def test_search_reindex(app):
+    """Test that search-reindex only indexes what is missing unless --full."""
+    post_service = ServiceFactory.create_post_service()
+    post_service.create_post(PostDomain(pagetitle="Post", alias="post", content="x"))
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["search-reindex"])
+    assert result.exit_code == 0, result.output
+    assert "Indexed 0 post(s)" in result.output
+
+    result = runner.invoke(args=["search-reindex", "--full"])
+    assert "Indexed 1 post(s)" in result.output
+
+
+def test_related_posts(app):
+    """Test that related-posts reports only posts whose list changed."""
+    post_service = ServiceFactory.create_post_service()
+    tag_service = ServiceFactory.create_tag_service()
+    tag = tag_service.create_tag(TagDomain(title="Tag", alias="tag"))
+    tag_orm = db.session.get(TagORM, tag.id)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for alias in ("a", "b"):
+        post = post_service.create_post(
+            PostDomain(pagetitle=alias, alias=alias, publishedon=now)
+        )
+        tag_orm.posts.append(db.session.get(PostORM, post.id))
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["related-posts"])
+    assert result.exit_code == 0, result.output
+    assert "Related posts of 2 post(s) changed" in result.output
+
+    result = runner.invoke(args=["related-posts"])
+    assert "Related posts of 0 post(s) changed" in result.output
@@ -2,6 +2,7 @@
 
 import pytest
 import os
+import sqlite3
 
 from blog.config_validator import (
     validate_config,
@@ -204,3 +205,52 @@ def test_validate_environment_specific_configs_production_debug():
             os.environ["FLASK_ENV"] = old_env
         elif "FLASK_ENV" in os.environ:
             del os.environ["FLASK_ENV"]
+
+
+def test_validate_config_sqlite_without_wal_in_production(tmp_path):
+    """Test that validate_config warns when production SQLite is not in WAL mode."""
+    old_env = os.environ.get("FLASK_ENV")
+    os.environ["FLASK_ENV"] = "production"
+
+    try:
+        config = {
+            "SECRET_KEY": "a-valid-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'prod.db'}",
+            "CACHE_TYPE": "SimpleCache",
+        }
+
+        warnings = validate_config(config)
+        assert any("journal mode" in warning for warning in warnings)
+
+        config["SQLITE_PRAGMAS"] = {"journal_mode": "WAL"}
+        warnings = validate_config(config)
+        assert not any("journal mode" in warning for warning in warnings)
+    finally:
+        if old_env is not None:
+            os.environ["FLASK_ENV"] = old_env
+        elif "FLASK_ENV" in os.environ:
+            del os.environ["FLASK_ENV"]
+
+
+def test_validate_config_sqlite_file_already_in_wal(tmp_path):
+    """Test that validate_config reads the journal mode of an existing database."""
+    old_env = os.environ.get("FLASK_ENV")
+    os.environ["FLASK_ENV"] = "production"
+    path = tmp_path / "prod.db"
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = wal")
+    connection.close()
+
+    try:
+        config = {
+            "SECRET_KEY": "a-valid-secret-key",
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        }
+
+        warnings = validate_config(config)
+        assert not any("journal mode" in warning for warning in warnings)
+    finally:
+        if old_env is not None:
+            os.environ["FLASK_ENV"] = old_env
+        elif "FLASK_ENV" in os.environ:
+            del os.environ["FLASK_ENV"]
@@ -0,0 +1,199 @@
+"""Tests for the pooled Markdown renderer."""
+
+import time
+
+import markdown
+import pytest
+
+from blog.infrastructure import markdown as markdown_module
+from blog.infrastructure.markdown import (
+    MARKDOWN_EXTENSION_CONFIGS,
+    MARKDOWN_EXTENSIONS,
+    MarkdownPool,
+    RenderExecutor,
+    RenderTimeout,
+    render_blocks,
+    render_markdown,
+    split_blocks,
+)
+
+SAMPLES = [
+    "# Title\n\nSome *text* with [a link][1].\n\n[1]: https://example.com",
+    "```python\nprint('hi')\n```\n\n<div>raw html</div>",
+    "",
+]
+
+
+@pytest.mark.parametrize("content", SAMPLES)
+def test_render_matches_a_fresh_instance(content):
+    expected = markdown.markdown(
+        content,
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+    )
+    # Twice, the second render reuses the pooled instance.
+    assert render_markdown(content) == expected
+    assert render_markdown(content) == expected
+
+
+def test_fenced_code_is_highlighted():
+    html = render_markdown("```python\nimport os\n```\n\n```\nplain <text>\n```")
+
+    assert '<span class="kn">import</span>' in html
+    assert html.count('<div class="highlight">') == 2
+    # Without a language the code is escaped, not guessed.
+    assert "<pre><span></span><code>plain &lt;text&gt;\n</code></pre>" in html
+
+
+def test_reused_instance_forgets_previous_render():
+    pool = MarkdownPool(MARKDOWN_EXTENSIONS)
+    pool.render("[1]: https://example.com\n\n<div>stashed</div>")
+
+    html = pool.render("[text][1]")
+
+    assert "example.com" not in html
+    assert len(pool._idle) == 1
+
+
+def test_overlapping_renders_use_separate_instances(monkeypatch):
+    pool = MarkdownPool(MARKDOWN_EXTENSIONS, max_idle=1)
+    used = []
+    convert = markdown.Markdown.convert
+
+    def tracking_convert(self, source):
+        used.append(self)
+        if source == "outer":
+            # Another greenlet renders while this one converts.
+            pool.render("inner")
+        return convert(self, source)
+
+    monkeypatch.setattr(markdown.Markdown, "convert", tracking_convert)
+    assert pool.render("outer") == "<p>outer</p>"
+
+    assert used[0] is not used[1]
+    assert len(pool._idle) == 1
+
+
+def test_executor_renders_large_texts_in_workers():
+    executor = RenderExecutor(inline_limit=100, workers=1, timeout=60)
+    large = "Some *text*.\n\n" * 20
+    try:
+        assert executor.render("*small*") == "<p><em>small</em></p>"
+        assert executor._executor is None
+
+        assert executor.render(large) == render_markdown(large)
+        assert executor._executor is not None
+    finally:
+        executor.shutdown()
+
+
+def test_executor_timeout():
+    # Starting the worker process alone takes longer than the timeout.
+    executor = RenderExecutor(inline_limit=0, workers=1, timeout=0.001)
+    try:
+        with pytest.raises(RenderTimeout):
+            executor.render("text")
+    finally:
+        executor.shutdown()
+
+
+def _sleeping_render(content: str) -> str:
+    # Stands in for a huge render, pickled by name into the worker.
+    time.sleep(float(content))
+    return content
+
+
+def test_timed_out_render_frees_its_slot(monkeypatch):
+    monkeypatch.setattr(markdown_module, "_render_in_worker", _sleeping_render)
+    executor = RenderExecutor(inline_limit=0, workers=1, timeout=30)
+    try:
+        assert executor.render("0") == "0"
+        process = next(iter(executor._executor._processes.values()))
+
+        executor.timeout = 0.5
+        with pytest.raises(RenderTimeout):
+            executor.render("60")
+
+        process.join(10)
+        assert not process.is_alive()
+        deadline = time.monotonic() + 10
+        while executor._slots._value < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert executor._slots._value == 2
+
+        executor.timeout = 30
+        assert executor.render("0") == "0"
+    finally:
+        executor.shutdown()
+
+
+DOCUMENT = """# Title
+
+First paragraph
+over two lines.
+
+```python
+a = 1
+
+b = 2
+```
+
+- one
+
+- two
+
+      indented code
+
+<div>
+raw
+
+html
+</div>
+
+See [the site][1].
+
+[1]: https://example.com
+"""
+
+
+def test_split_blocks():
+    assert split_blocks(DOCUMENT) == [
+        "# Title",
+        "First paragraph\nover two lines.",
+        "```python\na = 1\n\nb = 2\n```",
+        "- one\n\n- two\n\n      indented code",
+        "<div>\nraw\n\nhtml\n</div>",
+        "See [the site][1].",
+        "[1]: https://example.com",
+    ]
+
+
+def test_blocks_render_like_the_document():
+    blocks = render_blocks(DOCUMENT, set(), _DictCache())
+    joined = "\n".join(block.html or "" for block in blocks)
+    assert joined.split() == render_markdown(DOCUMENT).split()
+    assert '<a href="https://example.com">the site</a>' in joined
+
+
+def test_render_blocks_skips_shown_and_cached_blocks(monkeypatch):
+    from blog.infrastructure import markdown as module
+
+    cache = _DictCache()
+    first = render_blocks("one\n\ntwo\n\none", set(), cache)
+    assert [block.id for block in first][0] != first[2].id
+    assert first[0].html == first[2].html == "<p>one</p>"
+
+    rendered = []
+    render = module.render_markdown
+    monkeypatch.setattr(
+        module, "render_markdown", lambda text: rendered.append(text) or render(text)
+    )
+    shown = {block.id for block in first}
+    second = render_blocks("one\n\nthree\n\none\n\ntwo", shown, cache)
+    assert [block.html for block in second] == [None, "<p>three</p>", None, None]
+    assert rendered == ["three"]
+
+
+class _DictCache(dict):
+    def set(self, key, value, timeout):
+        self[key] = value
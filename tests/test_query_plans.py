@@ -0,0 +1,144 @@
+"""Query plans of the hot repository queries.
+
+Every statement a repository method runs is explained against an empty
+schema; a full scan of ``posts`` or ``posts_tags`` means a query lost its
+index. Methods that read a whole table on purpose are not listed.
+"""
+
+import datetime
+import os
+import re
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+import pytest
+import sqlalchemy as sa
+
+from blog import create_app
+from blog.domain.post import PostCursor
+from blog.extensions import db
+from blog.repos.category import CategoryRepository
+from blog.repos.post import PostRepository
+from blog.repos.search import SearchRepository
+from blog.repos.tag import TagRepository
+
+CURSOR = PostCursor(datetime.datetime(2024, 1, 1), 3)
+
+QUERIES: dict[str, Callable[[], Any]] = {
+    "post by id": lambda: PostRepository().get_by_id(1),
+    "post by alias": lambda: PostRepository().get_by_alias("post"),
+    "post page": lambda: PostRepository().get_page_by_alias("post"),
+    "content hash": lambda: PostRepository().get_content_hash("post"),
+    "published posts": lambda: PostRepository().get_published_posts(),
+    "page posts": lambda: PostRepository().get_page_posts(),
+    "posts by tag": lambda: PostRepository().get_posts_by_tag(1),
+    "tags for post": lambda: PostRepository().get_tags_for_post(1),
+    "changed since": lambda: PostRepository().get_changed_since(CURSOR.publishedon),
+    "last updated": lambda: PostRepository().get_last_updated(),
+    "published summaries": lambda: PostRepository().get_published_summaries(),
+    "page summaries": lambda: PostRepository().get_page_summaries(),
+    "summaries by tag": lambda: PostRepository().get_summaries_by_tag(1),
+    "first page": lambda: PostRepository().get_published_summaries_page(30),
+    "next page": lambda: PostRepository().get_published_summaries_page(30, CURSOR),
+    "archive months": lambda: PostRepository().get_archive_months(),
+    "archive page": lambda: PostRepository().get_published_summaries_page(
+        30, CURSOR, since=datetime.datetime(2024, 1, 1), until=CURSOR.publishedon
+    ),
+    "tag first page": lambda: PostRepository().get_summaries_page_by_tag(1, 30),
+    "tag next page": lambda: PostRepository().get_summaries_page_by_tag(1, 30, CURSOR),
+    "tag by alias": lambda: TagRepository().get_by_alias("tag"),
+    "tag counts": lambda: TagRepository().get_tag_counts(),
+    "tag post aliases": lambda: TagRepository().get_post_aliases(1),
+    "category post aliases": lambda: CategoryRepository().get_post_aliases(1),
+    "related posts": lambda: PostRepository().get_related_summaries(1),
+    "related referrers": lambda: PostRepository().get_related_referrers({"post"}),
+    "search": lambda: SearchRepository().search(["кэш", "flask"], 20, 40),
+    "touch posts": lambda: PostRepository().touch_posts({"post"}),
+    "touch tag posts": lambda: TagRepository().touch_posts(1),
+    "touch category posts": lambda: CategoryRepository().touch_posts(1),
+}
+
+# "SCAN posts" but not "SCAN posts USING INDEX ...", aliases included.
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (posts|posts_tags)(_\d+)?( AS \w+)?$")
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (posts|posts_tags)\b")
+
+
+@contextmanager
+def recorded_statements():
+    """Collect the SQL statements and parameters executed inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    engine = db.engine
+    sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", record)
+
+
+def _statements(query: Callable[[], Any]) -> list[tuple[str, Any]]:
+    with recorded_statements() as statements:
+        query()
+    db.session.rollback()
+    return statements
+
+
+def _app(monkeypatch: pytest.MonkeyPatch, database_uri: str | None = None):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    if database_uri is None:
+        return create_app()
+    # Engines are created by init_app, the URI has to be known by then.
+    return create_app(overrides={"SQLALCHEMY_DATABASE_URI": database_uri})
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    app = _app(monkeypatch)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_sqlite_plan_uses_indexes(app, name):
+    for statement, parameters in _statements(QUERIES[name]):
+        with db.engine.connect() as conn:
+            plan = conn.exec_driver_sql(
+                "EXPLAIN QUERY PLAN " + statement, parameters
+            ).fetchall()
+        details = [row[3] for row in plan]
+        assert not [d for d in details if SQLITE_FULL_SCAN.match(d)], details
+        assert not [d for d in details if "AUTOMATIC" in d], details
+
+
+@pytest.fixture()
+def postgres_app(monkeypatch):
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pytest.importorskip("psycopg2")
+    app = _app(monkeypatch, url)
+    with app.app_context():
+        assert db.engine.dialect.name == "postgresql"
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_postgres_plan_uses_indexes(postgres_app, name):
+    for statement, parameters in _statements(QUERIES[name]):
+        with db.engine.connect() as conn:
+            # Empty tables make a sequential scan the cheapest plan, only
+            # a query without a usable index still chooses one.
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            details = [row[0] for row in plan]
+        assert not [d for d in details if POSTGRES_FULL_SCAN.search(d)], details
@@ -0,0 +1,92 @@
+"""Tests for per-request statement counting."""
+
+import gc
+import logging
+
+import pytest
+import sqlalchemy as sa
+
+from blog import create_app
+from blog.config import optional_int
+from blog.extensions import db
+from blog.infrastructure import query_stats
+from blog.infrastructure.query_stats import QueryStats, collect_queries
+
+
+@pytest.fixture()
+def app(monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "testing")
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_repeated_statements():
+    stats = QueryStats()
+    for _ in range(3):
+        stats.record("SELECT tags WHERE post_id = ?", 0.001)
+    stats.record("SELECT posts", 0.001)
+
+    assert stats.statements == 4
+    assert stats.repeated(3) == [("SELECT tags WHERE post_id = ?", 3)]
+    assert stats.repeated(4) == []
+    assert "   3 x SELECT tags" in stats.report()
+
+
+def test_nested_collectors_both_count(app):
+    with collect_queries() as outer:
+        db.session.execute(sa.text("SELECT 1"))
+        with collect_queries() as inner:
+            db.session.execute(sa.text("SELECT 2"))
+
+    assert outer.statements == 2
+    assert inner.statements == 1
+    assert outer.seconds >= inner.seconds > 0
+
+
+def test_failed_statement_does_not_skew_timings(app):
+    with pytest.raises(sa.exc.OperationalError):
+        db.session.execute(sa.text("SELECT * FROM missing_table"))
+    db.session.rollback()
+
+    with collect_queries() as stats:
+        db.session.execute(sa.text("SELECT 1"))
+
+    gc.collect()
+    assert len(query_stats._started) == 0
+    assert 0 < stats.seconds < 1
+
+
+def test_query_budget_from_environment():
+    assert optional_int(None, 20) == 20
+    assert optional_int("50", 20) == 50
+    assert optional_int("", 20) is None
+    assert optional_int("None", 20) is None
+
+
+def test_request_over_budget_logs_warning(app, caplog):
+    app.config.update(QUERY_BUDGET=0, QUERY_REPEAT_LIMIT=2)
+
+    @app.route("/n-plus-one")
+    def n_plus_one():
+        for post_id in range(2):
+            db.session.execute(sa.text("SELECT :id"), {"id": post_id})
+        return "ok"
+
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        assert app.test_client().get("/n-plus-one").status_code == 200
+
+    assert (
+        "GET /n-plus-one: 2 statement(s) for a budget of 0, 1 repeated" in caplog.text
+    )
+    assert query_stats._collectors.get() == ()
+
+
+def test_request_within_budget_is_quiet(app, caplog):
+    with caplog.at_level(logging.WARNING, logger=query_stats.__name__):
+        app.test_client().get("/tags/")
+
+    assert caplog.text == ""
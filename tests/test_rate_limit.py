@@ -0,0 +1,30 @@
+"""Tests for the in-process token bucket limiter."""
+
+from blog.infrastructure import rate_limit
+from blog.infrastructure.rate_limit import TokenBucketLimiter
+
+
+def test_burst_then_refill(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=2, burst=3)
+
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("a") == 0.5
+    # Other keys have buckets of their own.
+    assert limiter.acquire("b") == 0
+
+    now[0] += 0.5
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+
+    now[0] += 60
+    assert [limiter.acquire("a") for _ in range(3)] == [0, 0, 0]
+
+
+def test_least_recent_keys_are_dropped():
+    limiter = TokenBucketLimiter(rate=1, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key)
+
+    assert list(limiter._buckets) == ["b", "c"]
@@ -3,6 +3,9 @@
 import pytest
 import os
 import datetime
+from contextlib import contextmanager
+
+import sqlalchemy as sa
 
 from blog import create_app
 from blog.extensions import db
@@ -16,11 +19,30 @@ from blog.repos.category import CategoryRepository
 from blog.repos.tag import TagRepository
 from blog.repos.user import UserRepository
 from blog.repos.icon import IconRepository
+from blog.repos.search import SearchRepository
 from blog.post.models import Post as PostORM
 from blog.category.models import Category as CategoryORM
 from blog.tags.models import Tag as TagORM
 from blog.user.models import User as UserORM
 from blog.post.models import Icon as IconORM
+from blog.infrastructure.markdown import RENDERER_VERSION, content_hash
+from blog.infrastructure.database import get_related_posts_table
+
+
+@contextmanager
+def recorded_statements():
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(engine, "before_cursor_execute", record)
 
 
 @pytest.fixture()
@@ -69,6 +91,13 @@ def icon_repository(app):
         return IconRepository(db.session)
 
 
+@pytest.fixture()
+def search_repository(app):
+    """Create a SearchRepository instance for testing."""
+    with app.app_context():
+        return SearchRepository(db.session)
+
+
 class TestPostRepository:
     """Test cases for PostRepository."""
 
@@ -618,6 +647,473 @@ class TestPostRepository:
             assert post_orm.category_id == post_domain.category_id
             assert post_orm.user_id == post_domain.user_id
 
+    def test_create_post_stores_rendering(self, app, post_repository):
+        """Test that creating a post persists its rendered HTML."""
+        with app.app_context():
+            post_domain = PostDomain(
+                pagetitle="Rendered Post",
+                alias="rendered-post",
+                content="# Heading",
+            )
+            created_post = post_repository.create(post_domain)
+
+            post_orm = db.session.get(PostORM, created_post.id)
+            assert post_orm.content_html == "<h1>Heading</h1>"
+            assert post_orm.content_hash == content_hash("# Heading")
+            assert post_orm.renderer_version == RENDERER_VERSION
+            assert created_post.content_html == "<h1>Heading</h1>"
+
+    def test_update_post_rerenders(self, app, post_repository):
+        """Test that updating content replaces the stored HTML."""
+        with app.app_context():
+            post_domain = PostDomain(
+                pagetitle="Rendered Post",
+                alias="rendered-post",
+                content="# Before",
+            )
+            created_post = post_repository.create(post_domain)
+
+            created_post.content = "# After"
+            post_repository.update(created_post)
+
+            retrieved_post = post_repository.get_by_id(created_post.id)
+            assert retrieved_post.content_html == "<h1>After</h1>"
+            assert retrieved_post.markdown == "<h1>After</h1>"
+
+    def test_refresh_renderings_after_renderer_change(self, app, post_repository):
+        """Test that a stale renderer version is re-rendered in bulk."""
+        with app.app_context():
+            post_domain = PostDomain(
+                pagetitle="Rendered Post",
+                alias="rendered-post",
+                content="# Heading",
+            )
+            created_post = post_repository.create(post_domain)
+            post_orm = db.session.get(PostORM, created_post.id)
+            post_orm.renderer_version = "outdated"
+            db.session.flush()
+
+            assert post_repository.refresh_renderings() == 1
+            assert post_orm.renderer_version == RENDERER_VERSION
+            assert post_repository.refresh_renderings() == 0
+            assert post_repository.refresh_renderings(force=True) == 1
+
+    def test_domain_markdown_ignores_stale_rendering(self):
+        """Test that a stale stored rendering is not served."""
+        post = PostDomain(
+            content="# Fresh",
+            content_html="<h1>Stale</h1>",
+            content_hash=content_hash("# Old"),
+            renderer_version=RENDERER_VERSION,
+        )
+        assert post.markdown == "<h1>Fresh</h1>"
+
+        post.content_hash = content_hash("# Fresh")
+        post.content_html = "<h1>Stored</h1>"
+        assert post.markdown == "<h1>Stored</h1>"
+
+    def test_create_and_update_set_updatedon(self, app, post_repository):
+        """Test that every write records the time of the change."""
+        with app.app_context():
+            created_post = post_repository.create(
+                PostDomain(pagetitle="Post", alias="post", content="Before")
+            )
+            assert created_post.updatedon is not None
+
+            post_orm = db.session.get(PostORM, created_post.id)
+            post_orm.updatedon = datetime.datetime(2020, 1, 1)
+            db.session.flush()
+
+            created_post.content = "After"
+            updated_post = post_repository.update(created_post)
+            assert updated_post.updatedon.replace(tzinfo=None) > datetime.datetime(
+                2020, 1, 1
+            )
+
+    def test_get_changed_since(self, app, post_repository):
+        """Test that only posts changed after the given time are returned."""
+        with app.app_context():
+            old_post = post_repository.create(
+                PostDomain(pagetitle="Old", alias="old", content="Old")
+            )
+            post_repository.create(
+                PostDomain(pagetitle="New", alias="new", content="New")
+            )
+            db.session.get(PostORM, old_post.id).updatedon = datetime.datetime(
+                2020, 1, 1, tzinfo=datetime.timezone.utc
+            )
+            db.session.flush()
+
+            since = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+            changed = post_repository.get_changed_since(since)
+            assert [post.alias for post in changed] == ["new"]
+            assert post_repository.get_last_updated() > since.replace(tzinfo=None)
+
+    def test_get_last_updated_empty(self, app, post_repository):
+        """Test that there is no last update without posts."""
+        with app.app_context():
+            assert post_repository.get_last_updated() is None
+
+    def test_summaries(self, app, post_repository):
+        """Test that list summaries match the full queries."""
+        with app.app_context():
+            page_category = CategoryORM(title="Pages", alias="pages", page=True)
+            tag = TagORM(title="Tag", alias="tag")
+            db.session.add_all([page_category, tag])
+            db.session.flush()
+            now = datetime.datetime.now(datetime.timezone.utc)
+            post_repository.create(
+                PostDomain(
+                    pagetitle="Post", alias="post", content="Body", publishedon=now
+                )
+            )
+            post_repository.create(
+                PostDomain(
+                    pagetitle="About",
+                    alias="about",
+                    content="Body",
+                    category_id=page_category.id,
+                )
+            )
+            post_orm = db.session.get(PostORM, 1)
+            post_orm.tags.append(tag)
+            db.session.flush()
+
+            published = post_repository.get_published_summaries()
+            assert [(p.id, p.alias, p.pagetitle) for p in published] == [
+                (1, "post", "Post")
+            ]
+            assert published[0].publishedon is not None
+            assert not hasattr(published[0], "content")
+
+            pages = post_repository.get_page_summaries()
+            assert [(p.alias, p.is_page) for p in pages] == [("about", True)]
+            assert [p.alias for p in post_repository.get_all_published_summaries()] == [
+                p.alias for p in post_repository.get_all_published_content()
+            ]
+            assert [p.alias for p in post_repository.get_summaries_by_tag(tag.id)] == [
+                "post"
+            ]
+
+    def test_get_page_by_alias_in_one_statement(self, app, post_repository):
+        """Test that a post page bundle is read with a single query."""
+        with app.app_context():
+            category = CategoryORM(title="About", alias="about", template="about.html")
+            tags = [TagORM(title="A", alias="a"), TagORM(title="B", alias="b")]
+            db.session.add(
+                PostORM(pagetitle="Post", alias="post", category=category, tags=tags)
+            )
+            db.session.commit()
+            db.session.expire_all()
+
+            with recorded_statements() as statements:
+                post_page = post_repository.get_page_by_alias("post")
+                assert post_page.post.alias == "post"
+                assert sorted(tag.alias for tag in post_page.tags) == ["a", "b"]
+                assert post_page.category.template == "about.html"
+
+            assert len(statements) == 1
+            assert post_repository.get_page_by_alias("missing") is None
+
+    def test_published_summaries_keyset_pages(self, app, post_repository):
+        """Test that pages follow (publishedon, id) without gaps or repeats."""
+        with app.app_context():
+            first = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+            second = datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc)
+            # Posts 1-3 share a publication time, the cursor must break ties by id
+            for i, publishedon in enumerate([first, first, first, second, None]):
+                post_repository.create(
+                    PostDomain(
+                        pagetitle=f"P{i}", alias=f"p{i}", publishedon=publishedon
+                    )
+                )
+
+            seen = []
+            page = post_repository.get_published_summaries_page(2)
+            seen.append([post.alias for post in page.posts])
+            while page.next_cursor is not None:
+                page = post_repository.get_published_summaries_page(2, page.next_cursor)
+                seen.append([post.alias for post in page.posts])
+
+            assert seen == [["p3", "p2"], ["p1", "p0"]]
+
+    def test_summaries_page_by_tag(self, app, post_repository):
+        """Test that tag pages only list published posts with the tag."""
+        with app.app_context():
+            tag = TagORM(title="Tag", alias="tag")
+            now = datetime.datetime.now(datetime.timezone.utc)
+            db.session.add_all(
+                [
+                    PostORM(pagetitle="A", alias="a", publishedon=now, tags=[tag]),
+                    PostORM(pagetitle="B", alias="b", publishedon=now, tags=[tag]),
+                    PostORM(pagetitle="Draft", alias="draft", tags=[tag]),
+                    PostORM(pagetitle="Other", alias="other", publishedon=now),
+                ]
+            )
+            db.session.flush()
+
+            page = post_repository.get_summaries_page_by_tag(tag.id, 1)
+            assert [post.alias for post in page.posts] == ["b"]
+            page = post_repository.get_summaries_page_by_tag(
+                tag.id, 1, page.next_cursor
+            )
+            assert [post.alias for post in page.posts] == ["a"]
+            assert page.next_cursor is None
+
+    def test_summaries_do_not_select_content(self, app, post_repository):
+        """Test that summary queries leave the post body in the database."""
+        with app.app_context(), recorded_statements() as statements:
+            post_repository.get_published_summaries()
+            post_repository.get_all_published_summaries()
+            post_repository.get_page_summaries()
+            post_repository.get_summaries_by_tag(1)
+
+        assert len(statements) == 4
+        for statement in statements:
+            assert "posts.content" not in statement
+
+    @pytest.mark.parametrize("count", [1, 5])
+    def test_list_queries_load_categories_in_one_query(
+        self, app, post_repository, count
+    ):
+        """Test that is_page does not lazy load a category per post."""
+        with app.app_context():
+            tag = TagORM(title="Tag", alias="tag")
+            db.session.add(tag)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for i in range(count):
+                category = CategoryORM(title=f"C{i}", alias=f"c{i}", page=False)
+                db.session.add(
+                    PostORM(
+                        pagetitle=f"P{i}",
+                        alias=f"p{i}",
+                        publishedon=now,
+                        category=category,
+                        tags=[tag],
+                    )
+                )
+            db.session.commit()
+            tag_id = tag.id
+            db.session.expire_all()
+
+            with recorded_statements() as statements:
+                assert len(post_repository.get_all()) == count
+                assert len(post_repository.get_all_published_content()) == count
+                assert len(post_repository.get_posts_by_tag(tag_id)) == count
+                assert post_repository.get_by_alias("p0").is_page is False
+
+        assert len(statements) == 4
+
+    def test_rebuild_related_posts(self, app, post_repository):
+        """Test that related posts are ranked by the Jaccard index of tags."""
+        with app.app_context():
+            a, b, c, d = (TagORM(title=t, alias=t) for t in "abcd")
+            page = CategoryORM(title="Pages", alias="pages", page=True)
+            now = datetime.datetime.now(datetime.timezone.utc)
+            db.session.add_all(
+                [
+                    PostORM(pagetitle="P", alias="p", publishedon=now, tags=[a, b, c]),
+                    # 2 shared of 3 tags
+                    PostORM(pagetitle="Q", alias="q", publishedon=now, tags=[a, b]),
+                    # 2 shared of 4 tags
+                    PostORM(pagetitle="R", alias="r", publishedon=now, tags=[a, b, d]),
+                    # 1 shared of 3 tags
+                    PostORM(pagetitle="S", alias="s", publishedon=now, tags=[c]),
+                    PostORM(pagetitle="Draft", alias="draft", tags=[a, b, c]),
+                    PostORM(
+                        pagetitle="Page",
+                        alias="page",
+                        publishedon=now,
+                        category=page,
+                        tags=[a, b, c],
+                    ),
+                    PostORM(pagetitle="T", alias="t", publishedon=now, tags=[d]),
+                ]
+            )
+            db.session.flush()
+            ids = {
+                post.alias: post.id for post in db.session.scalars(sa.select(PostORM))
+            }
+
+            changed = post_repository.rebuild_related_posts(limit=2)
+            assert changed == ["p", "q", "r", "s", "t"]
+
+            related = post_repository.get_related_summaries(ids["p"])
+            assert [post.alias for post in related] == ["q", "r"]
+            related = post_repository.get_related_summaries(ids["s"])
+            assert [post.alias for post in related] == ["p"]
+            assert post_repository.get_related_summaries(ids["draft"]) == []
+
+            assert post_repository.rebuild_related_posts(limit=2) == []
+            # Rounding differences of the stored scores are not changes.
+            related_posts = get_related_posts_table(db.metadata)
+            db.session.execute(
+                sa.update(related_posts).values(score=related_posts.c.score + 1e-12)
+            )
+            assert post_repository.rebuild_related_posts(limit=2) == []
+
+            db.session.delete(db.session.get(PostORM, ids["q"]))
+            db.session.flush()
+            assert post_repository.rebuild_related_posts(limit=2) == ["p", "r"]
+            related = post_repository.get_related_summaries(ids["p"])
+            assert [post.alias for post in related] == ["r", "s"]
+
+    def test_get_related_referrers(self, app, post_repository):
+        """Test that posts listing a post as related are found by its alias."""
+        with app.app_context():
+            tag = TagORM(title="Tag", alias="tag")
+            now = datetime.datetime.now(datetime.timezone.utc)
+            db.session.add_all(
+                [
+                    PostORM(pagetitle="A", alias="a", publishedon=now, tags=[tag]),
+                    PostORM(pagetitle="B", alias="b", publishedon=now, tags=[tag]),
+                    PostORM(pagetitle="C", alias="c", publishedon=now),
+                ]
+            )
+            db.session.flush()
+            post_repository.rebuild_related_posts(limit=5)
+
+            assert post_repository.get_related_referrers({"a"}) == ["b"]
+            assert post_repository.get_related_referrers({"a", "b", "c"}) == ["a", "b"]
+            assert post_repository.get_related_referrers(set()) == []
+
+    def test_touch_posts(self, app, post_repository):
+        """Test that only the given posts are marked as changed."""
+        with app.app_context():
+            long_ago = datetime.datetime(2000, 1, 1)
+            db.session.add_all(
+                PostORM(pagetitle=alias, alias=alias, updatedon=long_ago)
+                for alias in ("a", "b")
+            )
+            db.session.flush()
+
+            post_repository.touch_posts({"a", "missing"})
+            db.session.expire_all()
+
+            touched = db.session.scalar(sa.select(PostORM).where(PostORM.alias == "a"))
+            kept = db.session.scalar(sa.select(PostORM).where(PostORM.alias == "b"))
+            assert touched.updatedon > long_ago
+            assert kept.updatedon == long_ago
+
+    def test_get_related_summaries_in_one_statement(self, app, post_repository):
+        """Test that serving related posts is a single lookup."""
+        with app.app_context(), recorded_statements() as statements:
+            post_repository.get_related_summaries(1)
+
+        assert len(statements) == 1
+
+
+class TestSearchRepository:
+    """Test cases for SearchRepository."""
+
+    def _add_posts(self):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        pages = CategoryORM(title="Pages", alias="pages", page=True)
+        db.session.add_all(
+            [
+                PostORM(
+                    pagetitle="Заметки",
+                    alias="content-match",
+                    content="Немного про кэширование страниц",
+                    publishedon=now,
+                ),
+                PostORM(
+                    pagetitle="Кэширование в Flask",
+                    alias="title-match",
+                    content="Подробности",
+                    publishedon=now,
+                ),
+                PostORM(pagetitle="Кэш черновика", alias="draft", content="кэш"),
+                PostORM(pagetitle="О кэше", alias="about", content="", category=pages),
+            ]
+        )
+        db.session.commit()
+
+    def test_search_ranks_title_matches_first(self, app, search_repository):
+        """Test that posts and pages match by prefix, titles first, drafts never."""
+        with app.app_context():
+            self._add_posts()
+
+            hits = search_repository.search(["кэш"], limit=10)
+
+            aliases = [hit.post.alias for hit in hits]
+            assert set(aliases) == {"content-match", "title-match", "about"}
+            assert aliases.index("title-match") < aliases.index("content-match")
+            assert [hit.post.is_page for hit in hits if hit.post.alias == "about"] == [
+                True
+            ]
+            assert search_repository.search(["кэш", "flask"], limit=10)[
+                0
+            ].post.alias == ("title-match")
+
+    def test_search_limit_and_offset(self, app, search_repository):
+        """Test that results are paged in rank order."""
+        with app.app_context():
+            self._add_posts()
+
+            everything = search_repository.search(["кэш"], limit=10)
+            paged = [
+                *search_repository.search(["кэш"], limit=2),
+                *search_repository.search(["кэш"], limit=2, offset=2),
+            ]
+            assert [hit.post.id for hit in paged] == [hit.post.id for hit in everything]
+
+    def test_search_snippet_is_escaped(self, app, search_repository):
+        """Test that snippets escape post text and mark the matches."""
+        with app.app_context():
+            db.session.add(
+                PostORM(
+                    pagetitle="Post",
+                    alias="post",
+                    content="<script>alert(1)</script> и кэш",
+                    publishedon=datetime.datetime.now(datetime.timezone.utc),
+                )
+            )
+            db.session.commit()
+
+            (hit,) = search_repository.search(["кэш"], limit=10)
+            assert "<script>" not in hit.snippet
+            assert "&lt;script&gt;" in hit.snippet
+            assert "<mark>кэш</mark>" in hit.snippet
+
+    def test_index_follows_updates_and_deletes(self, app, search_repository):
+        """Test that the triggers keep the index in sync with posts."""
+        with app.app_context():
+            self._add_posts()
+            post_orm = db.session.execute(
+                sa.select(PostORM).where(PostORM.alias == "title-match")
+            ).scalar_one()
+            post_orm.pagetitle = "Профилирование"
+            db.session.commit()
+            db.session.delete(
+                db.session.execute(
+                    sa.select(PostORM).where(PostORM.alias == "content-match")
+                ).scalar_one()
+            )
+            db.session.commit()
+
+            assert [h.post.alias for h in search_repository.search(["кэш"], 10)] == [
+                "about"
+            ]
+            assert [
+                h.post.alias for h in search_repository.search(["профилир"], 10)
+            ] == ["title-match"]
+
+    def test_reindex_only_missing_and_stale_rows(self, app, search_repository):
+        """Test that an incremental reindex repairs what the triggers missed."""
+        with app.app_context():
+            self._add_posts()
+            assert search_repository.reindex() == 0
+
+            db.session.execute(sa.text("DELETE FROM posts_search WHERE rowid = 1"))
+            db.session.execute(
+                sa.text("UPDATE posts_search SET updatedon = '2000' WHERE rowid = 2")
+            )
+            assert search_repository.reindex() == 2
+            assert search_repository.reindex() == 0
+            assert search_repository.reindex(full=True) == 4
+            assert len(search_repository.search(["кэш"], limit=10)) == 3
+
 
 class TestCategoryRepository:
     """Test cases for CategoryRepository."""
@@ -1022,6 +1518,36 @@ class TestTagRepository:
             # Verify an empty list is returned
             assert tags == []
 
+    def test_get_tag_counts(self, app, tag_repository):
+        """Test that tags come with their published post counts in one query."""
+        with app.app_context():
+            now = datetime.datetime.now(datetime.timezone.utc)
+            python = TagORM(title="Python", alias="python")
+            flask = TagORM(title="Flask", alias="flask")
+            empty = TagORM(title="Empty", alias="empty")
+            db.session.add_all(
+                [
+                    empty,
+                    PostORM(
+                        pagetitle="A", alias="a", publishedon=now, tags=[python, flask]
+                    ),
+                    PostORM(pagetitle="B", alias="b", publishedon=now, tags=[python]),
+                    PostORM(pagetitle="Draft", alias="draft", tags=[python, flask]),
+                ]
+            )
+            db.session.commit()
+
+            with recorded_statements() as statements:
+                counts = tag_repository.get_tag_counts()
+
+            assert [(tag.alias, tag.post_count) for tag in counts] == [
+                ("empty", 0),
+                ("flask", 1),
+                ("python", 2),
+            ]
+            assert len(statements) == 1
+            assert "content" not in statements[0]
+
     def test_get_tags_for_post(self, app, tag_repository):
         """Test getting tags for a post."""
         with app.app_context():
@@ -1178,6 +1704,21 @@ class TestTagRepository:
             assert tag_orm.title == tag_domain.title
             assert tag_orm.alias == tag_domain.alias
 
+    def test_update_tag_touches_posts(self, app, tag_repository):
+        """Test that renaming a tag marks the posts listing it as changed."""
+        with app.app_context():
+            tag_orm = TagORM(title="Tag", alias="tag")
+            tagged = PostORM(pagetitle="Tagged", alias="tagged", tags=[tag_orm])
+            untagged = PostORM(pagetitle="Untagged", alias="untagged")
+            db.session.add_all([tagged, untagged])
+            db.session.flush()
+
+            tag_repository.update(TagDomain(id=tag_orm.id, title="New", alias="tag"))
+            db.session.refresh(tagged)
+            db.session.refresh(untagged)
+            assert tagged.updatedon is not None
+            assert untagged.updatedon is None
+
 
 class TestUserRepository:
     """Test cases for UserRepository."""
@@ -16,11 +16,13 @@ from blog.services.category import CategoryService, CategoryUpdateError
 from blog.services.tag import TagService, TagUpdateError
 from blog.services.user import UserService, UserUpdateError
 from blog.services.icon import IconService, IconUpdateError
+from blog.services.search import SearchService
 from blog.repos.post import PostRepository
 from blog.repos.category import CategoryRepository
 from blog.repos.tag import TagRepository
 from blog.repos.user import UserRepository
 from blog.repos.icon import IconRepository
+from blog.repos.search import SearchRepository
 
 
 @pytest.fixture()
@@ -358,6 +360,69 @@ class TestPostService:
         assert "published-post" in aliases
         assert "unpublished-post" not in aliases
 
+    def test_get_archive(self, app, post_service):
+        """Test that the archive groups month counts by year."""
+        for alias, publishedon in [
+            ("a", datetime.datetime(2023, 12, 31, 23)),
+            ("b", datetime.datetime(2024, 1, 1)),
+            ("c", datetime.datetime(2024, 3, 5)),
+            ("d", datetime.datetime(2024, 3, 9)),
+        ]:
+            post_service.create_post(
+                PostDomain(pagetitle=alias, alias=alias, publishedon=publishedon)
+            )
+        post_service.create_post(PostDomain(pagetitle="Draft", alias="draft"))
+
+        archive = post_service.get_archive()
+        assert [(year.year, year.post_count) for year in archive] == [
+            (2024, 3),
+            (2023, 1),
+        ]
+        assert [(m.month, m.post_count) for m in archive[0].months] == [(3, 2), (1, 1)]
+
+        page = post_service.get_archive_page(2023, 12, 10)
+        assert [post.alias for post in page.posts] == ["a"]
+        page = post_service.get_archive_page(2024, None, 2)
+        assert [post.alias for post in page.posts] == ["d", "c"]
+        page = post_service.get_archive_page(2024, None, 2, page.next_cursor)
+        assert [post.alias for post in page.posts] == ["b"]
+        assert [year.year for year in page.by_year()] == [2024]
+        with pytest.raises(ValueError):
+            post_service.get_archive_page(2024, 13, 10)
+
+
+class TestSearchService:
+    """Test cases for SearchService."""
+
+    def test_search_pages(self, app, post_service):
+        """Test that results are paged and the last page says so."""
+        with app.app_context():
+            search_service = SearchService(SearchRepository(db.session))
+            for i in range(3):
+                post_service.create_post(
+                    PostDomain(
+                        pagetitle=f"Профилирование {i}",
+                        alias=f"post-{i}",
+                        publishedon=datetime.datetime.now(datetime.timezone.utc),
+                    )
+                )
+
+            first = search_service.search("  Профил ", page=1, per_page=2)
+            assert first.query == "Профил"
+            assert len(first.hits) == 2 and first.has_next
+            second = search_service.search("профил", page=2, per_page=2)
+            assert len(second.hits) == 1 and not second.has_next
+
+    def test_search_without_words(self, app):
+        """Test that empty queries and pages out of range find nothing."""
+        with app.app_context():
+            search_service = SearchService(SearchRepository(db.session))
+            assert search_service.search("  *() ").hits == []
+            assert search_service.search("кэш", page=0).hits == []
+            assert (
+                search_service.search("кэш", page=SearchService.MAX_PAGE + 1).hits == []
+            )
+
 
 class TestCategoryService:
     """Test cases for CategoryService."""
@@ -0,0 +1,70 @@
+"""Tests for single-flight cache fill."""
+
+import threading
+import time
+
+from flask_caching.backends.simplecache import SimpleCache
+
+from blog.caching.singleflight import flights, get_or_compute, jittered
+
+
+def test_concurrent_misses_compute_once():
+    store = SimpleCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(get_or_compute(store, "key", compute, 60))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 8
+
+
+def test_stale_value_is_served_while_refreshing():
+    store = SimpleCache()
+    store.set("key", (time.time() - 1, "stale"), 60)
+    refreshing = threading.Event()
+    release = threading.Event()
+
+    def hold_refresh():
+        with flights.lead("key"):
+            refreshing.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_refresh)
+    holder.start()
+    refreshing.wait(5)
+    try:
+        value = get_or_compute(store, "key", lambda: "fresh", 60, stale_timeout=60)
+    finally:
+        release.set()
+        holder.join()
+
+    assert value == "stale"
+    assert get_or_compute(store, "key", lambda: "fresh", 60) == "fresh"
+
+
+def test_unstorable_values_are_not_cached():
+    store = SimpleCache()
+    get_or_compute(store, "key", lambda: 404, 60, should_store=lambda v: v == 200)
+    assert store.get("key") is None
+
+
+def test_jitter_spreads_expiry():
+    values = {jittered(100, 0.2) for _ in range(50)}
+    assert all(80 <= value <= 100 for value in values)
+    assert len(values) > 1
+    assert jittered(100, 0) == 100
@@ -3,13 +3,17 @@
 import pytest
 import os
 import datetime
+import re
 
 from blog import create_app
 from blog.extensions import db
-from blog.domain.post import Post as PostDomain
+from blog.domain.post import Post as PostDomain, PostCursor
 from blog.domain.category import Category as CategoryDomain
 from blog.domain.tag import Tag as TagDomain
+from blog.post.models import Post as PostORM
 from blog.services.factory import ServiceFactory
+from blog.tags.models import Tag as TagORM
+from blog.user.models import User as UserORM
 
 
 @pytest.fixture()
@@ -82,6 +86,119 @@ def test_page_view(test_client):
     assert page.content.encode() in response.data
 
 
+def test_post_view_uses_category_template(test_client):
+    """Test that a category template renders the full page, not the fragment."""
+    category_service = ServiceFactory.create_category_service()
+    category = category_service.create_category(
+        CategoryDomain(title="About", alias="about", template="about.html")
+    )
+    post_service = ServiceFactory.create_post_service()
+    post_service.create_post(
+        PostDomain(
+            pagetitle="About me",
+            alias="about-me",
+            content="Hello",
+            publishedon=datetime.datetime.now(datetime.timezone.utc),
+            category_id=category.id,
+        )
+    )
+
+    response = test_client.get("/about-me")
+    assert response.status_code == 200
+    assert "Технологии".encode() in response.data
+
+    response = test_client.get("/about-me", headers={"HX-Request": "true"})
+    assert response.status_code == 200
+    assert "Технологии".encode() not in response.data
+
+
+def test_posts_view_load_more(test_client):
+    """Test that the post list is paginated with load more links."""
+    test_client.application.config["POSTS_PER_PAGE"] = 2
+    for i in range(3):
+        create_test_post(title=f"Post {i}", alias=f"post-{i}")
+
+    response = test_client.get("/posts")
+    assert b"Post 2" in response.data and b"Post 1" in response.data
+    assert b"Post 0" not in response.data
+    next_url = re.search(rb'href="(/posts/after/[^"]+)"', response.data).group(1)
+
+    response = test_client.get(next_url.decode())
+    assert response.status_code == 200
+    assert b"Post 0" in response.data
+    assert b"Post 1" not in response.data
+    assert b"/posts/after/" not in response.data
+
+    assert test_client.get("/posts/after/garbage").status_code == 404
+    # Cursors that no link leads to would each fill a cache entry.
+    forged = PostCursor(datetime.datetime(2000, 1, 1), 999).encode()
+    assert test_client.get(f"/posts/after/{forged}").status_code == 404
+    padded = next_url.decode().replace("-", "-0")
+    assert test_client.get(padded).status_code == 404
+
+
+def test_archive_views(test_client):
+    """Test the archive index and its year and month pages."""
+    test_client.application.config["POSTS_PER_PAGE"] = 1
+    post_service = ServiceFactory.create_post_service()
+    for alias, publishedon in [
+        ("old", datetime.datetime(2023, 5, 1)),
+        ("first", datetime.datetime(2024, 2, 1)),
+        ("second", datetime.datetime(2024, 2, 2)),
+    ]:
+        post_service.create_post(
+            PostDomain(pagetitle=alias.title(), alias=alias, publishedon=publishedon)
+        )
+
+    response = test_client.get("/archive/")
+    assert response.status_code == 200
+    assert b'href="/archive/2024/2"' in response.data
+    assert b'href="/archive/2023/5"' in response.data
+
+    response = test_client.get("/archive/2024/2", headers={"HX-Request": "true"})
+    assert b"Second" in response.data and b"First" not in response.data
+    next_url = re.search(rb'href="(/archive/2024/2/after/[^"]+)"', response.data)
+    response = test_client.get(next_url.group(1).decode())
+    assert b"First" in response.data and b"Old" not in response.data
+
+    response = test_client.get("/archive/2023")
+    assert b"Old" in response.data and b"<html" in response.data
+
+    assert test_client.get("/archive/2022").status_code == 404
+    assert test_client.get("/archive/2024/13").status_code == 404
+    assert test_client.get("/archive/2024/after/garbage").status_code == 404
+    # Only cursors of published posts in the period are served.
+    forged = PostCursor(datetime.datetime(2024, 3, 1), 999).encode()
+    assert test_client.get(f"/archive/2024/after/{forged}").status_code == 404
+    old = next_url.group(1).decode().replace("/archive/2024/2/", "/archive/2023/")
+    assert test_client.get(old).status_code == 404
+    assert test_client.get("/archive/99999").status_code == 404
+
+
+def test_tag_view_load_more(test_client):
+    """Test that tag pages load further posts as HTMX fragments."""
+    test_client.application.config["POSTS_PER_PAGE"] = 1
+    tag = create_test_tag()
+    for i in range(2):
+        post = create_test_post(title=f"Post {i}", alias=f"post-{i}")
+        post_orm = db.session.get(PostORM, post.id)
+        post_orm.tags.append(db.session.get(TagORM, tag.id))
+    db.session.commit()
+
+    response = test_client.get("/tags/test-tag")
+    next_url = re.search(rb'hx-get="(/tags/test-tag/after/[^"]+)"', response.data)
+    response = test_client.get(
+        next_url.group(1).decode(), headers={"HX-Request": "true"}
+    )
+    assert response.status_code == 200
+    assert b"<html" not in response.data
+    assert b"Post 0" in response.data
+    assert "Посты с тэгом".encode() not in response.data
+
+    forged = PostCursor(datetime.datetime(2000, 1, 1), 999).encode()
+    assert test_client.get(f"/tags/test-tag/after/{forged}").status_code == 404
+
+
 def test_index_view(test_client):
     """Test that index view works with domain models."""
     # Create a test post
@@ -115,6 +232,69 @@ def test_tag_view(test_client):
     assert tag.title.encode() in response.data
 
 
+def test_search_view(test_client):
+    """Test that search renders a full page, and only results for HTMX."""
+    for i in range(3):
+        create_test_post(title=f"Кэширование {i}", alias=f"cache-{i}")
+    test_client.application.config["SEARCH_RESULTS_PER_PAGE"] = 2
+
+    response = test_client.get("/search?q=кэш")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'name="q"' in body
+    assert body.count('class="minipost"') == 2
+    assert "/search?q=%D0%BA%D1%8D%D1%88&amp;page=2" in body
+
+    response = test_client.get("/search?q=кэш&page=2", headers={"HX-Request": "true"})
+    body = response.get_data(as_text=True)
+    assert 'name="q"' not in body
+    assert body.count('class="minipost"') == 1
+    assert "page=3" not in body
+
+    response = test_client.get("/search?q=несуществующее")
+    assert "Ничего не найдено" in response.get_data(as_text=True)
+    # Search operators are plain words, not syntax errors
+    assert test_client.get('/search?q="*(OR').status_code == 200
+
+
+@pytest.mark.parametrize(
+    "path, statements",
+    [
+        ("/first", 3),
+        ("/posts", 1),
+        ("/tags/", 1),
+        ("/tags/python", 2),
+        ("/tags/hx/cloud", 1),
+        ("/archive/", 1),
+        ("/archive/2024", 1),
+        ("/hx/pages", 1),
+        ("/search?q=content", 2),
+    ],
+)
+def test_view_query_budgets(test_client, query_budget, path, statements):
+    """Test that views issue a fixed number of statements, whatever the data."""
+    post_service = ServiceFactory.create_post_service()
+    tag = TagORM(title="Python", alias="python")
+    db.session.add(tag)
+    for i, alias in enumerate(["first", "second", "third", "fourth"]):
+        post = post_service.create_post(
+            PostDomain(
+                pagetitle=alias,
+                alias=alias,
+                content="content",
+                publishedon=datetime.datetime(2024, 1 + i, 1),
+            )
+        )
+        tag.posts.append(db.session.get(PostORM, post.id))
+    create_test_post(title="About", alias="about", page=True)
+    db.session.commit()
+    post_service.rebuild_related_posts(5)
+
+    for headers in ({}, {"HX-Request": "true"}):
+        with query_budget(statements):
+            assert test_client.get(path, headers=headers).status_code == 200
+
+
 def test_404_view(test_client):
     """Test that 404 view works correctly."""
     # Request a non-existent page
@@ -142,9 +322,76 @@ def test_robots_view(test_client):
     assert b"User-agent: *" in response.data
 
 
+def login(client):
+    """Log the client in as a fresh admin user."""
+    user = UserORM(name="admin")
+    user.set_password("password")
+    db.session.add(user)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.id)
+        session["_fresh"] = True
+
+
 def test_markdown_view(test_client):
     """Test that markdown conversion works."""
+    login(test_client)
     # Post markdown data
     response = test_client.post("/md/", data={"data": "# Test Header"})
     assert response.status_code == 200
     assert b"<h1>Test Header</h1>" in response.data
+
+
+def test_markdown_view_needs_login(test_client):
+    """Test that anonymous clients cannot render previews."""
+    assert test_client.post("/md/", data={"data": "# Test"}).status_code == 401
+    assert test_client.get("/md/").status_code == 405
+    assert test_client.post("/md/blocks", data={"content": "x"}).status_code == 401
+
+
+def test_markdown_view_limits(test_client, monkeypatch):
+    """Test the size cap, the rate limit and the preview cache."""
+    from blog.post import views
+
+    login(test_client)
+    test_client.application.config.update(
+        MARKDOWN_PREVIEW_MAX_BYTES=100,
+        MARKDOWN_PREVIEW_RATE=0.1,
+        MARKDOWN_PREVIEW_BURST=3,
+    )
+    rendered = []
+    render = views.render_markdown
+    monkeypatch.setattr(
+        views, "render_markdown", lambda text: rendered.append(text) or render(text)
+    )
+
+    response = test_client.post("/md/", data={"data": "x" * 200})
+    assert response.status_code == 413
+
+    for _ in range(2):
+        response = test_client.post("/md/", data={"data": "*same*"})
+        assert response.json == {"data": "<p><em>same</em></p>"}
+    assert rendered == ["*same*"]
+
+    response = test_client.post("/md/", data={"data": "*same*"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_markdown_preview_blocks(test_client):
+    """Test only the blocks the editor does not show are sent."""
+    login(test_client)
+    response = test_client.post("/md/blocks", data={"content": "# Title\n\ntext"})
+    assert response.status_code == 200
+    ids = re.findall(r'id="(md-[^"]+)"', response.text)
+    assert len(ids) == 2
+    assert "<h1>Title</h1>" in response.text
+
+    response = test_client.post(
+        "/md/blocks",
+        data={"content": "# Title\n\nmore *text*", "have": ",".join(ids)},
+    )
+    assert response.text.count("hx-preserve") == 2
+    assert 'id="{}" hx-preserve></div>'.format(ids[0]) in response.text
+    assert "<h1>" not in response.text
+    assert "<p>more <em>text</em></p>" in response.text